@@ -2,37 +2,94 @@
 
 from __future__ import annotations
 
+import importlib
 import logging
+import time
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
 
-from .api import PVMicroinverterApiClient
-from .api import PVMicroinverterApiClientError as PVMicroinverterApiClientError
 from .const import (
     CONF_STATION_ID,
     CONF_UPDATE_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
 )
-from .coordinator import PVMicroinverterDataUpdateCoordinator
+
+# Everything else, including NumPy, is only needed once the integration is set
+# up, and is imported then rather than whenever Home Assistant loads the package
+if TYPE_CHECKING:
+    from .coordinator import PVMicroinverterDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Modules imported in the executor before the first entry is set up
+RUNTIME_MODULES: list[str] = [
+    "api",
+    "coordinator",
+    "metadata",
+    "samplestore",
+    "scheduler",
+    "services",
+]
+
 # List of platforms to support
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+def __getattr__(name: str) -> Any:
+    """Import the re-exported API client error on first access."""
+    if name == "PVMicroinverterApiClientError":
+        from .api import PVMicroinverterApiClientError
+
+        return PVMicroinverterApiClientError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _import_runtime_modules() -> None:
+    """Import the modules needed to run the integration."""
+    for module in RUNTIME_MODULES:
+        importlib.import_module(f"{__name__}.{module}")
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the PV Microinverter integration."""
+    # Keep the imports off the event loop
+    await hass.async_add_import_executor_job(_import_runtime_modules)
+
+    from .services import async_setup_services
+
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up PV Microinverter from a config entry."""
+    # Already imported by async_setup
+    from .api import PVMicroinverterApiClient
+    from .coordinator import PVMicroinverterDataUpdateCoordinator
+    from .metadata import async_get_metadata_cache
+    from .samplestore import async_get_sample_store
+    from .scheduler import async_get_scheduler
+
     hass.data.setdefault(DOMAIN, {})
 
     # Get configuration from the config entry
     station_id = entry.data[CONF_STATION_ID]
-    update_interval = entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+    update_interval = entry.options.get(
+        CONF_UPDATE_INTERVAL,
+        entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+    )
 
     # Create API client
     session = async_get_clientsession(hass)
@@ -41,13 +98,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         station_id=station_id,
     )
 
+    # Start from the persisted metadata, so it is not re-read on every restart
+    metadata_cache = await async_get_metadata_cache(hass)
+    if (cached := metadata_cache.get(station_id)) is not None:
+        api_client.metadata, api_client.metadata_fetched = cached
+
     # Initialize coordinator
     coordinator = PVMicroinverterDataUpdateCoordinator(
         hass=hass,
+        config_entry=entry,
         api_client=api_client,
         update_interval=update_interval,
+        metadata_cache=metadata_cache,
     )
 
+    # Request timeout, endpoints, hedging, response recording and the webhook
+    coordinator.async_apply_options()
+    entry.async_on_unload(coordinator.async_unload_endpoints)
+    entry.async_on_unload(coordinator.async_unload_webhook)
+
+    # Keep raw samples on disk and resume the statistics from them
+    sample_store = async_get_sample_store(hass)
+    coordinator.samples = await sample_store.async_open(station_id, time.time())
+
+    @callback
+    def _async_close_samples() -> None:
+        coordinator.samples = None
+        sample_store.async_close(station_id)
+
+    entry.async_on_unload(_async_close_samples)
+    coordinator.async_seed_statistics()
+
     # Fetch initial data
     try:
         await coordinator.async_config_entry_first_refresh()
@@ -57,6 +138,13 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Store coordinator in hass.data
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # Hand periodic polling over to the shared scheduler
+    entry.async_on_unload(async_get_scheduler(hass).async_add(coordinator))
+    entry.async_on_unload(
+        lambda: coordinator.failure_telemetry.async_forget(station_id)
+    )
+    entry.async_on_unload(lambda: coordinator.fleet_monitor.remove(station_id))
+
     # Set up all platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -74,6 +162,25 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the cached metadata and the stored samples of a removed station."""
+    from .metadata import async_get_metadata_cache
+    from .samplestore import async_get_sample_store
+
+    station_id = entry.data[CONF_STATION_ID]
+    metadata_cache = await async_get_metadata_cache(hass)
+    metadata_cache.async_remove(station_id)
+    await async_get_sample_store(hass).async_remove(station_id)
+
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update options."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options, reloading the entry only if the station changed."""
+    coordinator: PVMicroinverterDataUpdateCoordinator = hass.data[DOMAIN][
+        entry.entry_id
+    ]
+    if coordinator.api_client.station_id != entry.data[CONF_STATION_ID]:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    coordinator.async_apply_options()
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
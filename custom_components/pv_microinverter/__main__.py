@@ -0,0 +1,271 @@
+"""Command line interface for polling PV Microinverter stations without Home Assistant.
+
+Usage:
+    python -m pv_microinverter [--format {ndjson,csv}] [--workers N] STATION_ID...
+    python -m pv_microinverter --file stations.txt --bench --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import UTC, datetime
+from typing import Any, Final, TextIO
+
+import aiohttp
+
+from .api import PVMicroinverterApiClient, PVMicroinverterApiClientError
+from .const import DEFAULT_BASE_URL, DEFAULT_REQUEST_TIMEOUT
+from .endpoints import EndpointPool
+from .hedging import LatencyTracker
+
+DEFAULT_WORKERS: Final = 8
+
+FIELDS: Final = (
+    "station_id",
+    "ok",
+    "current_power",
+    "today_energy",
+    "lifetime_energy",
+    "capacity",
+    "last_updated",
+    "latency",
+    "error",
+)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m pv_microinverter",
+        description="Fetch the current readings of PV Microinverter stations.",
+    )
+    parser.add_argument("station_ids", nargs="*", metavar="STATION_ID")
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=argparse.FileType("r"),
+        help="read station IDs from a file, one per line ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("ndjson", "csv"),
+        default="ndjson",
+        help="output format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="maximum number of concurrent requests (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_REQUEST_TIMEOUT,
+        help="timeout of one request in seconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--base-url",
+        action="append",
+        dest="base_urls",
+        metavar="URL",
+        help="base URL of the API; repeat to fail over between several endpoints,"
+        " most preferred first",
+    )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="only report throughput and latency percentiles",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1,
+        help="number of times to fetch every station in --bench mode",
+    )
+    args = parser.parse_args(argv)
+
+    if args.file is not None:
+        with args.file as file:
+            args.station_ids.extend(_read_station_ids(file))
+    if not args.base_urls:
+        args.base_urls = [DEFAULT_BASE_URL]
+    if not args.station_ids:
+        parser.error("no station IDs given")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def _read_station_ids(lines: Iterable[str]) -> list[str]:
+    """Return the station IDs of a file, skipping blank lines and comments."""
+    station_ids = []
+    for line in lines:
+        station_id = line.split("#", 1)[0].strip()
+        if station_id:
+            station_ids.append(station_id)
+    return station_ids
+
+
+async def _async_fetch(client: PVMicroinverterApiClient) -> dict[str, Any]:
+    """Fetch one station and return its result row."""
+    start = time.monotonic()
+    row: dict[str, Any] = {"station_id": client.station_id}
+    try:
+        data = await client.async_get_data()
+    except PVMicroinverterApiClientError as error:
+        cause = error.__cause__ or error
+        row.update(ok=False, error=f"{type(cause).__name__}: {cause}")
+    else:
+        row.update(
+            ok=True,
+            current_power=data.current_power,
+            today_energy=data.today_energy,
+            lifetime_energy=data.lifetime_energy,
+            last_updated=datetime.fromtimestamp(data.last_updated, UTC).isoformat(),
+        )
+        row["capacity"] = client.metadata.capacity
+    row["latency"] = round(time.monotonic() - start, 4)
+    return row
+
+
+async def async_fetch_stations(
+    session: aiohttp.ClientSession,
+    station_ids: list[str],
+    workers: int,
+    timeout: float,
+    base_url: str | Sequence[str] = DEFAULT_BASE_URL,
+) -> AsyncIterator[dict[str, Any]]:
+    """Fetch stations concurrently and yield each result as soon as it is done.
+
+    Args:
+        session: The aiohttp client session
+        station_ids: The stations to fetch
+        workers: The maximum number of concurrent requests
+        timeout: The timeout of one request in seconds
+        base_url: The base URL for the API, or several equivalent ones
+
+    Yields:
+        dict[str, Any]: The result row of one station
+    """
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for station_id in station_ids:
+        queue.put_nowait(station_id)
+    results: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    # All stations share the view of which endpoint is healthiest
+    endpoints = EndpointPool(
+        [base_url] if isinstance(base_url, str) else base_url,
+        failure_latency=timeout,
+    )
+
+    async def _worker() -> None:
+        while not queue.empty():
+            client = PVMicroinverterApiClient(
+                session=session,
+                station_id=queue.get_nowait(),
+                request_timeout=timeout,
+                endpoints=endpoints,
+            )
+            await results.put(await _async_fetch(client))
+
+    tasks = [
+        asyncio.create_task(_worker()) for _ in range(min(workers, len(station_ids)))
+    ]
+    try:
+        for _ in station_ids:
+            yield await results.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+        endpoints.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class _CsvOutput:
+    """Write result rows as CSV."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+        self._writer = csv.DictWriter(stream, fieldnames=FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, row: dict[str, Any]) -> None:
+        self._writer.writerow(row)
+        self._stream.flush()
+
+
+class _NdjsonOutput:
+    """Write result rows as newline-delimited JSON."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+
+    def write(self, row: dict[str, Any]) -> None:
+        self._stream.write(json.dumps(row) + "\n")
+        self._stream.flush()
+
+
+async def async_main(args: argparse.Namespace, stream: TextIO) -> int:
+    """Run the command line interface.
+
+    Returns:
+        int: The exit status, 1 if any station failed
+    """
+    station_ids = args.station_ids * (args.rounds if args.bench else 1)
+    output = None
+    if not args.bench:
+        output = _CsvOutput(stream) if args.format == "csv" else _NdjsonOutput(stream)
+    latencies = LatencyTracker(size=len(station_ids))
+    failures = 0
+
+    start = time.monotonic()
+    async with aiohttp.ClientSession() as session:
+        async for row in async_fetch_stations(
+            session, station_ids, args.workers, args.timeout, args.base_urls
+        ):
+            if not row["ok"]:
+                failures += 1
+            latencies.add(row["latency"])
+            if output is not None:
+                output.write(row)
+    elapsed = time.monotonic() - start
+
+    if args.bench:
+        summary = {
+            "requests": len(station_ids),
+            "failures": failures,
+            "workers": args.workers,
+            "elapsed": round(elapsed, 3),
+            "throughput": round(len(station_ids) / elapsed, 2) if elapsed else None,
+            **{
+                f"latency_p{percent}": latencies.percentile(percent)
+                for percent in (50, 90, 95, 99, 100)
+            },
+        }
+        if args.format == "csv":
+            writer = csv.DictWriter(stream, fieldnames=list(summary))
+            writer.writeheader()
+            writer.writerow(summary)
+        else:
+            stream.write(json.dumps(summary) + "\n")
+
+    return 1 if failures else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of `python -m pv_microinverter`."""
+    args = _parse_args(argv)
+    try:
+        return asyncio.run(async_main(args, sys.stdout))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Cross-station detection of underperforming PV Microinverter stations."""
+
+from __future__ import annotations
+
+import math
+from typing import Final
+
+import numpy as np
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_FLEET_MONITOR
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE: Final = 1.4826
+
+# A station is underperforming when its robust z-score is below -ANOMALY_THRESHOLD
+ANOMALY_THRESHOLD: Final = 3.5
+
+# Robust statistics need a minimum number of stations with a reading
+MIN_STATIONS: Final = 5
+
+# Below this median specific yield (night, dawn, dusk) nothing is flagged
+MIN_MEDIAN_YIELD: Final = 0.05
+
+# Lower bound of the scale relative to the median, so that a very uniform fleet
+# does not flag stations for tiny deviations
+MIN_RELATIVE_SCALE: Final = 0.05
+
+
+class FleetYieldMonitor:
+    """Specific yield of all stations, compared against the fleet.
+
+    Each station's power is normalized by its capacity into specific yield (W of
+    output per W of capacity) and kept in one contiguous NumPy array, with one
+    slot per station. The median and the median absolute deviation of the fleet
+    are recomputed in a single vectorized pass whenever a score is read after a
+    station changed, so a burst of updates is only evaluated once.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        """Initialize the monitor.
+
+        Args:
+            capacity: The initial number of station slots
+        """
+        self._slots: dict[str, int] = {}
+        self._station_ids: list[str] = []
+        self._yields = np.full(capacity, np.nan)
+        self._scores = np.full(capacity, np.nan)
+        self._dirty = False
+        self.median: float | None = None
+        self.scale: float | None = None
+
+    def __len__(self) -> int:
+        """Return the number of monitored stations."""
+        return len(self._station_ids)
+
+    def update(
+        self, station_id: str, power: float | None, capacity: float | None
+    ) -> None:
+        """Record the current power of a station.
+
+        Args:
+            station_id: The station
+            power: The current power in W, or None if unknown
+            capacity: The nameplate capacity in W, or None if unknown
+        """
+        if (slot := self._slots.get(station_id)) is None:
+            slot = self._add(station_id)
+
+        specific_yield = (
+            power / capacity
+            if power is not None and capacity and math.isfinite(power)
+            else math.nan
+        )
+        if specific_yield != self._yields[slot]:
+            self._yields[slot] = specific_yield
+            self._dirty = True
+
+    def remove(self, station_id: str) -> None:
+        """Stop monitoring a station."""
+        if (slot := self._slots.pop(station_id, None)) is None:
+            return
+
+        # Move the last station into the freed slot to keep the array dense
+        last = len(self._station_ids) - 1
+        last_station_id = self._station_ids.pop()
+        if slot != last:
+            self._station_ids[slot] = last_station_id
+            self._slots[last_station_id] = slot
+            self._yields[slot] = self._yields[last]
+        self._yields[last] = np.nan
+        self._dirty = True
+
+    def score(self, station_id: str) -> float | None:
+        """Return the robust z-score of a station's specific yield."""
+        if (slot := self._slots.get(station_id)) is None:
+            return None
+        if self._dirty:
+            self.compute()
+        score = self._scores[slot]
+        return None if math.isnan(score) else float(score)
+
+    def is_underperforming(self, station_id: str) -> bool | None:
+        """Return whether a station yields unusually little, or None if unknown."""
+        if (score := self.score(station_id)) is None:
+            return None
+        return score < -ANOMALY_THRESHOLD
+
+    def compute(self) -> None:
+        """Recompute the fleet statistics and the scores of all stations."""
+        self._dirty = False
+        count = len(self._station_ids)
+        yields = self._yields[:count]
+        scores = self._scores[:count]
+
+        valid = yields[~np.isnan(yields)]
+        if valid.size < MIN_STATIONS:
+            self.median = self.scale = None
+            scores.fill(np.nan)
+            return
+
+        median = float(np.median(valid))
+        mad = float(np.median(np.abs(valid - median)))
+        self.median = median
+        self.scale = max(MAD_SCALE * mad, MIN_RELATIVE_SCALE * median)
+        if median < MIN_MEDIAN_YIELD:
+            scores.fill(np.nan)
+            return
+
+        np.subtract(yields, median, out=scores)
+        scores /= self.scale
+
+    def _add(self, station_id: str) -> int:
+        """Assign the next free slot to a station, growing the arrays if needed."""
+        slot = len(self._station_ids)
+        if slot == self._yields.size:
+            self._yields = np.concatenate([self._yields, np.full(slot, np.nan)])
+            self._scores = np.concatenate([self._scores, np.full(slot, np.nan)])
+        self._station_ids.append(station_id)
+        self._slots[station_id] = slot
+        return slot
+
+
+@callback
+def async_get_fleet_monitor(hass: HomeAssistant) -> FleetYieldMonitor:
+    """Return the integration-wide fleet monitor, creating it on first use."""
+    if (monitor := hass.data.get(DATA_FLEET_MONITOR)) is None:
+        monitor = hass.data[DATA_FLEET_MONITOR] = FleetYieldMonitor()
+    return monitor
@@ -1,65 +1,132 @@
 """API client for PV Microinverter."""
 
+import asyncio
+import json
 import logging
+import sys
+import time
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
-from datetime import datetime
 from enum import StrEnum
-from typing import Any
+from typing import Any, Final, Self
 
 import aiohttp
 
-from .const import PVMicroinverterData
+from .const import DEFAULT_BASE_URL, DEFAULT_REQUEST_TIMEOUT, PVMicroinverterData
+from .endpoints import EndpointPool
+from .hedging import HedgeBudget, LatencyTracker, async_hedged
+from .replay import ResponseRecorder
 from .units import WATT, Dimension
 
 _LOGGER = logging.getLogger(__name__)
 
+# Hedging only starts once the latency percentile is based on enough requests
+MIN_LATENCY_SAMPLES: Final = 20
+HEDGE_PERCENTILE: Final = 95
+
+# Station metadata rarely changes, so it is only re-read from a response once
+# this many seconds have passed
+METADATA_TTL: Final = 24 * 60 * 60
+
+
+# Stations listed per request when enumerating the stations of an account
+STATION_PAGE_SIZE: Final = 500
+
+# Upper bound of the pages requested, in case the portal keeps sending pages
+MAX_STATION_PAGES: Final = 100
+
+# Stations validated concurrently when onboarding an account
+MAX_CONCURRENT_CHECKS: Final = 10
+
 
 class ApiEndpoints(StrEnum):
     GET_STATION_INFO = "GetStationInfo"
+    GET_STATION_LIST = "GetStationList"
+
+
+def _optional_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _optional_str(value: Any) -> str | None:
+    return value if isinstance(value, str) and value else None
+
+
+@dataclass(slots=True, frozen=True)
+class StationMetadata:
+    """Static properties of a station, as opposed to its telemetry.
+
+    Inverter models, time zones and installers repeat across a fleet, so they are
+    interned and all stations share one string object per distinct value, also
+    when the metadata is restored from the cache.
+    """
+
+    name: str | None
+    inverter_models: tuple[str, ...]
+    latitude: float | None
+    longitude: float | None
+    time_zone: str | None
+    installer: str | None
+    created: str | None
+    # Nameplate capacity in W
+    capacity: float | None
+
+    def __post_init__(self) -> None:
+        """Intern the values shared between stations."""
+        object.__setattr__(
+            self, "inverter_models", tuple(map(sys.intern, self.inverter_models))
+        )
+        for field in ("time_zone", "installer"):
+            if (value := getattr(self, field)) is not None:
+                object.__setattr__(self, field, sys.intern(value))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Create an instance from the decoded `Data` object of an API response."""
+        try:
+            capacity = Dimension.parse(data["UnitCapacity"]).to_base_unit()
+        except (AttributeError, KeyError, ValueError):
+            capacity = None
+        return cls(
+            name=data.get("StationName") or None,
+            inverter_models=tuple(
+                model
+                for model in (data.get("InvModel1"), data.get("InvModel2"))
+                if isinstance(model, str) and model
+            ),
+            latitude=_optional_float(data.get("Lat")),
+            longitude=_optional_float(data.get("Lng")),
+            time_zone=_optional_str(data.get("TimeZone")),
+            installer=_optional_str(data.get("Installer")),
+            created=data.get("CreateTime") or None,
+            capacity=capacity,
+        )
+
+    @property
+    def model(self) -> str | None:
+        """Return the inverter model(s) of the station."""
+        return " / ".join(self.inverter_models) or None
+
 
+@dataclass(slots=True, frozen=True)
+class AccountStation:
+    """A station visible to a portal account."""
 
-@dataclass
-class StationInfoData:
-    UnitCapacity: str
-    UnitEToday: str
-    UnitEMonth: str
-    UnitEYear: str
-    UnitETotal: str
-    Power: float
-    PowerStr: str
-    Capacity: float
-    LoadPower: str
-    GridPower: str
-    StrCO2: str
-    StrTrees: str
-    StrIncome: str
-    PwImg: str
-    StationName: str
-    InvModel1: str
-    InvModel2: str | None
-    Lat: str
-    Lng: str
-    TimeZone: str
-    StrPeakPower: str
-    Installer: str | None
-    CreateTime: datetime
-    CreateYear: int
-    CreateMonth: int
-    Etoday: float
-    InvTotal: int
-
-
-@dataclass
-class StationInfoResponse:
-    Status: int
-    Result: Any
-    Data: StationInfoData
+    station_id: str
+    name: str | None
 
 
 class PVMicroinverterApiClientError(Exception):
     """Exception to indicate an error with the API client."""
 
 
+class PVMicroinverterAuthError(PVMicroinverterApiClientError):
+    """Exception to indicate that the portal rejected the account credentials."""
+
+
 class PVMicroinverterApiClient:
     """API client for PV Microinverter."""
 
@@ -67,18 +134,50 @@ class PVMicroinverterApiClient:
         self,
         session: aiohttp.ClientSession,
         station_id: str,
-        base_url: str = "https://www.envertecportal.com/ApiStations",
+        base_url: str | Sequence[str] = DEFAULT_BASE_URL,
+        recorder: ResponseRecorder | None = None,
+        clock: Callable[[], float] = time.time,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        hedging: bool = False,
+        endpoints: EndpointPool | None = None,
     ) -> None:
         """Initialize the Envertech API client.
 
         Args:
             session: The aiohttp client session
             station_id: The station identifier
-            base_url: The base URL for the API
+            base_url: The base URL for the API, or several base URLs of
+                equivalent endpoints, most preferred first
+            recorder: An optional recorder for the raw responses
+            clock: The source of the timestamps of the readings
+            request_timeout: The latency budget of one request in seconds,
+                including a hedged duplicate
+            hedging: Whether to send a second request when the first one is
+                slower than the usual (p95) latency
+            endpoints: A pool of endpoints shared with other clients, instead
+                of one of `base_url`
         """
         self._session = session
         self._station_id = station_id
-        self._base_url = base_url
+        if endpoints is None:
+            endpoints = EndpointPool(
+                [base_url] if isinstance(base_url, str) else base_url
+            )
+        self.endpoints = endpoints
+        self._clock = clock
+        self.recorder = recorder
+        self.request_timeout = request_timeout
+        self.hedging = hedging
+        self.latency = LatencyTracker()
+        self._hedge_budget = HedgeBudget()
+        self.metadata: StationMetadata | None = None
+        # Time of the response the metadata was last read from
+        self.metadata_fetched = 0.0
+
+    @property
+    def station_id(self) -> str:
+        """Return the station identifier."""
+        return self._station_id
 
     async def async_get_data(self) -> PVMicroinverterData:
         """Get data from the API.
@@ -89,56 +188,156 @@ class PVMicroinverterApiClient:
         Raises:
             PVMicroinverterApiClientError: If the API request fails
         """
+        hedge_delay = None
+        if self.hedging and len(self.latency) >= MIN_LATENCY_SAMPLES:
+            hedge_delay = self.latency.percentile(HEDGE_PERCENTILE)
+
         try:
             # Make the request to the API
-            response = await self._session.post(
-                f"{self._base_url}/{ApiEndpoints.GET_STATION_INFO}",
-                json={"stationId": self._station_id},
-                headers={
-                    "Content-Type": "application/json",
-                },
-            )
-
-            response.raise_for_status()
-            data = await response.json()
+            body = await self._async_fetch(hedge_delay)
+            timestamp = self._clock()
+            if self.recorder is not None:
+                await self.recorder.async_record(self._station_id, body, timestamp)
+            data = json.loads(body)
 
             # Process the response
-            return self._process_data(data)
+            return self._process_data(data, timestamp)
 
+        # Failures are accounted and logged in aggregate by the coordinator, so
+        # only leave a trace for debugging here.
+        except TimeoutError as error:
+            # Count the timeout, so that the percentile reflects the long tail
+            self.latency.add(self.request_timeout)
+            _LOGGER.debug("Timeout fetching data after %ss", self.request_timeout)
+            raise PVMicroinverterApiClientError(
+                "Timeout fetching data from API"
+            ) from error
         except aiohttp.ClientError as error:
-            _LOGGER.error("Error fetching data: %s", error)
+            _LOGGER.debug("Error fetching data: %s", error)
             raise PVMicroinverterApiClientError(
                 "Error fetching data from API"
             ) from error
         except Exception as error:
-            _LOGGER.exception("Unexpected error: %s", error)
+            _LOGGER.debug("Unexpected error: %s", error, exc_info=True)
             raise PVMicroinverterApiClientError("Unexpected error occurred") from error
 
-    def _process_data(self, data: dict[str, Any]) -> PVMicroinverterData:
+    async def _async_fetch(self, hedge_delay: float | None) -> bytes:
+        """Request the station info, failing over to the other endpoints.
+
+        Args:
+            hedge_delay: The delay after which to send a hedged request to the
+                next healthiest endpoint, or None to not hedge
+
+        Returns:
+            bytes: The raw body of the first successful response
+        """
+        endpoints = self.endpoints
+        tried: set[str] = set()
+        pending: set[str] = set()
+
+        async def _async_request() -> bytes:
+            url = endpoints.select(exclude=tried)
+            tried.add(url)
+            pending.add(url)
+            try:
+                body = await self._async_request_station_info(url)
+            except aiohttp.ClientError:
+                pending.discard(url)
+                endpoints.record_failure(url)
+                raise
+            pending.discard(url)
+            return body
+
+        try:
+            async with asyncio.timeout(self.request_timeout):
+                while True:
+                    try:
+                        return await async_hedged(
+                            _async_request, hedge_delay, self._hedge_budget
+                        )
+                    except aiohttp.ClientError as error:
+                        if len(tried) >= len(endpoints):
+                            raise
+                        _LOGGER.debug("Failing over after error: %s", error)
+        except TimeoutError:
+            for url in pending:
+                endpoints.record_failure(url)
+            raise
+        finally:
+            # Keep an eye on the endpoints not serving requests
+            endpoints.schedule_probes(self._async_probe)
+
+    async def _async_request_station_info(self, url: str) -> bytes:
+        """Request the station info from one endpoint and return the raw body."""
+        start = time.monotonic()
+        response = await self._session.post(
+            f"{url}/{ApiEndpoints.GET_STATION_INFO}",
+            json={"stationId": self._station_id},
+            headers={
+                "Content-Type": "application/json",
+            },
+        )
+        response.raise_for_status()
+        body = await response.read()
+        latency = time.monotonic() - start
+        self.latency.add(latency)
+        self.endpoints.record_success(url, latency)
+        return body
+
+    async def _async_probe(self, url: str) -> None:
+        """Send one request to an idle endpoint to update its health."""
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.request_timeout):
+                response = await self._session.post(
+                    f"{url}/{ApiEndpoints.GET_STATION_INFO}",
+                    json={"stationId": self._station_id},
+                    headers={
+                        "Content-Type": "application/json",
+                    },
+                )
+                response.raise_for_status()
+                await response.read()
+        except (TimeoutError, aiohttp.ClientError) as error:
+            _LOGGER.debug("Probe of %s failed: %s", url, error)
+            self.endpoints.record_failure(url)
+        else:
+            self.endpoints.record_success(url, time.monotonic() - start)
+
+    def _process_data(
+        self, data: dict[str, Any], timestamp: float | None = None
+    ) -> PVMicroinverterData:
         """Process the API response data.
 
+        Only the telemetry fields are parsed on every call. The station metadata
+        is re-read once it is older than `METADATA_TTL` and only replaced if it
+        actually changed.
+
         Args:
             data: The data from the API
+            timestamp: The time of the reading, defaults to now
 
         Returns:
             PVMicroinverterData: The processed data
         """
+        if data.get("Status") != "0":
+            raise PVMicroinverterApiClientError(f"API error: {data.get('Result')}")
 
-        station_data = StationInfoData(**data.get("Data", {}))
-        station_info = StationInfoResponse(
-            Status=data.get("Status"),
-            Result=data.get("Result"),
-            Data=station_data,
-        )
+        station_data = data.get("Data", {})
+        if timestamp is None:
+            timestamp = self._clock()
 
-        if station_info.Status != "0":
-            raise PVMicroinverterApiClientError(f"API error: {station_info.Result}")
+        if self.metadata is None or timestamp - self.metadata_fetched >= METADATA_TTL:
+            metadata = StationMetadata.from_dict(station_data)
+            if metadata != self.metadata:
+                self.metadata = metadata
+            self.metadata_fetched = timestamp
 
         return PVMicroinverterData(
-            current_power=Dimension(station_data.Power, WATT).value,
-            today_energy=Dimension.parse(station_data.UnitEToday).value,
-            lifetime_energy=Dimension.parse(station_data.UnitETotal).value,
-            last_updated=datetime.now().isoformat(),
+            current_power=Dimension(station_data["Power"], WATT).value,
+            today_energy=Dimension.parse(station_data["UnitEToday"]).value,
+            lifetime_energy=Dimension.parse(station_data["UnitETotal"]).value,
+            last_updated=timestamp,
         )
 
     async def async_check_connection(self) -> bool:
@@ -148,15 +347,152 @@ class PVMicroinverterApiClient:
             bool: True if connection is successful, False otherwise
         """
         try:
-            response = await self._session.post(
-                f"{self._base_url}/{ApiEndpoints.GET_STATION_INFO}",
-                headers={
-                    "Content-Type": "application/json",
-                },
-                json={"stationId": self._station_id},
-            )
+            async with asyncio.timeout(self.request_timeout):
+                response = await self._session.post(
+                    f"{self.endpoints.select()}/{ApiEndpoints.GET_STATION_INFO}",
+                    headers={
+                        "Content-Type": "application/json",
+                    },
+                    json={"stationId": self._station_id},
+                )
             response.raise_for_status()
             return True
         except Exception as error:
             _LOGGER.error("Connection test failed: %s", error)
             return False
+
+
+class PVMicroinverterAccountClient:
+    """API client for the stations of a portal account."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        base_url: str | Sequence[str] = DEFAULT_BASE_URL,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> None:
+        """Initialize the account client.
+
+        Args:
+            session: The aiohttp client session
+            username: The user name of the portal account
+            password: The password of the portal account
+            base_url: The base URL for the API, or several equivalent ones
+            request_timeout: The timeout of one request in seconds
+        """
+        self._session = session
+        self._username = username
+        self._password = password
+        self.request_timeout = request_timeout
+        self.endpoints = EndpointPool(
+            [base_url] if isinstance(base_url, str) else base_url,
+            failure_latency=request_timeout,
+        )
+
+    async def async_get_stations(self) -> list[AccountStation]:
+        """List all stations of the account.
+
+        All stations usually fit into one page; further pages are only requested
+        for very large accounts. Listing stops at a page without new stations,
+        e.g. if the portal ignores the page index, and after `MAX_STATION_PAGES`.
+
+        Returns:
+            list[AccountStation]: The stations, in the order of the portal
+
+        Raises:
+            PVMicroinverterAuthError: If the credentials are rejected
+            PVMicroinverterApiClientError: If the API request fails
+        """
+        stations: dict[str, AccountStation] = {}
+        for page in range(1, MAX_STATION_PAGES + 1):
+            data = await self._async_request_page(page)
+            listed = data.get("StationList") or []
+            known = len(stations)
+            for station in listed:
+                station_id = str(station["StationId"])
+                stations.setdefault(
+                    station_id,
+                    AccountStation(
+                        station_id, _optional_str(station.get("StationName"))
+                    ),
+                )
+            # Not every portal version reports the total
+            total = data.get("TotalCount")
+            if (
+                len(listed) < STATION_PAGE_SIZE
+                or (total is not None and len(stations) >= int(total))
+                or len(stations) == known
+            ):
+                break
+        else:
+            _LOGGER.warning(
+                "Stopped listing the stations of the account after %d pages",
+                MAX_STATION_PAGES,
+            )
+        return list(stations.values())
+
+    async def _async_request_page(self, page: int) -> dict[str, Any]:
+        """Request one page of the station list and return its `Data` object."""
+        url = self.endpoints.select()
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.request_timeout):
+                response = await self._session.post(
+                    f"{url}/{ApiEndpoints.GET_STATION_LIST}",
+                    json={
+                        "UserName": self._username,
+                        "Password": self._password,
+                        "PageIndex": page,
+                        "PageSize": STATION_PAGE_SIZE,
+                    },
+                    headers={
+                        "Content-Type": "application/json",
+                    },
+                )
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        except (TimeoutError, aiohttp.ClientError) as error:
+            self.endpoints.record_failure(url)
+            raise PVMicroinverterApiClientError(
+                "Error listing the stations of the account"
+            ) from error
+        self.endpoints.record_success(url, time.monotonic() - start)
+
+        if data.get("Status") != "0":
+            raise PVMicroinverterAuthError(f"API error: {data.get('Result')}")
+        return data.get("Data") or {}
+
+    async def async_check_stations(
+        self,
+        station_ids: Sequence[str],
+        max_concurrent: int = MAX_CONCURRENT_CHECKS,
+    ) -> set[str]:
+        """Check concurrently which stations can be read.
+
+        Args:
+            station_ids: The stations to check
+            max_concurrent: The maximum number of requests in flight
+
+        Returns:
+            set[str]: The stations that answered
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def _async_check(station_id: str) -> bool:
+            client = PVMicroinverterApiClient(
+                session=self._session,
+                station_id=station_id,
+                request_timeout=self.request_timeout,
+                endpoints=self.endpoints,
+            )
+            async with semaphore:
+                return await client.async_check_connection()
+
+        results = await asyncio.gather(*map(_async_check, station_ids))
+        return {
+            station_id
+            for station_id, ok in zip(station_ids, results, strict=True)
+            if ok
+        }
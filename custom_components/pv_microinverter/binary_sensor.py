@@ -0,0 +1,94 @@
+"""Binary sensor platform for PV Microinverter integration."""
+
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import (
+    CONF_ENABLE_ANOMALY,
+    DEFAULT_ENABLE_ANOMALY,
+    DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
+)
+from .coordinator import PVMicroinverterDataUpdateCoordinator
+from .entity import PVMicroinverterEntity, async_remove_entities
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up PV Microinverter binary sensors based on a config entry."""
+    coordinator: PVMicroinverterDataUpdateCoordinator = hass.data[DOMAIN][
+        entry.entry_id
+    ]
+    station_id = entry.data["station_id"]
+    sensors: list[PVMicroinverterUnderperformanceSensor] = []
+
+    async def _async_options_updated() -> None:
+        """Add or remove the underperformance sensor."""
+        enabled = coordinator.options.get(CONF_ENABLE_ANOMALY, DEFAULT_ENABLE_ANOMALY)
+        if enabled and not sensors:
+            sensors.append(
+                PVMicroinverterUnderperformanceSensor(
+                    coordinator=coordinator,
+                    station_id=station_id,
+                    sensor_type="underperforming",
+                )
+            )
+            async_add_entities(sensors)
+        elif not enabled and sensors:
+            await async_remove_entities(hass, BINARY_SENSOR_DOMAIN, [sensors.pop()])
+
+    await _async_options_updated()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_options_updated
+        )
+    )
+
+
+class PVMicroinverterUnderperformanceSensor(PVMicroinverterEntity, BinarySensorEntity):
+    """Problem sensor for a station yielding unusually little compared to the fleet."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(
+        self,
+        coordinator: PVMicroinverterDataUpdateCoordinator,
+        station_id: str,
+        sensor_type: str,
+    ) -> None:
+        """Initialize the binary sensor.
+
+        Args:
+            coordinator: The data update coordinator
+            station_id: The station identifier
+            sensor_type: The sensor type
+        """
+        super().__init__(coordinator, station_id, sensor_type)
+        self._attr_name = "Underperforming"
+        self._attr_is_on = coordinator.fleet_monitor.is_underperforming(station_id)
+        self._written: tuple[bool | None, bool] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the verdict or the availability changed."""
+        self._attr_is_on = self.coordinator.fleet_monitor.is_underperforming(
+            self._station_id
+        )
+        written = (self._attr_is_on, self.available)
+        if written == self._written:
+            return
+
+        self._written = written
+        self.async_schedule_write()
@@ -0,0 +1,136 @@
+"""Clear-sky model of the expected output of a PV station."""
+
+from __future__ import annotations
+
+import math
+from datetime import UTC, date, datetime
+
+import numpy as np
+
+# Resolution of the precomputed daily profile
+STEP_SECONDS = 300
+SECONDS_PER_DAY = 86400
+
+# Losses between the irradiance on the modules and the inverter output
+# (temperature, wiring, inverter efficiency, soiling)
+SYSTEM_DERATE = 0.85
+
+# Irradiance at which the nameplate capacity is rated (STC), in W/m²
+STC_IRRADIANCE = 1000.0
+
+
+def compute_clear_sky_power(
+    day: date,
+    latitude: float,
+    longitude: float,
+    capacity: float,
+    step: int = STEP_SECONDS,
+) -> np.ndarray:
+    """Compute the expected clear-sky power over one UTC day.
+
+    The solar position follows the NOAA fractional-year approximation and the
+    global horizontal irradiance the Haurwitz clear-sky model. All time steps are
+    computed in one vectorized pass.
+
+    Args:
+        day: The UTC day
+        latitude: The latitude of the station in degrees
+        longitude: The longitude of the station in degrees, east positive
+        capacity: The nameplate capacity of the station in W
+        step: The time between two samples of the profile in seconds
+
+    Returns:
+        np.ndarray: The expected power in W at each step, starting at midnight
+            UTC and including the following midnight
+    """
+    seconds = np.arange(0, SECONDS_PER_DAY + step, step, dtype=np.float64)
+    minutes = seconds / 60
+    day_of_year = day.timetuple().tm_yday
+
+    # Fractional year in radians
+    gamma = 2 * math.pi / 365 * (day_of_year - 1 + (minutes / 60 - 12) / 24)
+    cos_g, sin_g = np.cos(gamma), np.sin(gamma)
+    cos_2g, sin_2g = np.cos(2 * gamma), np.sin(2 * gamma)
+
+    # Equation of time in minutes and solar declination in radians
+    eqtime = 229.18 * (
+        0.000075
+        + 0.001868 * cos_g
+        - 0.032077 * sin_g
+        - 0.014615 * cos_2g
+        - 0.040849 * sin_2g
+    )
+    declination = (
+        0.006918
+        - 0.399912 * cos_g
+        + 0.070257 * sin_g
+        - 0.006758 * cos_2g
+        + 0.000907 * sin_2g
+        - 0.002697 * np.cos(3 * gamma)
+        + 0.00148 * np.sin(3 * gamma)
+    )
+
+    true_solar_time = minutes + eqtime + 4 * longitude
+    hour_angle = np.radians(true_solar_time / 4 - 180)
+    lat = math.radians(latitude)
+    cos_zenith = math.sin(lat) * np.sin(declination) + math.cos(lat) * np.cos(
+        declination
+    ) * np.cos(hour_angle)
+
+    # Haurwitz clear-sky global horizontal irradiance in W/m²
+    irradiance = np.zeros_like(cos_zenith)
+    daylight = cos_zenith > 0
+    irradiance[daylight] = (
+        1098 * cos_zenith[daylight] * np.exp(-0.059 / cos_zenith[daylight])
+    )
+
+    return capacity * irradiance / STC_IRRADIANCE * SYSTEM_DERATE
+
+
+class ClearSkyModel:
+    """Expected clear-sky output of one station, cached per day."""
+
+    __slots__ = ("_day", "_profile", "capacity", "latitude", "longitude")
+
+    def __init__(self, latitude: float, longitude: float, capacity: float) -> None:
+        """Initialize the model.
+
+        Args:
+            latitude: The latitude of the station in degrees
+            longitude: The longitude of the station in degrees, east positive
+            capacity: The nameplate capacity of the station in W
+        """
+        self.latitude = latitude
+        self.longitude = longitude
+        self.capacity = capacity
+        self._day: date | None = None
+        self._profile: np.ndarray | None = None
+
+    def expected_power(self, timestamp: float) -> float:
+        """Return the expected clear-sky power in W at the given POSIX timestamp."""
+        moment = datetime.fromtimestamp(timestamp, UTC)
+        day = moment.date()
+        if day != self._day:
+            self._profile = compute_clear_sky_power(
+                day, self.latitude, self.longitude, self.capacity
+            )
+            self._day = day
+
+        offset = (
+            moment.hour * 3600 + moment.minute * 60 + moment.second
+        ) + moment.microsecond / 1e6
+        index, fraction = divmod(offset / STEP_SECONDS, 1)
+        index = int(index)
+        profile = self._profile
+        return float(profile[index] + (profile[index + 1] - profile[index]) * fraction)
+
+    def performance_ratio(self, power: float, timestamp: float) -> float | None:
+        """Return the actual power relative to the expected power, in percent.
+
+        Returns None while the expected power is too small for a meaningful ratio,
+        i.e. around sunrise, sunset and at night.
+        """
+        expected = self.expected_power(timestamp)
+        if expected < 0.02 * self.capacity:
+            return None
+        return power / expected * 100
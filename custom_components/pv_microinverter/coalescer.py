@@ -0,0 +1,123 @@
+"""Coalescing of PV Microinverter entity state writes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .const import DATA_WRITE_COALESCER, DEFAULT_WRITE_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateWriteCoalescer:
+    """Collect the state writes of all stations and flush them in one batch.
+
+    When many coordinators finish their updates at the same time, every sensor
+    would write its state from its own callback. Instead, sensors mark
+    themselves dirty and all dirty entities are written in a single callback on
+    the next loop tick, or once the write window of an entity has passed. An
+    entity that is marked dirty again before the flush is written only once,
+    with its latest state.
+
+    There is one flush for all entities, due at the earliest end of their
+    windows, so no state is held back for longer than its window.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, delay: float = DEFAULT_WRITE_WINDOW
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            hass: The Home Assistant instance
+            delay: The default time in seconds to collect writes before
+                flushing them
+        """
+        self._hass = hass
+        self.delay = delay
+        # Insertion ordered, so states are written in the order they changed
+        self._dirty: dict[Entity, None] = {}
+        self._handle: asyncio.Handle | None = None
+        # Loop time the pending flush is due at
+        self._flush_at = 0.0
+        self.flushes = 0
+        self.writes = 0
+        self.superseded = 0
+        self.flush_time = 0.0
+
+    @callback
+    def async_schedule_write(self, entity: Entity, delay: float | None = None) -> None:
+        """Mark an entity for writing its state with the next flush.
+
+        Args:
+            entity: The entity whose state changed
+            delay: The longest time in seconds to hold the write back, defaults
+                to the delay of the coalescer
+        """
+        if entity in self._dirty:
+            self.superseded += 1
+            return
+
+        self._dirty[entity] = None
+        if delay is None:
+            delay = self.delay
+        loop = self._hass.loop
+        flush_at = loop.time() + delay
+        if self._handle is not None:
+            if self._flush_at <= flush_at:
+                return
+            self._handle.cancel()
+
+        self._flush_at = flush_at
+        if delay:
+            self._handle = loop.call_at(flush_at, self._async_flush)
+        else:
+            self._handle = loop.call_soon(self._async_flush)
+
+    @callback
+    def async_discard(self, entity: Entity) -> None:
+        """Drop a pending write, e.g. because the entity is being removed."""
+        self._dirty.pop(entity, None)
+
+    @callback
+    def async_flush(self) -> None:
+        """Write all pending states now."""
+        if self._handle is not None:
+            self._handle.cancel()
+        self._async_flush()
+
+    @callback
+    def _async_flush(self) -> None:
+        """Write the states of all dirty entities."""
+        self._handle = None
+        dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        start = time.perf_counter()
+        for entity in dirty:
+            entity.async_write_ha_state()
+        elapsed = time.perf_counter() - start
+
+        self.flushes += 1
+        self.writes += len(dirty)
+        self.flush_time += elapsed
+        _LOGGER.debug(
+            "Wrote %d states in %.2f ms (%d writes superseded so far)",
+            len(dirty),
+            elapsed * 1000,
+            self.superseded,
+        )
+
+
+@callback
+def async_get_write_coalescer(hass: HomeAssistant) -> StateWriteCoalescer:
+    """Return the integration-wide state write coalescer, creating it on first use."""
+    if (coalescer := hass.data.get(DATA_WRITE_COALESCER)) is None:
+        coalescer = hass.data[DATA_WRITE_COALESCER] = StateWriteCoalescer(hass)
+    return coalescer
@@ -2,31 +2,166 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
-from homeassistant.data_entry_flow import FlowResult
+from homeassistant.components import webhook
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResult, FlowResultType
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .api import PVMicroinverterApiClient
+from .api import (
+    PVMicroinverterAccountClient,
+    PVMicroinverterApiClient,
+    PVMicroinverterApiClientError,
+    PVMicroinverterAuthError,
+)
 from .const import (
+    CONF_BASE_URLS,
+    CONF_ENABLE_ANOMALY,
+    CONF_ENABLE_HEDGING,
+    CONF_ENABLE_PERFORMANCE,
+    CONF_ENABLE_STATISTICS,
+    CONF_ENABLE_WEBHOOK,
+    CONF_FALLBACK_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_POWER_DEADBAND_PERCENT,
+    CONF_RECORD_RESPONSES,
+    CONF_REQUEST_TIMEOUT,
+    CONF_STATE_HEARTBEAT,
     CONF_STATION_ID,
+    CONF_STATIONS,
     CONF_UPDATE_INTERVAL,
+    CONF_WRITE_WINDOW,
+    DEFAULT_BASE_URLS,
+    DEFAULT_ENABLE_ANOMALY,
+    DEFAULT_ENABLE_HEDGING,
+    DEFAULT_ENABLE_PERFORMANCE,
+    DEFAULT_ENABLE_STATISTICS,
+    DEFAULT_ENABLE_WEBHOOK,
+    DEFAULT_FALLBACK_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_POWER_DEADBAND_PERCENT,
+    DEFAULT_RECORD_RESPONSES,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_STATE_HEARTBEAT,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WRITE_WINDOW,
     DOMAIN,
 )
+from .endpoints import parse_base_urls
 
 _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_STATION_ID): str,
     vol.Optional(CONF_UPDATE_INTERVAL, default=DEFAULT_UPDATE_INTERVAL): int,
+    vol.Optional(CONF_POWER_DEADBAND, default=DEFAULT_POWER_DEADBAND): vol.Coerce(
+        float
+    ),
+    vol.Optional(
+        CONF_POWER_DEADBAND_PERCENT, default=DEFAULT_POWER_DEADBAND_PERCENT
+    ): vol.Coerce(float),
+    vol.Optional(CONF_STATE_HEARTBEAT, default=DEFAULT_STATE_HEARTBEAT): int,
+    vol.Optional(CONF_ENABLE_STATISTICS, default=DEFAULT_ENABLE_STATISTICS): bool,
+    vol.Optional(CONF_ENABLE_PERFORMANCE, default=DEFAULT_ENABLE_PERFORMANCE): bool,
+    vol.Optional(CONF_ENABLE_ANOMALY, default=DEFAULT_ENABLE_ANOMALY): bool,
+    vol.Optional(CONF_RECORD_RESPONSES, default=DEFAULT_RECORD_RESPONSES): bool,
+    vol.Optional(CONF_REQUEST_TIMEOUT, default=DEFAULT_REQUEST_TIMEOUT): int,
+    vol.Optional(CONF_ENABLE_HEDGING, default=DEFAULT_ENABLE_HEDGING): bool,
+    vol.Optional(CONF_ENABLE_WEBHOOK, default=DEFAULT_ENABLE_WEBHOOK): bool,
+    vol.Optional(CONF_FALLBACK_INTERVAL, default=DEFAULT_FALLBACK_INTERVAL): int,
+    vol.Optional(CONF_IDLE_INTERVAL, default=DEFAULT_IDLE_INTERVAL): int,
+    vol.Optional(CONF_BASE_URLS, default=DEFAULT_BASE_URLS): str,
+})
+
+# Only the station; the other settings of the entry are kept
+STEP_REAUTH_DATA_SCHEMA = vol.Schema({
+    vol.Required(CONF_STATION_ID): str,
 })
 
+STEP_ACCOUNT_DATA_SCHEMA = vol.Schema({
+    vol.Required(CONF_USERNAME): str,
+    vol.Required(CONF_PASSWORD): str,
+    vol.Optional(CONF_BASE_URLS, default=DEFAULT_BASE_URLS): str,
+})
+
+
+def _options_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the options schema, defaulting to the current settings."""
+    return vol.Schema({
+        vol.Optional(
+            CONF_UPDATE_INTERVAL,
+            default=options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+        ): int,
+        vol.Optional(
+            CONF_POWER_DEADBAND,
+            default=options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND),
+        ): vol.Coerce(float),
+        vol.Optional(
+            CONF_POWER_DEADBAND_PERCENT,
+            default=options.get(
+                CONF_POWER_DEADBAND_PERCENT, DEFAULT_POWER_DEADBAND_PERCENT
+            ),
+        ): vol.Coerce(float),
+        vol.Optional(
+            CONF_STATE_HEARTBEAT,
+            default=options.get(CONF_STATE_HEARTBEAT, DEFAULT_STATE_HEARTBEAT),
+        ): int,
+        vol.Optional(
+            CONF_WRITE_WINDOW,
+            default=options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW),
+        ): int,
+        vol.Optional(
+            CONF_ENABLE_STATISTICS,
+            default=options.get(CONF_ENABLE_STATISTICS, DEFAULT_ENABLE_STATISTICS),
+        ): bool,
+        vol.Optional(
+            CONF_ENABLE_PERFORMANCE,
+            default=options.get(CONF_ENABLE_PERFORMANCE, DEFAULT_ENABLE_PERFORMANCE),
+        ): bool,
+        vol.Optional(
+            CONF_ENABLE_ANOMALY,
+            default=options.get(CONF_ENABLE_ANOMALY, DEFAULT_ENABLE_ANOMALY),
+        ): bool,
+        vol.Optional(
+            CONF_RECORD_RESPONSES,
+            default=options.get(CONF_RECORD_RESPONSES, DEFAULT_RECORD_RESPONSES),
+        ): bool,
+        vol.Optional(
+            CONF_REQUEST_TIMEOUT,
+            default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+        ): int,
+        vol.Optional(
+            CONF_ENABLE_HEDGING,
+            default=options.get(CONF_ENABLE_HEDGING, DEFAULT_ENABLE_HEDGING),
+        ): bool,
+        vol.Optional(
+            CONF_ENABLE_WEBHOOK,
+            default=options.get(CONF_ENABLE_WEBHOOK, DEFAULT_ENABLE_WEBHOOK),
+        ): bool,
+        vol.Optional(
+            CONF_FALLBACK_INTERVAL,
+            default=options.get(CONF_FALLBACK_INTERVAL, DEFAULT_FALLBACK_INTERVAL),
+        ): int,
+        vol.Optional(
+            CONF_IDLE_INTERVAL,
+            default=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL),
+        ): int,
+        vol.Optional(
+            CONF_BASE_URLS,
+            default=options.get(CONF_BASE_URLS, DEFAULT_BASE_URLS),
+        ): str,
+    })
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect to the API.
@@ -44,22 +179,29 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """
     session = async_get_clientsession(hass)
 
+    try:
+        base_urls = parse_base_urls(data.get(CONF_BASE_URLS, DEFAULT_BASE_URLS))
+    except ValueError as error:
+        raise InvalidBaseUrls from error
+
     api_client = PVMicroinverterApiClient(
         session=session,
         station_id=data[CONF_STATION_ID],
+        base_url=base_urls,
     )
 
     # Test connection and authentication
-    connection_successful = await api_client.async_check_connection()
+    try:
+        connection_successful = await api_client.async_check_connection()
+    finally:
+        # Nothing is left to learn from probing the other endpoints
+        api_client.endpoints.close()
 
     if not connection_successful:
         raise CannotConnect
 
     # Return validated data
-    return {
-        CONF_STATION_ID: data[CONF_STATION_ID],
-        CONF_UPDATE_INTERVAL: data[CONF_UPDATE_INTERVAL],
-    }
+    return {**data, CONF_BASE_URLS: ", ".join(base_urls)}
 
 
 class PVMicroinverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -67,8 +209,32 @@ class PVMicroinverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> PVMicroinverterOptionsFlow:
+        """Return the options flow."""
+        return PVMicroinverterOptionsFlow()
+
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._account_client: PVMicroinverterAccountClient | None = None
+        self._base_urls = DEFAULT_BASE_URLS
+        self._stations: dict[str, str] = {}
+
+    @callback
+    def async_remove(self) -> None:
+        """Cancel the endpoint probes of the account client with the flow."""
+        if self._account_client is not None:
+            self._account_client.endpoints.close()
+
     async def async_step_user(self, user_input: dict[str, Any] = None) -> FlowResult:
-        """Handle the initial step."""
+        """Let the user add a single station or the stations of an account."""
+        return self.async_show_menu(step_id="user", menu_options=["station", "account"])
+
+    async def async_step_station(self, user_input: dict[str, Any] = None) -> FlowResult:
+        """Handle adding a single station."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -79,12 +245,17 @@ class PVMicroinverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(user_input[CONF_STATION_ID])
                 self._abort_if_unique_id_configured()
 
+                # The webhook keeps its ID when it is disabled and enabled again
+                info[CONF_WEBHOOK_ID] = webhook.async_generate_id()
+
                 return self.async_create_entry(
                     title=f"PV Microinverter {user_input[CONF_STATION_ID]}",
                     data=info,
                 )
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except InvalidBaseUrls:
+                errors[CONF_BASE_URLS] = "invalid_base_urls"
             except InvalidAuth:
                 errors["base"] = "invalid_auth"
             except Exception:  # pylint: disable=broad-except
@@ -92,7 +263,143 @@ class PVMicroinverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "unknown"
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="station", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_account(self, user_input: dict[str, Any] = None) -> FlowResult:
+        """List the stations of a portal account."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                base_urls = parse_base_urls(user_input[CONF_BASE_URLS])
+                client = PVMicroinverterAccountClient(
+                    session=async_get_clientsession(self.hass),
+                    username=user_input[CONF_USERNAME],
+                    password=user_input[CONF_PASSWORD],
+                    base_url=base_urls,
+                )
+                stations = await client.async_get_stations()
+            except ValueError:
+                errors[CONF_BASE_URLS] = "invalid_base_urls"
+            except PVMicroinverterAuthError:
+                errors["base"] = "invalid_auth"
+            except PVMicroinverterApiClientError:
+                errors["base"] = "cannot_connect"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                configured = self._async_current_ids()
+                self._stations = {
+                    station.station_id: f"{station.name} ({station.station_id})"
+                    if station.name
+                    else station.station_id
+                    for station in stations
+                    if station.station_id not in configured
+                }
+                if not self._stations:
+                    return self.async_abort(reason="no_new_stations")
+                self._account_client = client
+                self._base_urls = ", ".join(base_urls)
+                return await self.async_step_select()
+
+        return self.async_show_form(
+            step_id="account", data_schema=STEP_ACCOUNT_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_select(self, user_input: dict[str, Any] = None) -> FlowResult:
+        """Add the selected stations of the account, one entry per station."""
+        errors: dict[str, str] = {}
+        selected = list(self._stations)
+        unreachable = ""
+
+        if user_input is not None:
+            selected = user_input[CONF_STATIONS]
+            if not selected:
+                errors[CONF_STATIONS] = "no_stations_selected"
+            else:
+                reachable = await self._account_client.async_check_stations(selected)
+                if len(reachable) == len(selected):
+                    return await self._async_create_entries(selected)
+                # Offer the reachable ones, so that they can be added right away
+                unreachable = ", ".join(sorted(set(selected) - reachable))
+                selected = [
+                    station_id for station_id in selected if station_id in reachable
+                ]
+                errors["base"] = "cannot_connect_stations"
+
+        return self.async_show_form(
+            step_id="select",
+            data_schema=vol.Schema({
+                vol.Required(CONF_STATIONS, default=selected): cv.multi_select(
+                    self._stations
+                ),
+            }),
+            errors=errors,
+            description_placeholders={
+                "count": str(len(self._stations)),
+                "unreachable": unreachable or "-",
+            },
+        )
+
+    async def _async_create_entries(self, station_ids: list[str]) -> FlowResult:
+        """Create an entry with the default settings for each station.
+
+        A flow creates one entry, so all but the first station are handed to
+        import flows. Those are awaited, so that stations they did not add, e.g.
+        because they were set up meanwhile, are reported when the flow finishes.
+        """
+        first, *others = station_ids
+        results = await asyncio.gather(
+            *(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_IMPORT},
+                    data={CONF_STATION_ID: station_id, CONF_BASE_URLS: self._base_urls},
+                )
+                for station_id in others
+            ),
+            return_exceptions=True,
+        )
+        skipped: dict[str, str] = {}
+        for station_id, result in zip(others, results, strict=True):
+            if isinstance(result, Exception):
+                skipped[station_id] = str(result) or type(result).__name__
+            elif result["type"] is not FlowResultType.CREATE_ENTRY:
+                skipped[station_id] = result.get("reason") or str(result["type"])
+        if skipped:
+            _LOGGER.warning(
+                "Did not add the stations %s",
+                ", ".join(
+                    f"{station_id} ({reason})" for station_id, reason in skipped.items()
+                ),
+            )
+
+        return await self._async_create_station_entry(
+            {CONF_STATION_ID: first, CONF_BASE_URLS: self._base_urls}, skipped
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create the entry of a station that was already validated."""
+        return await self._async_create_station_entry(import_data)
+
+    async def _async_create_station_entry(
+        self, import_data: dict[str, Any], skipped: dict[str, str] | None = None
+    ) -> FlowResult:
+        """Create the entry of a validated station, listing skipped stations."""
+        await self.async_set_unique_id(import_data[CONF_STATION_ID])
+        self._abort_if_unique_id_configured()
+
+        data = STEP_USER_DATA_SCHEMA(import_data)
+        data[CONF_WEBHOOK_ID] = webhook.async_generate_id()
+        return self.async_create_entry(
+            title=f"PV Microinverter {data[CONF_STATION_ID]}",
+            data=data,
+            description="stations_skipped" if skipped else None,
+            description_placeholders={"skipped": ", ".join(skipped)}
+            if skipped
+            else None,
         )
 
     async def async_step_reauth(self, user_input: dict[str, Any] = None) -> FlowResult:
@@ -101,23 +408,29 @@ class PVMicroinverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             try:
-                info = await validate_input(self.hass, user_input)
-
                 # Get existing entry
                 existing_entry = await self.async_set_unique_id(
                     user_input[CONF_STATION_ID]
                 )
-
-                if existing_entry:
-                    self.hass.config_entries.async_update_entry(
-                        existing_entry, data=info
+                if existing_entry is None:
+                    return self.async_abort(
+                        reason="reauth_failed_existing_entry_not_found"
                     )
-                    await self.hass.config_entries.async_reload(existing_entry.entry_id)
-                    return self.async_abort(reason="reauth_successful")
 
-                return self.async_abort(reason="reauth_failed_existing_entry_not_found")
+                # Check the station with the endpoints the entry is set up with
+                await validate_input(
+                    self.hass,
+                    {**existing_entry.data, **existing_entry.options, **user_input},
+                )
+                self.hass.config_entries.async_update_entry(
+                    existing_entry, data={**existing_entry.data, **user_input}
+                )
+                await self.hass.config_entries.async_reload(existing_entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except InvalidBaseUrls:
+                errors[CONF_BASE_URLS] = "invalid_base_urls"
             except InvalidAuth:
                 errors["base"] = "invalid_auth"
             except Exception:  # pylint: disable=broad-except
@@ -125,7 +438,46 @@ class PVMicroinverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "unknown"
 
         return self.async_show_form(
-            step_id="reauth", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="reauth", data_schema=STEP_REAUTH_DATA_SCHEMA, errors=errors
+        )
+
+
+class PVMicroinverterOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for PV Microinverter.
+
+    All settings except the station can be changed here. They are applied to the
+    running coordinator and sensors without reloading the entry.
+    """
+
+    async def async_step_init(self, user_input: dict[str, Any] = None) -> FlowResult:
+        """Manage the options."""
+        options = {**self.config_entry.data, **self.config_entry.options}
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                base_urls = parse_base_urls(user_input[CONF_BASE_URLS])
+            except ValueError:
+                errors[CONF_BASE_URLS] = "invalid_base_urls"
+            else:
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **user_input,
+                        CONF_BASE_URLS: ", ".join(base_urls),
+                        CONF_WEBHOOK_ID: options.get(CONF_WEBHOOK_ID)
+                        or webhook.async_generate_id(),
+                    },
+                )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=_options_schema(options),
+            errors=errors,
+            description_placeholders={
+                "webhook_path": webhook.async_generate_path(options[CONF_WEBHOOK_ID])
+                if CONF_WEBHOOK_ID in options
+                else "-"
+            },
         )
 
 
@@ -135,3 +487,7 @@ class CannotConnect(HomeAssistantError):
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
+
+
+class InvalidBaseUrls(HomeAssistantError):
+    """Error to indicate the portal endpoints are not valid URLs."""
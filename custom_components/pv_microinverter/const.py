@@ -6,12 +6,56 @@ from typing import Final
 DOMAIN: Final = "pv_microinverter"
 MANUFACTURER: Final = "Envertech"
 
+# Integration-wide objects in hass.data
+DATA_SCHEDULER: Final = f"{DOMAIN}_scheduler"
+DATA_FAILURE_TELEMETRY: Final = f"{DOMAIN}_failure_telemetry"
+DATA_PROFILER: Final = f"{DOMAIN}_profiler"
+DATA_WRITE_COALESCER: Final = f"{DOMAIN}_write_coalescer"
+DATA_METADATA_CACHE: Final = f"{DOMAIN}_metadata_cache"
+DATA_FLEET_MONITOR: Final = f"{DOMAIN}_fleet_monitor"
+DATA_SAMPLE_STORE: Final = f"{DOMAIN}_sample_store"
+DATA_ENDPOINT_POOLS: Final = f"{DOMAIN}_endpoint_pools"
+
+# Dispatcher signal sent after the options of an entry were applied in place,
+# formatted with the entry ID
+SIGNAL_OPTIONS_UPDATED: Final = f"{DOMAIN}_options_updated_{{}}"
+
 # Config flow
 CONF_STATION_ID: Final = "station_id"
 CONF_UPDATE_INTERVAL: Final = "update_interval"
+CONF_POWER_DEADBAND: Final = "power_deadband"
+CONF_POWER_DEADBAND_PERCENT: Final = "power_deadband_percent"
+CONF_STATE_HEARTBEAT: Final = "state_heartbeat"
+CONF_ENABLE_STATISTICS: Final = "enable_statistics"
+CONF_ENABLE_PERFORMANCE: Final = "enable_performance"
+CONF_RECORD_RESPONSES: Final = "record_responses"
+CONF_REQUEST_TIMEOUT: Final = "request_timeout"
+CONF_ENABLE_HEDGING: Final = "enable_hedging"
+CONF_ENABLE_WEBHOOK: Final = "enable_webhook"
+CONF_FALLBACK_INTERVAL: Final = "fallback_interval"
+CONF_ENABLE_ANOMALY: Final = "enable_anomaly"
+CONF_BASE_URLS: Final = "base_urls"
+CONF_STATIONS: Final = "stations"
+CONF_IDLE_INTERVAL: Final = "idle_interval"
+CONF_WRITE_WINDOW: Final = "write_window"
 
 # Default values
 DEFAULT_UPDATE_INTERVAL: Final = 60  # 1 minute
+DEFAULT_POWER_DEADBAND: Final = 5.0  # W
+DEFAULT_POWER_DEADBAND_PERCENT: Final = 1.0  # % of the last written value
+DEFAULT_STATE_HEARTBEAT: Final = 900  # 15 minutes
+DEFAULT_ENABLE_STATISTICS: Final = False
+DEFAULT_ENABLE_PERFORMANCE: Final = False
+DEFAULT_RECORD_RESPONSES: Final = False
+DEFAULT_REQUEST_TIMEOUT: Final = 15  # seconds
+DEFAULT_ENABLE_HEDGING: Final = False
+DEFAULT_ENABLE_WEBHOOK: Final = False
+DEFAULT_FALLBACK_INTERVAL: Final = 1800  # 30 minutes, 0 disables polling
+DEFAULT_ENABLE_ANOMALY: Final = False
+DEFAULT_BASE_URL: Final = "https://www.envertecportal.com/ApiStations"
+DEFAULT_BASE_URLS: Final = DEFAULT_BASE_URL  # comma-separated, most preferred first
+DEFAULT_IDLE_INTERVAL: Final = 3600  # 1 hour, 0 always polls at the full rate
+DEFAULT_WRITE_WINDOW: Final = 0  # seconds, 0 writes states on the next loop tick
 
 # Entity attributes
 ATTR_LAST_UPDATED: Final = "last_updated"
@@ -41,12 +85,71 @@ SENSOR_TYPES: Final = {
     },
 }
 
+# Optional sensors derived from the recent power samples
+STATISTICS_SENSOR_TYPES: Final = {
+    "average_power_15m": {
+        "name": "Average Power (15 min)",
+        "icon": "mdi:solar-power",
+        "unit": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+    },
+    "average_power_1h": {
+        "name": "Average Power (1 h)",
+        "icon": "mdi:solar-power",
+        "unit": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+    },
+    "peak_power_today": {
+        "name": "Peak Power Today",
+        "icon": "mdi:solar-power-variant",
+        "unit": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+    },
+    "power_ramp_rate": {
+        "name": "Power Ramp Rate",
+        "icon": "mdi:chart-line-variant",
+        "unit": "W/min",
+        "state_class": "measurement",
+    },
+}
+
+# Optional sensors comparing the output with a clear-sky model of the station
+PERFORMANCE_SENSOR_TYPES: Final = {
+    "expected_power": {
+        "name": "Expected Clear-Sky Power",
+        "icon": "mdi:weather-sunny",
+        "unit": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+    },
+    "performance_ratio": {
+        "name": "Performance Ratio",
+        "icon": "mdi:gauge",
+        "unit": "%",
+        "state_class": "measurement",
+    },
+}
+
+
+# Optional sensors comparing the station's specific yield with the whole fleet
+ANOMALY_SENSOR_TYPES: Final = {
+    "yield_anomaly_score": {
+        "name": "Yield Anomaly Score",
+        "icon": "mdi:chart-bell-curve",
+        "unit": None,
+        "state_class": "measurement",
+    },
+}
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PVMicroinverterData:
     """Class to hold PV microinverter data."""
 
     current_power: float
     today_energy: float
     lifetime_energy: float
-    last_updated: str
+    last_updated: float  # POSIX timestamp, formatted only for display
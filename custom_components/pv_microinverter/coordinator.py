@@ -1,19 +1,74 @@
 """Data update coordinator for PV Microinverter integration."""
 
 import logging
+import time
+from collections.abc import Callable
 from datetime import timedelta
+from pathlib import Path
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
 
-from .api import PVMicroinverterApiClient, PVMicroinverterApiClientError
-from .const import DOMAIN, PVMicroinverterData
+from .anomaly import async_get_fleet_monitor
+from .api import (
+    PVMicroinverterApiClient,
+    PVMicroinverterApiClientError,
+    StationMetadata,
+)
+from .clearsky import ClearSkyModel
+from .coalescer import async_get_write_coalescer
+from .const import (
+    CONF_BASE_URLS,
+    CONF_ENABLE_HEDGING,
+    CONF_ENABLE_WEBHOOK,
+    CONF_FALLBACK_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_RECORD_RESPONSES,
+    CONF_REQUEST_TIMEOUT,
+    CONF_UPDATE_INTERVAL,
+    CONF_WRITE_WINDOW,
+    DATA_PROFILER,
+    DEFAULT_BASE_URLS,
+    DEFAULT_ENABLE_HEDGING,
+    DEFAULT_ENABLE_WEBHOOK,
+    DEFAULT_FALLBACK_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_RECORD_RESPONSES,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WRITE_WINDOW,
+    DOMAIN,
+    PVMicroinverterData,
+)
+from .endpoints import (
+    EndpointPool,
+    async_get_endpoint_pool,
+    async_release_endpoint_pool,
+    parse_base_urls,
+)
+from .metadata import StationMetadataCache
+from .replay import ResponseRecorder
+from .rolling import PowerStatistics
+from .samplestore import StationSamples, async_get_sample_store
+from .scheduler import async_get_scheduler
+from .telemetry import async_get_failure_telemetry
+from .webhook import async_register_webhook
 
 _LOGGER = logging.getLogger(__name__)
 
+# Time between two pushed readings kept in the statistics, used to size their
+# buffers. Denser readings are thinned out, see PowerStatistics.
+PUSH_SAMPLE_INTERVAL = 10
+
 
 class PVMicroinverterDataUpdateCoordinator(DataUpdateCoordinator[PVMicroinverterData]):
     """Class to manage fetching PV Microinverter data."""
@@ -21,23 +76,285 @@ class PVMicroinverterDataUpdateCoordinator(DataUpdateCoordinator[PVMicroinverter
     def __init__(
         self,
         hass: HomeAssistant,
+        config_entry: ConfigEntry,
         api_client: PVMicroinverterApiClient,
         update_interval: int,
+        metadata_cache: StationMetadataCache | None = None,
     ) -> None:
         """Initialize the coordinator.
 
         Args:
             hass: The Home Assistant instance
+            config_entry: The config entry of the station
             api_client: The API client
             update_interval: The update interval in seconds
+            metadata_cache: The cache to persist the station metadata in
         """
+        # Polls are triggered by the integration-wide scheduler rather than by a
+        # per-coordinator timer, so the built-in interval is left unset.
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=config_entry,
             name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=None,
         )
         self.api_client = api_client
+        # None while readings are pushed and fallback polling is disabled
+        self._active_poll_interval: timedelta | None = timedelta(
+            seconds=update_interval
+        )
+        # Slower interval used while nobody listens, None to always poll at full rate
+        self._idle_poll_interval: timedelta | None = None
+        # The interval the scheduler was last given
+        self._scheduled_interval = self._active_poll_interval
+        self._sample_interval = update_interval
+        # Longest time the entities hold back a state write to coalesce it
+        self.write_window: float = DEFAULT_WRITE_WINDOW
+        self.power_statistics = PowerStatistics(update_interval)
+        # Raw samples persisted across restarts, once opened
+        self.samples: StationSamples | None = None
+        self._webhook_id: str | None = None
+        self._unregister_webhook: CALLBACK_TYPE | None = None
+        # The integration-wide endpoint pool in use, once the options are applied
+        self._endpoint_pool: EndpointPool | None = None
+        self._last_push: float | None = None
+        self.clear_sky: ClearSkyModel | None = None
+        self.metadata_cache = metadata_cache
+        self._metadata: StationMetadata | None = None
+        self.failure_telemetry = async_get_failure_telemetry(hass)
+        self.fleet_monitor = async_get_fleet_monitor(hass)
+
+    async def async_refresh(self) -> None:
+        """Refresh data, under the profiler if one is armed."""
+        if (profiler := self.hass.data.get(DATA_PROFILER)) is None:
+            await super().async_refresh()
+            return
+
+        with profiler.profile_update():
+            await super().async_refresh()
+            # Include the state writes triggered by this update in the profile
+            async_get_write_coalescer(self.hass).async_flush()
+
+    @property
+    def has_demand(self) -> bool:
+        """Return whether any enabled entity or other listener uses the data."""
+        return bool(self._listeners)
+
+    @property
+    def poll_interval(self) -> timedelta | None:
+        """Return the current poll interval, or None if the station is not polled.
+
+        Without demand, the station is only kept alive at the idle interval.
+        """
+        interval = self._active_poll_interval
+        if interval is None or self._idle_poll_interval is None or self.has_demand:
+            return interval
+        return max(interval, self._idle_poll_interval)
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, polling at the full rate while anyone listens.
+
+        Entities only subscribe while they are enabled and added, so the
+        listeners reflect the demand for the data of this station.
+        """
+        had_demand = self.has_demand
+        remove_listener = super().async_add_listener(update_callback, context)
+        if not had_demand:
+            self._async_demand_changed()
+
+        @callback
+        def _async_remove_listener() -> None:
+            remove_listener()
+            if not self.has_demand:
+                self._async_demand_changed()
+
+        return _async_remove_listener
+
+    @callback
+    def _async_demand_changed(self) -> None:
+        """Switch between the full and the idle poll interval."""
+        station_id = self.api_client.station_id
+        if not self.has_demand:
+            # A stale reading of an idle station would skew the fleet comparison
+            self.fleet_monitor.update(station_id, None, None)
+        elif self.data is not None:
+            self._update_fleet_monitor(self.data)
+
+        interval = self.poll_interval
+        if interval == self._scheduled_interval:
+            return
+        _LOGGER.debug(
+            "Polling station %s every %s (%s)",
+            station_id,
+            interval,
+            "in demand" if self.has_demand else "idle",
+        )
+        self._async_reschedule()
+
+        # Catch up right away rather than at the next slot of the full interval
+        if (
+            self.has_demand
+            and interval is not None
+            and (
+                self.data is None
+                or time.time() - self.data.last_updated >= interval.total_seconds()
+            )
+        ):
+            self.hass.async_create_background_task(
+                self.async_refresh(), name=f"{DOMAIN} catch up {station_id}"
+            )
+
+    @callback
+    def _async_reschedule(self) -> None:
+        """Hand the current poll interval to the scheduler."""
+        self._scheduled_interval = self.poll_interval
+        async_get_scheduler(self.hass).async_reschedule(self)
+
+    @property
+    def metadata(self) -> StationMetadata | None:
+        """Return the metadata of the station, once known."""
+        return self._metadata
+
+    @property
+    def options(self) -> dict[str, Any]:
+        """Return the effective settings, with options taking precedence over data."""
+        return {**self.config_entry.data, **self.config_entry.options}
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply the current options to the running coordinator and API client.
+
+        Changes take effect without reloading the entry: a new poll interval is
+        handed to the scheduler and the rolling statistics keep their samples.
+        """
+        options = self.options
+        api_client = self.api_client
+        api_client.request_timeout = options.get(
+            CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT
+        )
+        api_client.hedging = options.get(CONF_ENABLE_HEDGING, DEFAULT_ENABLE_HEDGING)
+        self.write_window = options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW)
+        # Stations on the same endpoints share their view of the healthiest one.
+        # Taken before releasing the previous one, so an unchanged pool is kept.
+        endpoint_pool = async_get_endpoint_pool(
+            self.hass,
+            parse_base_urls(options.get(CONF_BASE_URLS, DEFAULT_BASE_URLS)),
+        )
+        self.async_unload_endpoints()
+        self._endpoint_pool = api_client.endpoints = endpoint_pool
+
+        # Optionally capture the raw responses for later replay
+        if not options.get(CONF_RECORD_RESPONSES, DEFAULT_RECORD_RESPONSES):
+            api_client.recorder = None
+        elif api_client.recorder is None:
+            api_client.recorder = ResponseRecorder(
+                Path(
+                    self.hass.config.path(
+                        DOMAIN,
+                        "recordings",
+                        f"{slugify(api_client.station_id)}.ndjson.gz",
+                    )
+                )
+            )
+
+        # With pushed readings, polling is only a slow fallback
+        update_interval = options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
+        push = options.get(CONF_ENABLE_WEBHOOK, DEFAULT_ENABLE_WEBHOOK)
+        if push:
+            fallback_interval = options.get(
+                CONF_FALLBACK_INTERVAL, DEFAULT_FALLBACK_INTERVAL
+            )
+            poll_interval = (
+                timedelta(seconds=fallback_interval) if fallback_interval else None
+            )
+            sample_interval = PUSH_SAMPLE_INTERVAL
+        else:
+            poll_interval = timedelta(seconds=update_interval)
+            sample_interval = update_interval
+
+        if sample_interval != self._sample_interval:
+            self._sample_interval = sample_interval
+            self.power_statistics.resize(sample_interval)
+
+        idle_interval = options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL)
+        self._active_poll_interval = poll_interval
+        self._idle_poll_interval = (
+            timedelta(seconds=idle_interval) if idle_interval else None
+        )
+        if self.poll_interval != self._scheduled_interval:
+            _LOGGER.debug(
+                "Changing poll interval of station %s to %s",
+                api_client.station_id,
+                self.poll_interval,
+            )
+            self._async_reschedule()
+
+        self._async_set_webhook(options.get(CONF_WEBHOOK_ID) if push else None)
+
+    @callback
+    def _async_set_webhook(self, webhook_id: str | None) -> None:
+        """Register the webhook with the given ID, replacing the current one."""
+        if webhook_id == self._webhook_id:
+            return
+
+        self.async_unload_webhook()
+        if webhook_id is not None:
+            self._unregister_webhook = async_register_webhook(
+                self.hass, self, webhook_id
+            )
+            self._webhook_id = webhook_id
+
+    @callback
+    def async_unload_endpoints(self) -> None:
+        """Stop using the integration-wide endpoint pool."""
+        if self._endpoint_pool is not None:
+            async_release_endpoint_pool(self.hass, self._endpoint_pool)
+        self._endpoint_pool = None
+
+    @callback
+    def async_unload_webhook(self) -> None:
+        """Stop accepting pushed readings."""
+        if self._unregister_webhook is not None:
+            self._unregister_webhook()
+        self._unregister_webhook = None
+        self._webhook_id = None
+
+    @callback
+    def async_push_readings(self, readings: list[PVMicroinverterData]) -> int:
+        """Take over readings pushed to the station's webhook.
+
+        Readings that are not newer than the current data are dropped, the others
+        are fed into the statistics in order and the newest one becomes the new
+        data of the coordinator.
+
+        Args:
+            readings: The pushed readings, in any order
+
+        Returns:
+            int: The number of accepted readings
+        """
+        latest = self.data.last_updated if self.data is not None else None
+        accepted = sorted(
+            (
+                reading
+                for reading in readings
+                if latest is None or reading.last_updated > latest
+            ),
+            key=lambda reading: reading.last_updated,
+        )
+        if not accepted:
+            return 0
+
+        for reading in accepted:
+            self._add_sample(reading)
+        self._update_fleet_monitor(accepted[-1])
+        self._last_push = time.monotonic()
+        self.async_set_updated_data(accepted[-1])
+        return len(accepted)
 
     async def _async_update_data(self) -> PVMicroinverterData:
         """Fetch data from the API.
@@ -48,7 +365,101 @@ class PVMicroinverterDataUpdateCoordinator(DataUpdateCoordinator[PVMicroinverter
         Raises:
             UpdateFailed: If the update fails
         """
+        # Skip the fallback poll while readings are being pushed
+        if (
+            self._last_push is not None
+            and self._active_poll_interval is not None
+            and self.data is not None
+            and time.monotonic() - self._last_push
+            < self._active_poll_interval.total_seconds()
+        ):
+            return self.data
+
+        station_id = self.api_client.station_id
         try:
-            return await self.api_client.async_get_data()
+            data = await self.api_client.async_get_data()
         except PVMicroinverterApiClientError as error:
+            self.failure_telemetry.async_record_failure(station_id, error)
+            self.fleet_monitor.update(station_id, None, None)
             raise UpdateFailed(f"Error communicating with API: {error}") from error
+
+        self.failure_telemetry.async_record_success(station_id)
+        self._add_sample(data)
+        if self.api_client.metadata is not self._metadata:
+            self._async_update_metadata()
+        self._update_fleet_monitor(data)
+        return data
+
+    @callback
+    def _async_update_metadata(self) -> None:
+        """Take over new station metadata from the API client."""
+        metadata = self.api_client.metadata
+        self._metadata = metadata
+        station_id = self.api_client.station_id
+        if self.metadata_cache is not None:
+            self.metadata_cache.async_set(
+                station_id, metadata, self.api_client.metadata_fetched
+            )
+
+        if (
+            metadata.latitude is None
+            or metadata.longitude is None
+            or metadata.capacity is None
+        ):
+            _LOGGER.debug("Location or capacity of station %s unknown", station_id)
+            self.clear_sky = None
+        else:
+            self.clear_sky = ClearSkyModel(
+                metadata.latitude, metadata.longitude, metadata.capacity
+            )
+
+        # Only exists once the entities have been added
+        device_registry = dr.async_get(self.hass)
+        device = device_registry.async_get_device(identifiers={(DOMAIN, station_id)})
+        if device is not None:
+            device_registry.async_update_device(
+                device.id,
+                name=metadata.name or device.name,
+                model=metadata.model or device.model,
+            )
+
+    def _update_fleet_monitor(self, data: PVMicroinverterData) -> None:
+        """Report the current power to the cross-station comparison."""
+        if not self.has_demand:
+            # Idle stations are left out, see _async_demand_changed
+            return
+        metadata = self._metadata
+        self.fleet_monitor.update(
+            self.api_client.station_id,
+            data.current_power,
+            metadata.capacity if metadata is not None else None,
+        )
+
+    @callback
+    def async_seed_statistics(self) -> None:
+        """Fill the rolling statistics with the stored samples of the last hour.
+
+        Samples since the start of the local day are included as well, so that the
+        peak of the day survives a restart.
+        """
+        if self.samples is None:
+            return
+        now = time.time()
+        start = min(
+            now - PowerStatistics.WINDOW_1H, dt_util.start_of_local_day().timestamp()
+        )
+        for timestamp, current_power, _ in self.samples.query(start, now).tolist():
+            self._add_statistics(timestamp, current_power)
+
+    def _add_sample(self, data: PVMicroinverterData) -> None:
+        """Feed a reading into the rolling power statistics and the sample file."""
+        self._add_statistics(data.last_updated, data.current_power)
+        if self.samples is not None:
+            async_get_sample_store(self.hass).async_append(
+                self.samples, data.last_updated, data.current_power, data.today_energy
+            )
+
+    def _add_statistics(self, timestamp: float, current_power: float) -> None:
+        """Feed a power sample into the rolling power statistics."""
+        day = dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).toordinal()
+        self.power_statistics.add(timestamp, current_power, day)
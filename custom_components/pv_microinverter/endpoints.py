@@ -0,0 +1,287 @@
+"""Selection of the healthiest of several PV Microinverter portal endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import (
+    Callable,
+    Collection,
+    Coroutine,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from dataclasses import dataclass
+from typing import Any, Final
+from urllib.parse import urlsplit
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_ENDPOINT_POOLS, DEFAULT_REQUEST_TIMEOUT, DOMAIN
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA: Final = 0.2
+
+# Endpoints failing at least this often are only used if all others are worse
+DEMOTE_ERROR_RATE: Final = 0.5
+
+# Floor of the success rate, so that the expected latency stays finite
+MIN_SUCCESS_RATE: Final = 0.05
+
+# Another endpoint only takes over if its expected latency is this much lower,
+# so that two similar endpoints do not take turns on every request
+SWITCH_MARGIN: Final = 0.8
+
+# Endpoints that did not serve a request for this many seconds are probed
+PROBE_INTERVAL: Final = 300
+
+
+class EndpointHealth:
+    """Moving averages of the latency and the error rate of one endpoint."""
+
+    __slots__ = ("error_rate", "last_checked", "latency", "url")
+
+    def __init__(self, url: str) -> None:
+        """Initialize the health of an endpoint that was not used yet.
+
+        Args:
+            url: The base URL of the endpoint
+        """
+        self.url = url
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        # Monotonic time of the last request or probe
+        self.last_checked: float | None = None
+
+    def __repr__(self) -> str:
+        """Return a summary of the health for debugging."""
+        return (
+            f"EndpointHealth({self.url!r}, latency={self.latency},"
+            f" error_rate={self.error_rate:.2f})"
+        )
+
+    @property
+    def demoted(self) -> bool:
+        """Return whether the endpoint fails too often to be used."""
+        return self.error_rate >= DEMOTE_ERROR_RATE
+
+    @property
+    def expected_latency(self) -> float:
+        """Return the expected time to a successful response, inf if unknown."""
+        if self.latency is None:
+            return math.inf
+        return self.latency / max(1 - self.error_rate, MIN_SUCCESS_RATE)
+
+    def record(self, latency: float, failed: bool) -> None:
+        """Fold the outcome of a request into the moving averages."""
+        if self.latency is None:
+            self.latency = latency
+            self.error_rate = float(failed)
+        else:
+            self.latency += EWMA_ALPHA * (latency - self.latency)
+            self.error_rate += EWMA_ALPHA * (failed - self.error_rate)
+
+
+class EndpointPool:
+    """Ordered endpoints serving the same API, ranked by their health.
+
+    Requests go to the endpoint with the lowest expected latency, i.e. the
+    average latency divided by the success rate, where every failure counts as
+    `failure_latency`. Endpoints failing more often than `DEMOTE_ERROR_RATE`
+    are demoted behind all others. Endpoints nobody has heard from yet rank in
+    the given order, after all known ones, and the first endpoint is used until
+    another one is known to be faster.
+
+    Endpoints that do not serve requests are probed in the background every
+    `PROBE_INTERVAL` seconds, so that a recovered or faster endpoint takes over
+    again. Pending probes are cancelled by `close`. The pool can be shared
+    between the API clients of all stations, as the health of an endpoint does
+    not depend on the station.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        failure_latency: float = DEFAULT_REQUEST_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+        create_task: Callable[
+            [Coroutine[Any, Any, None]], asyncio.Task[None]
+        ] = asyncio.ensure_future,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            urls: The base URLs of the endpoints, most preferred first
+            failure_latency: The latency a failed request counts as in seconds
+            clock: The monotonic clock to schedule probes with
+            create_task: Starts a probe in the background
+
+        Raises:
+            ValueError: If no URL is given
+        """
+        urls = _normalize_urls(urls)
+        if not urls:
+            raise ValueError("At least one endpoint is required")
+        self._endpoints = {url: EndpointHealth(url) for url in urls}
+        self._current = urls[0]
+        self.failure_latency = failure_latency
+        self._clock = clock
+        self._create_task = create_task
+        self._probes: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        """Return the number of endpoints."""
+        return len(self._endpoints)
+
+    def __iter__(self) -> Iterator[EndpointHealth]:
+        """Iterate over the health of the endpoints, in the given order."""
+        return iter(self._endpoints.values())
+
+    @property
+    def urls(self) -> list[str]:
+        """Return the base URLs of the endpoints, in the given order."""
+        return list(self._endpoints)
+
+    @property
+    def current(self) -> str:
+        """Return the base URL of the endpoint serving requests."""
+        return self._current
+
+    def select(self, exclude: Collection[str] = ()) -> str:
+        """Return the base URL of the healthiest endpoint.
+
+        Args:
+            exclude: Endpoints already tried for the current request, which are
+                only returned if there is no other one left
+        """
+        candidates = [
+            health for url, health in self._endpoints.items() if url not in exclude
+        ] or list(self._endpoints.values())
+        best = min(
+            candidates,
+            key=lambda health: (health.demoted, health.expected_latency),
+        )
+        if exclude:
+            return best.url
+
+        current = self._endpoints[self._current]
+        if (
+            best is not current
+            and best.demoted == current.demoted
+            and best.expected_latency > SWITCH_MARGIN * current.expected_latency
+        ):
+            return current.url
+        self._current = best.url
+        return best.url
+
+    def record_success(self, url: str, latency: float) -> None:
+        """Record a successful request to an endpoint."""
+        if (health := self._endpoints.get(url)) is not None:
+            health.record(latency, failed=False)
+            health.last_checked = self._clock()
+
+    def record_failure(self, url: str) -> None:
+        """Record a failed or timed out request to an endpoint."""
+        if (health := self._endpoints.get(url)) is not None:
+            health.record(self.failure_latency, failed=True)
+            health.last_checked = self._clock()
+
+    def due_probes(self) -> list[str]:
+        """Return the idle endpoints to probe now, and mark them as checked."""
+        now = self._clock()
+        due = []
+        for url, health in self._endpoints.items():
+            if url == self._current:
+                continue
+            if health.last_checked is None or now - health.last_checked >= (
+                PROBE_INTERVAL
+            ):
+                # Claimed, so that concurrent clients do not probe it again
+                health.last_checked = now
+                due.append(url)
+        return due
+
+    def schedule_probes(
+        self, probe: Callable[[str], Coroutine[Any, Any, None]]
+    ) -> None:
+        """Probe the idle endpoints that are due in the background.
+
+        Args:
+            probe: Sends one request to the given endpoint and records its outcome
+        """
+        for url in self.due_probes():
+            task = self._create_task(probe(url))
+            self._probes.add(task)
+            task.add_done_callback(self._probes.discard)
+
+    def close(self) -> None:
+        """Cancel the pending probes."""
+        for task in self._probes:
+            task.cancel()
+
+
+def _normalize_urls(urls: Iterable[str]) -> list[str]:
+    """Drop duplicates and trailing slashes of base URLs, keeping the order."""
+    return list(dict.fromkeys(url.rstrip("/") for url in urls))
+
+
+def parse_base_urls(value: str) -> list[str]:
+    """Split a comma-separated list of base URLs.
+
+    Raises:
+        ValueError: If there is no URL or one is not an HTTP(S) URL
+    """
+    urls = [url.strip().rstrip("/") for url in value.split(",") if url.strip()]
+    if not urls:
+        raise ValueError("No base URL given")
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError(f"Not an HTTP(S) URL: {url}")
+    return urls
+
+
+@dataclass(slots=True)
+class _SharedPool:
+    """An integration-wide endpoint pool and the number of its users."""
+
+    pool: EndpointPool
+    users: int = 0
+
+
+@callback
+def async_get_endpoint_pool(hass: HomeAssistant, urls: Sequence[str]) -> EndpointPool:
+    """Return the integration-wide pool of the given endpoints, creating it once.
+
+    Every call counts as a user of the pool until `async_release_endpoint_pool`.
+    """
+    pools: dict[tuple[str, ...], _SharedPool] = hass.data.setdefault(
+        DATA_ENDPOINT_POOLS, {}
+    )
+    key = tuple(_normalize_urls(urls))
+    if (shared := pools.get(key)) is None:
+        shared = pools[key] = _SharedPool(
+            EndpointPool(
+                urls,
+                create_task=lambda probe: hass.async_create_background_task(
+                    probe, f"{DOMAIN} endpoint probe"
+                ),
+            )
+        )
+    shared.users += 1
+    return shared.pool
+
+
+@callback
+def async_release_endpoint_pool(hass: HomeAssistant, pool: EndpointPool) -> None:
+    """Stop using an integration-wide pool, dropping it once nobody uses it."""
+    pools: dict[tuple[str, ...], _SharedPool] = hass.data.get(DATA_ENDPOINT_POOLS, {})
+    key = tuple(pool.urls)
+    if (shared := pools.get(key)) is None or shared.pool is not pool:
+        return
+    shared.users -= 1
+    if shared.users <= 0:
+        del pools[key]
+        pool.close()
@@ -1,9 +1,14 @@
 """Base entity for PV Microinverter integration."""
 
+from collections.abc import Iterable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .coalescer import StateWriteCoalescer, async_get_write_coalescer
 from .const import DOMAIN, MANUFACTURER
 from .coordinator import PVMicroinverterDataUpdateCoordinator
 
@@ -28,15 +33,60 @@ class PVMicroinverterEntity(CoordinatorEntity[PVMicroinverterDataUpdateCoordinat
         self._station_id = station_id
         self._sensor_type = sensor_type
         self._attr_unique_id = f"{sensor_type}_{station_id}"
+        # Later metadata changes are written to the registry by the coordinator
+        metadata = coordinator.metadata
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, station_id)},
-            name=f"PV Microinverter {station_id}",
+            name=(metadata and metadata.name) or f"PV Microinverter {station_id}",
             manufacturer=MANUFACTURER,
-            model="Microinverter",
+            model=(metadata and metadata.model) or "Microinverter",
             entry_type=DeviceEntryType.SERVICE,
         )
+        self._coalescer: StateWriteCoalescer | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Look up the shared state write coalescer when added to hass."""
+        # Before subscribing to the coordinator, which may call back right away
+        self._coalescer = async_get_write_coalescer(self.hass)
+        await super().async_added_to_hass()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop a pending state write when removed."""
+        await super().async_will_remove_from_hass()
+        if self._coalescer is not None:
+            self._coalescer.async_discard(self)
+
+    @callback
+    def async_schedule_write(self) -> None:
+        """Write the state together with the other stations' entities.
+
+        The write happens on the next loop tick, or at the end of the
+        coordinator's write window.
+        """
+        self._coalescer.async_schedule_write(self, self.coordinator.write_window)
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return self.coordinator.last_update_success and super().available
+
+
+async def async_remove_entities(
+    hass: HomeAssistant, domain: str, entities: Iterable[PVMicroinverterEntity]
+) -> None:
+    """Remove entities of a disabled option, including their registry entries.
+
+    Otherwise they would linger in the registry as unavailable entities.
+
+    Args:
+        hass: The Home Assistant instance
+        domain: The entity domain of the platform, e.g. "sensor"
+        entities: The entities to remove
+    """
+    registry = er.async_get(hass)
+    for entity in entities:
+        # Entities disabled in the registry were never added
+        if entity.hass is not None:
+            await entity.async_remove()
+        if entity_id := registry.async_get_entity_id(domain, DOMAIN, entity.unique_id):
+            registry.async_remove(entity_id)
@@ -0,0 +1,62 @@
+"""State write filters for PV Microinverter sensors."""
+
+from __future__ import annotations
+
+
+class DeadbandFilter:
+    """Suppress state writes for insignificant value changes.
+
+    A new value is only written if it differs from the last written value by more
+    than the deadband, which is the larger of an absolute threshold and a
+    percentage of the last written value. Regardless of the value, a write is let
+    through once `heartbeat` seconds have passed since the last one, so consumers
+    can tell a stable reading from a stale one.
+    """
+
+    __slots__ = ("absolute", "heartbeat", "percent", "_last_value", "_last_written")
+
+    def __init__(
+        self,
+        absolute: float = 0.0,
+        percent: float = 0.0,
+        heartbeat: float | None = None,
+    ) -> None:
+        """Initialize the filter.
+
+        Args:
+            absolute: The absolute deadband, in the unit of the filtered value
+            percent: The deadband relative to the last written value, in percent
+            heartbeat: The maximum time in seconds between two writes, or None
+        """
+        self.absolute = absolute
+        self.percent = percent
+        self.heartbeat = heartbeat
+        self._last_value: float | None = None
+        self._last_written: float | None = None
+
+    def update(self, value: float | None, now: float) -> bool:
+        """Check a new value and record it as written if it passes the filter.
+
+        Args:
+            value: The new value
+            now: The current monotonic time in seconds
+
+        Returns:
+            bool: True if the value should be written, False if it can be dropped
+        """
+        last_value = self._last_value
+        if (
+            value is None
+            or last_value is None
+            or self._last_written is None
+            or (
+                self.heartbeat is not None
+                and now - self._last_written >= self.heartbeat
+            )
+            or abs(value - last_value)
+            > max(self.absolute, abs(last_value) * self.percent / 100)
+        ):
+            self._last_value = value
+            self._last_written = now
+            return True
+        return False
@@ -0,0 +1,115 @@
+"""Hedged requests for the PV Microinverter API client."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+
+class LatencyTracker:
+    """Latencies of the most recent successful requests."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, size: int = 100) -> None:
+        """Initialize the tracker.
+
+        Args:
+            size: The number of latencies to keep
+        """
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of recorded latencies."""
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        """Record the latency of a request in seconds."""
+        self._samples.append(latency)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the given percentile of the recorded latencies (nearest rank)."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+
+class HedgeBudget:
+    """Token bucket limiting hedged requests to a fraction of all requests.
+
+    Every request earns `ratio` tokens, up to `burst`, and every hedge costs one,
+    so at most `ratio` of all requests are ever duplicated, no matter how slow
+    the portal gets.
+    """
+
+    __slots__ = ("_tokens", "burst", "ratio")
+
+    def __init__(self, ratio: float = 0.1, burst: float = 2.0) -> None:
+        """Initialize the budget.
+
+        Args:
+            ratio: The fraction of requests that may be hedged
+            burst: The maximum number of hedges that can be saved up
+        """
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+
+    def on_request(self) -> None:
+        """Credit a (non-hedge) request."""
+        self._tokens = min(self._tokens + self.ratio, self.burst)
+
+    def try_acquire(self) -> bool:
+        """Take one hedge from the budget, if there is one left."""
+        # Allow for rounding errors of the fractional credits
+        if self._tokens < 1 - 1e-9:
+            return False
+        self._tokens = max(self._tokens - 1, 0.0)
+        return True
+
+
+async def async_hedged[T](
+    request: Callable[[], Awaitable[T]],
+    hedge_delay: float | None,
+    budget: HedgeBudget,
+) -> T:
+    """Run a request, duplicating it if it has not answered after `hedge_delay`.
+
+    Whichever attempt succeeds first wins and the other one is cancelled. An
+    attempt that fails before the hedge delay fails the call right away; once
+    hedged, the call only fails if both attempts fail.
+
+    Args:
+        request: Factory for one attempt of the request
+        hedge_delay: The time in seconds after which to hedge, or None to never hedge
+        budget: The budget that limits the number of hedges
+
+    Returns:
+        T: The result of the first successful attempt
+    """
+    budget.on_request()
+    pending: set[asyncio.Future[T]] = {asyncio.ensure_future(request())}
+    try:
+        if hedge_delay is not None:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return done.pop().result()
+            if budget.try_acquire():
+                pending.add(asyncio.ensure_future(request()))
+
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if (error := task.exception()) is None:
+                    return task.result()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
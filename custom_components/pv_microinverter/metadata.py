@@ -0,0 +1,96 @@
+"""Persistent cache of PV Microinverter station metadata."""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from typing import Any, Final
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import StationMetadata
+from .const import DATA_METADATA_CACHE, DOMAIN
+
+STORAGE_VERSION: Final = 1
+STORAGE_KEY: Final = f"{DOMAIN}.metadata"
+
+# Metadata changes are rare, so batch them into one write
+SAVE_DELAY: Final = 60
+
+
+class StationMetadataCache:
+    """Station metadata of all stations, persisted across restarts.
+
+    Each station's metadata is stored together with the time of the response it
+    was read from, so that a restarted API client only re-reads it once its TTL
+    has passed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache.
+
+        Args:
+            hass: The Home Assistant instance
+        """
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._stations: dict[str, tuple[StationMetadata, float]] = {}
+        self._loaded: asyncio.Future[None] | None = None
+
+    async def async_load(self) -> None:
+        """Load the cache from disk, once."""
+        if self._loaded is None:
+            self._loaded = asyncio.ensure_future(self._async_load())
+        await asyncio.shield(self._loaded)
+
+    async def _async_load(self) -> None:
+        for station_id, stored in (await self._store.async_load() or {}).items():
+            fields = dict(stored["metadata"])
+            fields["inverter_models"] = tuple(fields["inverter_models"])
+            try:
+                metadata = StationMetadata(**fields)
+            except TypeError:
+                # Written by a version with different fields, fetch it again
+                continue
+            self._stations[station_id] = (metadata, stored["fetched"])
+
+    def get(self, station_id: str) -> tuple[StationMetadata, float] | None:
+        """Return the metadata of a station and the time it was fetched."""
+        return self._stations.get(station_id)
+
+    @callback
+    def async_set(
+        self, station_id: str, metadata: StationMetadata, fetched: float
+    ) -> None:
+        """Store the metadata of a station."""
+        cached = self._stations.get(station_id)
+        if cached is not None and cached[0] == metadata:
+            return
+        self._stations[station_id] = (metadata, fetched)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, station_id: str) -> None:
+        """Drop the metadata of a station that was removed."""
+        if self._stations.pop(station_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return {
+            station_id: {
+                "metadata": dataclasses.asdict(metadata),
+                "fetched": fetched,
+            }
+            for station_id, (metadata, fetched) in self._stations.items()
+        }
+
+
+async def async_get_metadata_cache(hass: HomeAssistant) -> StationMetadataCache:
+    """Return the integration-wide metadata cache, loading it on first use."""
+    if (cache := hass.data.get(DATA_METADATA_CACHE)) is None:
+        cache = hass.data[DATA_METADATA_CACHE] = StationMetadataCache(hass)
+    await cache.async_load()
+    return cache
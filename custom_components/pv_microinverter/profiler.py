@@ -0,0 +1,192 @@
+"""On-demand profiling of PV Microinverter coordinator updates."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import importlib.util
+import logging
+import pstats
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _CProfileBackend:
+    """Deterministic profiling with the standard library's cProfile."""
+
+    extension = "prof"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def dump(self, path: str) -> None:
+        self._profile.dump_stats(path)
+
+    def top(self, count: int) -> list[dict[str, Any]]:
+        stats = pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{file_name}:{line}({function})",
+                "calls": calls,
+                "self_time": round(self_time, 6),
+                "cumulative_time": round(cumulative_time, 6),
+            }
+            for (file_name, line, function), (
+                _,
+                calls,
+                self_time,
+                cumulative_time,
+                _,
+            ) in ranked[:count]
+        ]
+
+
+class _PyinstrumentBackend:
+    """Statistical profiling with pyinstrument, which has a lower overhead."""
+
+    extension = "html"
+
+    def __init__(self) -> None:
+        from pyinstrument import Profiler
+
+        # Sample the whole event loop thread instead of a single task
+        self._profiler = Profiler(async_mode="disabled")
+
+    def start(self) -> None:
+        self._profiler.start()
+
+    def stop(self) -> None:
+        self._profiler.stop()
+
+    def dump(self, path: str) -> None:
+        Path(path).write_text(self._profiler.output_html(), encoding="utf-8")
+
+    def top(self, count: int) -> list[dict[str, Any]]:
+        totals: dict[str, list[float]] = {}
+        frames = [self._profiler.last_session.root_frame()]
+        while frames:
+            frame = frames.pop()
+            if frame is None:
+                continue
+            self_time = frame.time - sum(child.time for child in frame.children)
+            entry = totals.setdefault(
+                f"{frame.file_path_short}:{frame.line_no}({frame.function})",
+                [0.0, 0.0],
+            )
+            entry[0] += self_time
+            entry[1] += frame.time
+            frames.extend(frame.children)
+
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {
+                "function": function,
+                "self_time": round(self_time, 6),
+                "cumulative_time": round(cumulative_time, 6),
+            }
+            for function, (self_time, cumulative_time) in ranked[:count]
+        ]
+
+
+class UpdateProfiler:
+    """Profiler armed for a fixed number of coordinator updates.
+
+    Coordinators wrap each update in `profile_update`. The profiler runs while at
+    least one counted update is in progress, so concurrent updates of different
+    stations share one profile. pyinstrument is used if it is installed,
+    cProfile otherwise.
+    """
+
+    def __init__(self, updates: int) -> None:
+        """Initialize the profiler.
+
+        Args:
+            updates: The number of updates to profile
+        """
+        self.remaining = updates
+        self.completed = 0
+        self._active = 0
+        self._running = False
+        self._finished: asyncio.Future[None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        if importlib.util.find_spec("pyinstrument") is not None:
+            self._backend: _CProfileBackend | _PyinstrumentBackend = (
+                _PyinstrumentBackend()
+            )
+        else:
+            self._backend = _CProfileBackend()
+
+    @property
+    def extension(self) -> str:
+        """Return the file extension of the written profile."""
+        return self._backend.extension
+
+    @contextmanager
+    def profile_update(self) -> Generator[None]:
+        """Profile one coordinator update, if any are left to profile."""
+        if self.remaining <= 0:
+            yield
+            return
+
+        if not self._running and not self._start_backend():
+            # Run the update unprofiled, it is not counted
+            yield
+            return
+
+        self.remaining -= 1
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self.completed += 1
+            if not self._active:
+                self._stop_backend()
+                if self.remaining <= 0 and not self._finished.done():
+                    self._finished.set_result(None)
+
+    async def async_wait(self) -> None:
+        """Wait until all requested updates have been profiled."""
+        await asyncio.shield(self._finished)
+
+    def stop(self) -> None:
+        """Stop profiling, even if not all requested updates have happened."""
+        self.remaining = 0
+        self._stop_backend()
+
+    def _start_backend(self) -> bool:
+        """Start profiling, returning whether that was possible."""
+        try:
+            self._backend.start()
+        except ValueError as error:
+            # E.g. "Another profiling tool is already active", such as Home
+            # Assistant's profiler integration
+            _LOGGER.warning("Cannot profile the coordinator update: %s", error)
+            return False
+        self._running = True
+        return True
+
+    def _stop_backend(self) -> None:
+        if self._running:
+            self._backend.stop()
+            self._running = False
+
+    def dump(self, path: str) -> None:
+        """Write the profile to a file. This does blocking I/O."""
+        self._backend.dump(path)
+
+    def top(self, count: int) -> list[dict[str, Any]]:
+        """Return the functions with the highest cumulative time."""
+        return self._backend.top(count)
@@ -0,0 +1,211 @@
+"""Recording and replaying of raw PV Microinverter API responses."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+
+@dataclass(slots=True, frozen=True)
+class RecordedResponse:
+    """A raw API response as captured by the recorder."""
+
+    timestamp: float
+    station_id: str
+    body: bytes
+
+
+class ResponseRecorder:
+    """Append raw API responses to a size-bounded, gzip-compressed log.
+
+    Every record is one JSON line written as its own gzip member, so the file can
+    only ever grow by whole records and stays readable after a crash. Once the
+    file exceeds `max_bytes`, it is rotated like a `RotatingFileHandler` log,
+    keeping `backup_count` older files.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        """Initialize the recorder.
+
+        Args:
+            path: The file to append to
+            max_bytes: The size at which the file is rotated
+            backup_count: The number of rotated files to keep
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def record(self, station_id: str, body: bytes, timestamp: float) -> None:
+        """Append a response. This does blocking I/O."""
+        line = json.dumps({
+            "ts": timestamp,
+            "station_id": station_id,
+            "body": body.decode(),
+        })
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        with gzip.open(self.path, "ab") as file:
+            file.write(line.encode() + b"\n")
+
+    async def async_record(
+        self, station_id: str, body: bytes, timestamp: float | None = None
+    ) -> None:
+        """Append a response from the event loop without blocking it.
+
+        Errors are logged, so a full disk never breaks polling.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.record, station_id, body, timestamp
+            )
+        except OSError as error:
+            _LOGGER.warning("Failed to record response to %s: %s", self.path, error)
+
+    def _rotate(self) -> None:
+        """Shift the rotated files by one and start a new file."""
+        for idx in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{idx}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{idx + 1}"))
+        if self.backup_count > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+def iter_recorded_responses(path: Path) -> Iterator[RecordedResponse]:
+    """Read the responses of a recording, including its rotated files, oldest first."""
+    # Skip other files next to the recording, such as editor backups
+    rotated = sorted(
+        (
+            rotated_path
+            for rotated_path in path.parent.glob(f"{path.name}.*")
+            if rotated_path.suffix[1:].isdecimal()
+        ),
+        key=lambda rotated_path: int(rotated_path.suffix[1:]),
+        reverse=True,
+    )
+    for file_path in [*rotated, path]:
+        if not file_path.exists():
+            continue
+        with gzip.open(file_path, "rt") as file:
+            for line in file:
+                record = json.loads(line)
+                yield RecordedResponse(
+                    timestamp=record["ts"],
+                    station_id=record["station_id"],
+                    body=record["body"].encode(),
+                )
+
+
+class ReplayExhaustedError(aiohttp.ClientError):
+    """Exception to indicate that a replay has no responses left."""
+
+
+class ReplayResponse:
+    """Minimal stand-in for `aiohttp.ClientResponse` serving a recorded body."""
+
+    status = 200
+
+    def __init__(self, record: RecordedResponse) -> None:
+        """Initialize the response."""
+        self._record = record
+
+    def raise_for_status(self) -> None:
+        """Do nothing, recorded responses were successful."""
+
+    async def read(self) -> bytes:
+        """Return the raw body."""
+        return self._record.body
+
+    async def text(self) -> str:
+        """Return the body as text."""
+        return self._record.body.decode()
+
+    async def json(self) -> Any:
+        """Return the decoded body."""
+        return json.loads(self._record.body)
+
+
+class ReplaySession:
+    """Stand-in for `aiohttp.ClientSession` that replays a recording.
+
+    Responses are served per station in recorded order. With a `speed` the
+    recorded time between two responses is reproduced, divided by `speed`;
+    without one, responses are served as fast as they are requested. `clock`
+    returns the recording time of the last served response and can be passed to
+    the API client so that readings carry their original timestamps.
+    """
+
+    def __init__(
+        self, records: list[RecordedResponse], speed: float | None = None
+    ) -> None:
+        """Initialize the session.
+
+        Args:
+            records: The recorded responses
+            speed: The speed-up relative to real time, or None for no pacing
+        """
+        self._speed = speed
+        self._queues: dict[str, list[RecordedResponse]] = {}
+        for record in sorted(records, key=lambda record: record.timestamp):
+            self._queues.setdefault(record.station_id, []).append(record)
+        for queue in self._queues.values():
+            queue.reverse()
+        self._now = records[0].timestamp if records else time.time()
+        self._started: tuple[float, float] | None = None
+
+    @classmethod
+    def from_file(cls, path: Path, speed: float | None = None) -> ReplaySession:
+        """Create a session replaying a recording file."""
+        return cls(list(iter_recorded_responses(path)), speed=speed)
+
+    def clock(self) -> float:
+        """Return the recording time of the last served response."""
+        return self._now
+
+    async def post(self, url: str, **kwargs: Any) -> ReplayResponse:
+        """Serve the next recorded response of the requested station."""
+        station_id = kwargs["json"]["stationId"]
+        queue = self._queues.get(station_id)
+        if not queue:
+            raise ReplayExhaustedError(f"No recorded responses left for {station_id}")
+        record = queue.pop()
+
+        if self._speed is not None:
+            loop_time = asyncio.get_running_loop().time()
+            if self._started is None:
+                self._started = (loop_time, record.timestamp)
+            start_loop_time, start_timestamp = self._started
+            due = start_loop_time + (record.timestamp - start_timestamp) / self._speed
+            if due > loop_time:
+                await asyncio.sleep(due - loop_time)
+
+        self._now = record.timestamp
+        return ReplayResponse(record)
+
+    async def close(self) -> None:
+        """Do nothing, there is no connection to close."""
@@ -0,0 +1,230 @@
+"""Rolling statistics over recent power samples."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+from collections.abc import Iterator
+
+
+class RollingWindow:
+    """Sliding time window over samples with O(1) mean, max and min.
+
+    Samples live in a fixed-size ring buffer of two `array("d")`s, so memory is
+    bounded by `capacity` regardless of how often samples arrive. The sum of the
+    window is maintained incrementally, and maximum and minimum are tracked with
+    monotonic deques of sample sequence numbers.
+    """
+
+    __slots__ = (
+        "_capacity",
+        "_head",
+        "_max",
+        "_min",
+        "_sum",
+        "_tail",
+        "_times",
+        "_values",
+        "window",
+    )
+
+    def __init__(self, window: float, capacity: int) -> None:
+        """Initialize the window.
+
+        Args:
+            window: The length of the window in seconds
+            capacity: The maximum number of samples kept in the window
+        """
+        self.window = window
+        self._capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        # Sequence numbers of the oldest and the next sample
+        self._head = 0
+        self._tail = 0
+        self._sum = 0.0
+        self._max: deque[int] = deque()
+        self._min: deque[int] = deque()
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return self._tail - self._head
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        """Iterate over the (timestamp, value) samples in the window, oldest first."""
+        for seq in range(self._head, self._tail):
+            slot = seq % self._capacity
+            yield self._times[slot], self._values[slot]
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample and expire the ones that fell out of the window."""
+        if len(self) == self._capacity:
+            self._evict()
+
+        seq = self._tail
+        slot = seq % self._capacity
+        self._times[slot] = timestamp
+        self._values[slot] = value
+        self._sum += value
+        self._tail += 1
+
+        values = self._values
+        capacity = self._capacity
+        while self._max and values[self._max[-1] % capacity] <= value:
+            self._max.pop()
+        self._max.append(seq)
+        while self._min and values[self._min[-1] % capacity] >= value:
+            self._min.pop()
+        self._min.append(seq)
+
+        self.expire(timestamp)
+
+    def expire(self, now: float) -> None:
+        """Drop all samples older than the window length."""
+        cutoff = now - self.window
+        while (
+            self._head < self._tail
+            and self._times[self._head % self._capacity] <= cutoff
+        ):
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest sample."""
+        seq = self._head
+        self._sum -= self._values[seq % self._capacity]
+        if self._max[0] == seq:
+            self._max.popleft()
+        if self._min[0] == seq:
+            self._min.popleft()
+        self._head += 1
+        if self._head == self._tail:
+            # Reset the running sum to shed accumulated rounding errors
+            self._sum = 0.0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the samples in the window."""
+        if not len(self):
+            return None
+        return self._sum / len(self)
+
+    @property
+    def max(self) -> float | None:
+        """Return the largest sample in the window."""
+        if not self._max:
+            return None
+        return self._values[self._max[0] % self._capacity]
+
+    @property
+    def min(self) -> float | None:
+        """Return the smallest sample in the window."""
+        if not self._min:
+            return None
+        return self._values[self._min[0] % self._capacity]
+
+
+class PowerStatistics:
+    """Rolling statistics over the power samples of one station.
+
+    The windows only take samples at least half a sample interval apart, so that
+    their ring buffers always span the full window length, however densely
+    readings arrive. The peak of the day takes every sample into account.
+    """
+
+    WINDOW_15M = 15 * 60
+    WINDOW_1H = 60 * 60
+
+    # Minimum spacing of the samples in the windows, relative to the interval
+    MIN_SPACING = 0.5
+
+    __slots__ = (
+        "_day",
+        "_last_timestamp",
+        "_last_value",
+        "_latest",
+        "_min_spacing",
+        "peak_today",
+        "ramp_rate",
+        "window_15m",
+        "window_1h",
+    )
+
+    def __init__(self, sample_interval: float) -> None:
+        """Initialize the statistics.
+
+        Args:
+            sample_interval: The expected time between two samples in seconds,
+                used to size the ring buffers
+        """
+        self._min_spacing = self._spacing(sample_interval)
+        self.window_15m = self._window(self.WINDOW_15M, self._min_spacing)
+        self.window_1h = self._window(self.WINDOW_1H, self._min_spacing)
+        self.peak_today: float | None = None
+        self.ramp_rate: float | None = None
+        self._day: int | None = None
+        # Timestamp of the newest sample
+        self._latest: float | None = None
+        # Newest sample taken into the windows
+        self._last_timestamp: float | None = None
+        self._last_value: float | None = None
+
+    @classmethod
+    def _spacing(cls, sample_interval: float) -> float:
+        return max(sample_interval, 1) * cls.MIN_SPACING
+
+    @staticmethod
+    def _window(window: float, min_spacing: float) -> RollingWindow:
+        capacity = max(2, math.ceil(window / min_spacing) + 1)
+        return RollingWindow(window, capacity)
+
+    def resize(self, sample_interval: float) -> None:
+        """Resize the ring buffers for a new sample interval, keeping the samples.
+
+        If the buffers shrink, the oldest samples that no longer fit are dropped.
+        """
+        self._min_spacing = self._spacing(sample_interval)
+        self.window_15m = self._resized(self.window_15m, self._min_spacing)
+        self.window_1h = self._resized(self.window_1h, self._min_spacing)
+
+    @classmethod
+    def _resized(cls, old: RollingWindow, min_spacing: float) -> RollingWindow:
+        window = cls._window(old.window, min_spacing)
+        for timestamp, value in old:
+            window.add(timestamp, value)
+        return window
+
+    def add(self, timestamp: float, value: float, day: int) -> None:
+        """Add a power sample.
+
+        Args:
+            timestamp: The POSIX timestamp of the sample
+            value: The power in W
+            day: The ordinal of the local day the sample belongs to
+        """
+        if self._latest is not None and timestamp <= self._latest:
+            return
+        self._latest = timestamp
+
+        if day != self._day:
+            self._day = day
+            self.peak_today = value
+        elif self.peak_today is None or value > self.peak_today:
+            self.peak_today = value
+
+        if (
+            self._last_timestamp is not None
+            and timestamp - self._last_timestamp < self._min_spacing
+        ):
+            return
+
+        self.window_15m.add(timestamp, value)
+        self.window_1h.add(timestamp, value)
+
+        if self._last_timestamp is not None:
+            # W per minute
+            self.ramp_rate = (
+                (value - self._last_value) / (timestamp - self._last_timestamp) * 60
+            )
+        self._last_timestamp = timestamp
+        self._last_value = value
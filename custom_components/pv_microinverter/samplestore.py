@@ -0,0 +1,471 @@
+"""Memory-mapped store of high-frequency PV Microinverter samples."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Final
+
+import numpy as np
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import slugify
+
+from .const import DATA_SAMPLE_STORE, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# One fixed-width record per sample
+SAMPLE_DTYPE: Final = np.dtype([
+    ("timestamp", "<f8"),
+    ("current_power", "<f4"),
+    ("today_energy", "<f4"),
+])
+
+HEADER_DTYPE: Final = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("count", "<u8"),
+])
+MAGIC: Final = b"PVMS"
+VERSION: Final = 1
+
+# Files grow by this many records at a time
+CHUNK_RECORDS: Final = 4096
+
+# Every INDEX_STRIDE-th timestamp is kept in memory to narrow down searches
+INDEX_STRIDE: Final = 256
+
+# Files are grown in the background once fewer free records than this are left
+GROW_MARGIN: Final = CHUNK_RECORDS // 4
+
+# Samples older than this are dropped when a file is opened, and once a day
+RETENTION: Final = 35 * 24 * 60 * 60
+COMPACT_INTERVAL: Final = timedelta(days=1)
+
+
+def _file_size(capacity: int) -> int:
+    """Return the size of a sample file with room for `capacity` records."""
+    return HEADER_DTYPE.itemsize + capacity * SAMPLE_DTYPE.itemsize
+
+
+@dataclass(slots=True)
+class Remapping:
+    """A new mapping of a sample file, prepared off the event loop.
+
+    See `StationSamples.prepare_grow` and `StationSamples.prepare_compact`.
+    """
+
+    header: np.memmap
+    records: np.memmap
+    # Records of the current mapping before this position are dropped
+    start: int
+    # Records of the current mapping from this position on were appended while
+    # the new mapping was prepared, and are copied over when switching to it
+    copied: int
+    # Sparse index of the copied records, None if it does not change
+    index: np.ndarray | None = None
+    # New file to move over the sample file, None if the file was extended
+    replacement: Path | None = None
+
+
+class StationSamples:
+    """Append-only time series of one station in a memory-mapped file.
+
+    The file starts with a small header holding the number of records, followed
+    by fixed-width records in timestamp order. The file grows in chunks, so most
+    appends are a plain memory write. Range queries binary-search a sparse
+    in-memory index of every `INDEX_STRIDE`-th timestamp and then the
+    timestamps within one stride, and return views into the mapping without
+    copying.
+
+    Opening, compacting and growing the file do blocking I/O. To keep that off
+    the event loop, a new mapping can be prepared in the executor while samples
+    are still appended, and is then switched to with `remap`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open or create the file of a station.
+
+        Args:
+            path: The file to store the samples in
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists() or path.stat().st_size < HEADER_DTYPE.itemsize:
+            self._create(CHUNK_RECORDS)
+        try:
+            self._map()
+        except ValueError as error:
+            _LOGGER.warning("Discarding unreadable sample file: %s", error)
+            self._create(CHUNK_RECORDS)
+            self._map()
+
+    def __len__(self) -> int:
+        """Return the number of stored samples."""
+        return self._count
+
+    @property
+    def records(self) -> np.ndarray:
+        """Return a view of all stored samples."""
+        return self._records[: self._count]
+
+    @property
+    def spare(self) -> int:
+        """Return the number of samples that fit before the file has to grow."""
+        return len(self._records) - self._count
+
+    def append(
+        self, timestamp: float, current_power: float, today_energy: float
+    ) -> bool:
+        """Append a sample, unless it is not newer than the last one.
+
+        Returns:
+            bool: True if the sample was stored
+        """
+        count = self._count
+        if count and timestamp <= self._records["timestamp"][count - 1]:
+            return False
+        if count == len(self._records):
+            self._grow()
+
+        self._records[count] = (timestamp, current_power, today_energy)
+        if count % INDEX_STRIDE == 0:
+            self._index = np.append(self._index, timestamp)
+        self._count = count + 1
+        self._header["count"] = self._count
+        return True
+
+    def query(self, start: float, end: float) -> np.ndarray:
+        """Return a view of the samples with `start <= timestamp < end`."""
+        return self.records[self._search(start) : self._search(end)]
+
+    def _search(self, timestamp: float) -> int:
+        """Return the position of the first sample not older than `timestamp`."""
+        block = int(np.searchsorted(self._index, timestamp, side="right")) - 1
+        if block < 0:
+            return 0
+        low = block * INDEX_STRIDE
+        high = min(low + INDEX_STRIDE, self._count)
+        timestamps = self._records["timestamp"][low:high]
+        return low + int(np.searchsorted(timestamps, timestamp, side="left"))
+
+    def compact(self, before: float) -> int:
+        """Drop all samples older than `before` by rewriting the file.
+
+        Returns:
+            int: The number of dropped samples
+        """
+        if (remapping := self.prepare_compact(before)) is None:
+            return 0
+        self.remap(remapping)
+        return remapping.start
+
+    def prepare_grow(self) -> Remapping:
+        """Extend the file by one chunk and map the extended file.
+
+        The current mapping stays in use, so this can run in the executor while
+        samples are appended. Hand the result to `remap` afterwards.
+        """
+        count = self._count
+        capacity = len(self._records) + CHUNK_RECORDS
+        with self.path.open("r+b") as file:
+            file.truncate(_file_size(capacity))
+        header, records = self._open_mapping(self.path)
+        return Remapping(header, records, start=0, copied=count)
+
+    def prepare_compact(self, before: float) -> Remapping | None:
+        """Write the samples not older than `before` to a new file and map it.
+
+        The current mapping stays in use, so this can run in the executor while
+        samples are appended. Hand the result to `remap` afterwards.
+
+        Returns:
+            Remapping | None: The new mapping, None if there is nothing to drop
+        """
+        count = self._count
+        dropped = self._search(before)
+        if not dropped:
+            return None
+
+        kept = self._records[dropped:count]
+        # Leave at least one chunk of room for new samples
+        capacity = -(-(len(kept) + CHUNK_RECORDS) // CHUNK_RECORDS) * CHUNK_RECORDS
+        replacement = self._create_empty(capacity)
+        header, records = self._open_mapping(replacement)
+        records[: len(kept)] = kept
+        header["count"] = len(kept)
+        return Remapping(
+            header,
+            records,
+            start=dropped,
+            copied=count,
+            index=np.array(records["timestamp"][: len(kept) : INDEX_STRIDE]),
+            replacement=replacement,
+        )
+
+    def remap(self, remapping: Remapping) -> bool:
+        """Switch to a new mapping, copying over the samples appended meanwhile.
+
+        Must be called where samples are appended, i.e. on the event loop.
+
+        Returns:
+            bool: False if the new mapping was outdated and is not used
+        """
+        start, copied, count = remapping.start, remapping.copied, self._count
+        records = remapping.records
+        if remapping.replacement is None:
+            # Grown by other means in the meantime
+            if len(records) <= len(self._records):
+                return False
+        elif count - start > len(records):
+            return False
+
+        records[copied - start : count - start] = self._records[copied:count]
+        remapping.header["count"] = count - start
+        if remapping.replacement is not None:
+            remapping.replacement.replace(self.path)
+        self._header, self._records = remapping.header, records
+        self._count = count - start
+        if remapping.index is not None:
+            # Extend the index by the copied samples that start a stride
+            first = -(-(copied - start) // INDEX_STRIDE) * INDEX_STRIDE
+            self._index = np.append(
+                remapping.index,
+                records["timestamp"][first : self._count : INDEX_STRIDE],
+            )
+        return True
+
+    def flush(self) -> None:
+        """Write pending changes of the mapping to disk."""
+        self._records.flush()
+        self._header.flush()
+
+    def close(self) -> None:
+        """Flush and unmap the file."""
+        self.flush()
+        del self._records, self._header
+
+    def _create(self, capacity: int) -> None:
+        """Create an empty file with room for `capacity` records.
+
+        The file is written next to the old one and moved over it, so views into
+        a previous mapping stay readable.
+        """
+        self._create_empty(capacity).replace(self.path)
+
+    def _create_empty(self, capacity: int) -> Path:
+        """Write an empty file with room for `capacity` records next to the
+        sample file and return its path."""
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        temporary = self.path.with_suffix(".tmp")
+        with temporary.open("wb") as file:
+            file.write(header.tobytes())
+            file.truncate(_file_size(capacity))
+        return temporary
+
+    def _map(self) -> None:
+        """Map header and records of the file."""
+        self._header, self._records = self._open_mapping(self.path)
+        self._count = min(int(self._header["count"]), len(self._records))
+        self._build_index()
+
+    @staticmethod
+    def _open_mapping(path: Path) -> tuple[np.memmap, np.memmap]:
+        """Map header and records of a file.
+
+        Raises:
+            ValueError: If the file is not a sample file of the current version
+        """
+        header = np.memmap(path, dtype=HEADER_DTYPE, mode="r+", shape=())
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"{path} is not a sample file of version {VERSION}")
+
+        capacity = (path.stat().st_size - HEADER_DTYPE.itemsize) // (
+            SAMPLE_DTYPE.itemsize
+        )
+        records = np.memmap(
+            path,
+            dtype=SAMPLE_DTYPE,
+            mode="r+",
+            offset=HEADER_DTYPE.itemsize,
+            shape=(capacity,),
+        )
+        return header, records
+
+    def _build_index(self) -> None:
+        """Rebuild the sparse index of timestamps."""
+        self._index = np.array(self.records["timestamp"][::INDEX_STRIDE])
+
+    def _grow(self) -> None:
+        """Extend the file by one chunk and map it again."""
+        self.remap(self.prepare_grow())
+
+
+class SampleStore:
+    """Sample files of all stations, below `<config>/pv_microinverter/samples`.
+
+    Files are grown ahead of time and expired samples are dropped once a day,
+    both in the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store.
+
+        Args:
+            hass: The Home Assistant instance
+        """
+        self._hass = hass
+        self._directory = Path(hass.config.path(DOMAIN, "samples"))
+        self._stations: dict[str, StationSamples] = {}
+        # Pending background remaps, at most one per file
+        self._remaps: dict[StationSamples, asyncio.Task[None]] = {}
+        self._unsub_compact: CALLBACK_TYPE | None = None
+
+    def get(self, station_id: str) -> StationSamples | None:
+        """Return the open sample file of a station."""
+        return self._stations.get(station_id)
+
+    def _path(self, station_id: str) -> Path:
+        """Return the sample file of a station."""
+        return self._directory / f"{slugify(station_id)}.bin"
+
+    def _legacy_path(self, station_id: str) -> Path | None:
+        """Return the file named after the raw station ID, as it used to be.
+
+        None if that is the current name or would be outside the directory.
+        """
+        path = self._directory / f"{station_id}.bin"
+        if path == self._path(station_id) or path.parent != self._directory:
+            return None
+        return path
+
+    async def async_open(self, station_id: str, now: float) -> StationSamples:
+        """Open the sample file of a station, dropping expired samples."""
+        if (samples := self._stations.get(station_id)) is not None:
+            return samples
+
+        def _open() -> StationSamples:
+            path = self._path(station_id)
+            legacy = self._legacy_path(station_id)
+            if legacy is not None and legacy.is_file() and not path.exists():
+                legacy.replace(path)
+            samples = StationSamples(path)
+            if dropped := samples.compact(now - RETENTION):
+                _LOGGER.debug(
+                    "Dropped %d expired samples of station %s", dropped, station_id
+                )
+            return samples
+
+        samples = await self._hass.async_add_executor_job(_open)
+        self._stations[station_id] = samples
+        if self._unsub_compact is None:
+            self._unsub_compact = async_track_time_interval(
+                self._hass,
+                self._async_compact,
+                COMPACT_INTERVAL,
+                name=f"{DOMAIN} sample compaction",
+                cancel_on_shutdown=True,
+            )
+        return samples
+
+    @callback
+    def async_append(
+        self,
+        samples: StationSamples,
+        timestamp: float,
+        current_power: float,
+        today_energy: float,
+    ) -> bool:
+        """Append a sample to a file, growing the file in time in the executor.
+
+        Returns:
+            bool: True if the sample was stored
+        """
+        stored = samples.append(timestamp, current_power, today_energy)
+        if samples.spare < GROW_MARGIN:
+            self._async_remap(samples, samples.prepare_grow)
+        return stored
+
+    @callback
+    def async_close(self, station_id: str) -> None:
+        """Close the sample file of a station."""
+        if (samples := self._stations.pop(station_id, None)) is None:
+            return
+        if not self._stations and self._unsub_compact is not None:
+            self._unsub_compact()
+            self._unsub_compact = None
+        self._hass.async_create_task(
+            self._async_close(samples), f"{DOMAIN} close {samples.path.name}"
+        )
+
+    async def async_remove(self, station_id: str) -> None:
+        """Delete the sample file of a removed station."""
+        self.async_close(station_id)
+        path = self._path(station_id)
+        paths = [path, path.with_suffix(".tmp")]
+        if (legacy := self._legacy_path(station_id)) is not None:
+            paths.append(legacy)
+
+        def _remove() -> None:
+            for path in paths:
+                path.unlink(missing_ok=True)
+
+        await self._hass.async_add_executor_job(_remove)
+
+    async def _async_close(self, samples: StationSamples) -> None:
+        """Close a file once its pending remap is done."""
+        if (remap := self._remaps.get(samples)) is not None:
+            await asyncio.wait((remap,))
+        await self._hass.async_add_executor_job(samples.close)
+
+    @callback
+    def _async_compact(self, _now: datetime) -> None:
+        """Drop the expired samples of all stations."""
+        before = time.time() - RETENTION
+        for samples in self._stations.values():
+            self._async_remap(samples, partial(samples.prepare_compact, before))
+
+    @callback
+    def _async_remap(
+        self, samples: StationSamples, prepare: Callable[[], Remapping | None]
+    ) -> None:
+        """Prepare a new mapping of a file in the executor and switch to it."""
+        if samples not in self._remaps:
+            self._remaps[samples] = self._hass.async_create_background_task(
+                self._async_run_remap(samples, prepare),
+                f"{DOMAIN} remap {samples.path.name}",
+            )
+
+    async def _async_run_remap(
+        self, samples: StationSamples, prepare: Callable[[], Remapping | None]
+    ) -> None:
+        """Run a prepared remap of a file."""
+        try:
+            remapping = await self._hass.async_add_executor_job(prepare)
+        except OSError as error:
+            _LOGGER.warning("Failed to remap %s: %s", samples.path, error)
+            return
+        finally:
+            del self._remaps[samples]
+
+        if remapping is not None and samples.remap(remapping) and remapping.start:
+            _LOGGER.debug(
+                "Dropped %d expired samples from %s", remapping.start, samples.path
+            )
+
+
+@callback
+def async_get_sample_store(hass: HomeAssistant) -> SampleStore:
+    """Return the integration-wide sample store, creating it on first use."""
+    if (store := hass.data.get(DATA_SAMPLE_STORE)) is None:
+        store = hass.data[DATA_SAMPLE_STORE] = SampleStore(hass)
+    return store
@@ -0,0 +1,254 @@
+"""Integration-wide poll scheduler for PV Microinverter stations."""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_SCHEDULER, DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import PVMicroinverterDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _ScheduledStation:
+    """Scheduling state of a single station."""
+
+    coordinator: PVMicroinverterDataUpdateCoordinator
+    # None for stations that are not polled, e.g. because they push their readings
+    interval: float | None
+    due: float = 0.0
+
+
+def _station_rank_key(station_id: str) -> tuple[int, str]:
+    """Return a stable sort key that scatters stations independent of their IDs."""
+    return zlib.crc32(station_id.encode()), station_id
+
+
+def _poll_interval(coordinator: PVMicroinverterDataUpdateCoordinator) -> float | None:
+    """Return the poll interval of a coordinator in seconds, if it is polled."""
+    if coordinator.poll_interval is None:
+        return None
+    return coordinator.poll_interval.total_seconds()
+
+
+def _next_slot(now: float, interval: float, offset: float) -> float:
+    """Return the first wall-clock slot after `now` for the given interval phase."""
+    return now - ((now - offset) % interval) + interval
+
+
+class PVMicroinverterPollScheduler:
+    """Timer heap that spreads the polls of all stations across their interval.
+
+    Instead of one timer per coordinator, all stations share a single timer that
+    is armed for the earliest due poll. Stations with the same poll interval are
+    assigned evenly spaced phase offsets, ordered by a hash of the station ID, so
+    the portal sees a steady trickle of requests instead of one burst per interval.
+
+    A station's offset follows from its rank within its interval group, so adding
+    or removing a station re-spreads that group only and takes effect for the
+    other members from their next poll on, without moving their pending polls.
+    Heap entries are not removed when a station is removed or its due time moves;
+    such stale entries are skipped when they come up instead.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            hass: The Home Assistant instance
+        """
+        self._hass = hass
+        self._stations: dict[str, _ScheduledStation] = {}
+        # Polled station IDs per interval, ordered by their rank key
+        self._groups: dict[float, list[str]] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(
+        self, coordinator: PVMicroinverterDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """Start scheduling polls for a coordinator.
+
+        Returns:
+            CALLBACK_TYPE: A callback that removes the coordinator again
+        """
+        station_id = coordinator.api_client.station_id
+        if station_id in self._stations:
+            self.async_remove(self._stations[station_id].coordinator)
+        station = self._stations[station_id] = _ScheduledStation(
+            coordinator=coordinator,
+            interval=_poll_interval(coordinator),
+        )
+        self._async_join_group(station_id, station.interval)
+        self._async_schedule(station_id)
+
+        @callback
+        def _async_remove() -> None:
+            self.async_remove(coordinator)
+
+        return _async_remove
+
+    @callback
+    def async_remove(self, coordinator: PVMicroinverterDataUpdateCoordinator) -> None:
+        """Stop scheduling polls for a coordinator."""
+        station_id = coordinator.api_client.station_id
+        station = self._stations.get(station_id)
+        if station is None or station.coordinator is not coordinator:
+            return
+        del self._stations[station_id]
+        self._async_leave_group(station_id, station.interval)
+        self._async_schedule(station_id)
+
+    @callback
+    def async_reschedule(
+        self, coordinator: PVMicroinverterDataUpdateCoordinator
+    ) -> None:
+        """Pick up a changed poll interval of an already scheduled coordinator."""
+        station_id = coordinator.api_client.station_id
+        station = self._stations.get(station_id)
+        if station is None or station.coordinator is not coordinator:
+            return
+        old_interval = station.interval
+        station.interval = _poll_interval(coordinator)
+        if station.interval == old_interval:
+            return
+        if station.interval is None:
+            # Its heap entry is dropped, so a later fallback needs a fresh due time
+            station.due = 0.0
+        self._async_leave_group(station_id, old_interval)
+        self._async_join_group(station_id, station.interval)
+        self._async_schedule(station_id)
+
+    @property
+    def offsets(self) -> dict[str, float]:
+        """Return the phase offset in seconds of each scheduled station."""
+        return {
+            station_id: interval * rank / len(station_ids)
+            for interval, station_ids in self._groups.items()
+            for rank, station_id in enumerate(station_ids)
+        }
+
+    def _offset(self, station_id: str, interval: float) -> float:
+        """Return the phase offset of a station within its interval group."""
+        station_ids = self._groups[interval]
+        rank = bisect.bisect_left(
+            station_ids, _station_rank_key(station_id), key=_station_rank_key
+        )
+        return interval * rank / len(station_ids)
+
+    @callback
+    def _async_join_group(self, station_id: str, interval: float | None) -> None:
+        """Add a station to the group of its poll interval."""
+        if interval is not None:
+            bisect.insort(
+                self._groups.setdefault(interval, []),
+                station_id,
+                key=_station_rank_key,
+            )
+
+    @callback
+    def _async_leave_group(self, station_id: str, interval: float | None) -> None:
+        """Remove a station from the group of its poll interval."""
+        if interval is None:
+            return
+        group = self._groups[interval]
+        group.remove(station_id)
+        if not group:
+            del self._groups[interval]
+
+    @callback
+    def _async_schedule(self, station_id: str) -> None:
+        """Schedule the next poll of an added, removed or rescheduled station.
+
+        A station keeps its pending due time while that is within one interval of
+        its new slot, so a change of its group never delays a poll by more than the
+        gap between the old and the new offset.
+        """
+        station = self._stations.get(station_id)
+        if station is not None and (interval := station.interval) is not None:
+            slot = _next_slot(time.time(), interval, self._offset(station_id, interval))
+            if abs(station.due - slot) >= interval:
+                station.due = slot
+                heapq.heappush(self._heap, (station.due, station_id))
+
+        scheduled = sum(len(station_ids) for station_ids in self._groups.values())
+        if len(self._heap) > 2 * scheduled:
+            self._heap = [
+                (station.due, station_id)
+                for station_id, station in self._stations.items()
+                if station.interval is not None
+            ]
+            heapq.heapify(self._heap)
+        _LOGGER.debug(
+            "Spread polls of %d stations over %d interval(s)",
+            scheduled,
+            len(self._groups),
+        )
+        self._async_arm_timer()
+
+    def _is_current(self, due: float, station_id: str) -> bool:
+        """Return whether a heap entry still matches its station."""
+        station = self._stations.get(station_id)
+        return (
+            station is not None and station.interval is not None and station.due == due
+        )
+
+    @callback
+    def _async_arm_timer(self) -> None:
+        """(Re-)arm the shared timer for the earliest due station."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        while self._heap and not self._is_current(*self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+
+        delay = max(self._heap[0][0] - time.time(), 0)
+        self._unsub_timer = async_call_later(self._hass, delay, self._async_on_timer)
+
+    @callback
+    def _async_on_timer(self, _now: datetime) -> None:
+        """Trigger the polls of all due stations and schedule the next ones."""
+        self._unsub_timer = None
+        now = time.time()
+
+        while self._heap and self._heap[0][0] <= now:
+            due, station_id = heapq.heappop(self._heap)
+            if not self._is_current(due, station_id):
+                continue
+            station = self._stations[station_id]
+            self._hass.async_create_background_task(
+                station.coordinator.async_refresh(),
+                name=f"{DOMAIN} poll {station_id}",
+            )
+
+            station.due = _next_slot(
+                now, station.interval, self._offset(station_id, station.interval)
+            )
+            heapq.heappush(self._heap, (station.due, station_id))
+
+        self._async_arm_timer()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> PVMicroinverterPollScheduler:
+    """Return the integration-wide poll scheduler, creating it on first use."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = PVMicroinverterPollScheduler(hass)
+    return scheduler
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any, Final
 
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -12,12 +14,36 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfEnergy, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
 
-from .const import ATTR_LAST_UPDATED, DOMAIN, SENSOR_TYPES
+from .const import (
+    ANOMALY_SENSOR_TYPES,
+    ATTR_LAST_UPDATED,
+    CONF_ENABLE_ANOMALY,
+    CONF_ENABLE_PERFORMANCE,
+    CONF_ENABLE_STATISTICS,
+    CONF_POWER_DEADBAND,
+    CONF_POWER_DEADBAND_PERCENT,
+    CONF_STATE_HEARTBEAT,
+    DEFAULT_ENABLE_ANOMALY,
+    DEFAULT_ENABLE_PERFORMANCE,
+    DEFAULT_ENABLE_STATISTICS,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_POWER_DEADBAND_PERCENT,
+    DEFAULT_STATE_HEARTBEAT,
+    DOMAIN,
+    PERFORMANCE_SENSOR_TYPES,
+    SENSOR_TYPES,
+    SIGNAL_OPTIONS_UPDATED,
+    STATISTICS_SENSOR_TYPES,
+    PVMicroinverterData,
+)
 from .coordinator import PVMicroinverterDataUpdateCoordinator
-from .entity import PVMicroinverterEntity
+from .entity import PVMicroinverterEntity, async_remove_entities
+from .filters import DeadbandFilter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,25 +65,84 @@ async def async_setup_entry(
     ]
     station_id = entry.data["station_id"]
 
-    entities = []
-
     # Create a sensor entity for each sensor type
-    for sensor_key, sensor_info in SENSOR_TYPES.items():
-        entities.append(
-            PVMicroinverterSensor(
-                coordinator=coordinator,
-                station_id=station_id,
-                sensor_type=sensor_key,
-                sensor_info=sensor_info,
+    sensors = _create_sensors(
+        coordinator, station_id, SENSOR_TYPES, PVMicroinverterSensor
+    )
+
+    # Optional sensors, by the option that enables them
+    optional_sensors: dict[str, list[PVMicroinverterSensor]] = {}
+    for option, default, sensor_types, sensor_class in OPTIONAL_SENSORS:
+        if coordinator.options.get(option, default):
+            optional_sensors[option] = _create_sensors(
+                coordinator, station_id, sensor_types, sensor_class
             )
+
+    async_add_entities(
+        [
+            *sensors,
+            *(sensor for group in optional_sensors.values() for sensor in group),
+        ],
+        True,
+    )
+
+    async def _async_options_updated() -> None:
+        """Add or remove optional sensors and reconfigure the state filters."""
+        options = coordinator.options
+        added: list[PVMicroinverterSensor] = []
+        for option, default, sensor_types, sensor_class in OPTIONAL_SENSORS:
+            enabled = options.get(option, default)
+            if enabled and option not in optional_sensors:
+                optional_sensors[option] = _create_sensors(
+                    coordinator, station_id, sensor_types, sensor_class
+                )
+                added.extend(optional_sensors[option])
+            elif not enabled and option in optional_sensors:
+                await async_remove_entities(
+                    hass, SENSOR_DOMAIN, optional_sensors.pop(option)
+                )
+
+        for sensor in sensors:
+            sensor.async_apply_options(options)
+        for group in optional_sensors.values():
+            for sensor in group:
+                sensor.async_apply_options(options)
+
+        # The coordinator already has data, so there is no need for a refresh
+        if added:
+            async_add_entities(added)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), _async_options_updated
         )
+    )
+
 
-    async_add_entities(entities, True)
+def _create_sensors(
+    coordinator: PVMicroinverterDataUpdateCoordinator,
+    station_id: str,
+    sensor_types: dict[str, dict[str, Any]],
+    sensor_class: type[PVMicroinverterSensor],
+) -> list[PVMicroinverterSensor]:
+    """Create one sensor of the given class for each sensor type."""
+    return [
+        sensor_class(
+            coordinator=coordinator,
+            station_id=station_id,
+            sensor_type=sensor_key,
+            sensor_info=sensor_info,
+        )
+        for sensor_key, sensor_info in sensor_types.items()
+    ]
 
 
 class PVMicroinverterSensor(PVMicroinverterEntity, SensorEntity):
     """Representation of a PV Microinverter sensor."""
 
+    # Changes on every poll, so keep it out of the recorder's attribute table
+    _unrecorded_attributes = frozenset({ATTR_LAST_UPDATED})
+
     def __init__(
         self,
         coordinator: PVMicroinverterDataUpdateCoordinator,
@@ -98,10 +183,29 @@ class PVMicroinverterSensor(PVMicroinverterEntity, SensorEntity):
             elif state_class == "total_increasing":
                 self._attr_state_class = SensorStateClass.TOTAL_INCREASING
 
-    @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        data = self.coordinator.data
+        self._filter = DeadbandFilter()
+        self.async_apply_options(coordinator.options)
+        self._written_available: bool | None = None
+        self._update_state(coordinator.data)
+
+    @callback
+    def async_apply_options(self, options: dict[str, Any]) -> None:
+        """Configure the state write filter from the entry options."""
+        # Only the power reading jitters; the energy counters are written on any
+        # change. All sensors share the heartbeat.
+        self._filter.heartbeat = options.get(
+            CONF_STATE_HEARTBEAT, DEFAULT_STATE_HEARTBEAT
+        )
+        if self._sensor_type == "current_power":
+            self._filter.absolute = options.get(
+                CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND
+            )
+            self._filter.percent = options.get(
+                CONF_POWER_DEADBAND_PERCENT, DEFAULT_POWER_DEADBAND_PERCENT
+            )
+
+    def _value_from(self, data: PVMicroinverterData | None) -> float | None:
+        """Return the value of this sensor's type from the coordinator data."""
         if not data:
             return None
 
@@ -113,11 +217,99 @@ class PVMicroinverterSensor(PVMicroinverterEntity, SensorEntity):
             return data.lifetime_energy
         return None
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes of the sensor."""
-        return {
-            ATTR_LAST_UPDATED: self.coordinator.data.last_updated
-            if self.coordinator.data
+    def _update_state(self, data: PVMicroinverterData | None) -> None:
+        """Take over value and attributes from the coordinator data."""
+        self._attr_native_value = self._value_from(data)
+        self._attr_extra_state_attributes = {
+            ATTR_LAST_UPDATED: dt_util.utc_from_timestamp(data.last_updated).isoformat()
+            if data
             else None,
         }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state unless it is within the deadband."""
+        data = self.coordinator.data
+        available = self.available
+        if (
+            not self._filter.update(self._value_from(data), time.monotonic())
+            and available == self._written_available
+        ):
+            return
+
+        self._written_available = available
+        self._update_state(data)
+        self.async_schedule_write()
+
+
+class PVMicroinverterStatisticsSensor(PVMicroinverterSensor):
+    """Sensor exposing a rolling statistic of the station's power."""
+
+    def _value_from(self, data: PVMicroinverterData | None) -> float | None:
+        """Return the value of this sensor's statistic."""
+        if not data:
+            return None
+
+        statistics = self.coordinator.power_statistics
+        if self._sensor_type == "average_power_15m":
+            return statistics.window_15m.mean
+        elif self._sensor_type == "average_power_1h":
+            return statistics.window_1h.mean
+        elif self._sensor_type == "peak_power_today":
+            return statistics.peak_today
+        elif self._sensor_type == "power_ramp_rate":
+            return statistics.ramp_rate
+        return None
+
+
+class PVMicroinverterPerformanceSensor(PVMicroinverterSensor):
+    """Sensor comparing the station's power with its clear-sky model."""
+
+    def _value_from(self, data: PVMicroinverterData | None) -> float | None:
+        """Return the expected power or the performance ratio."""
+        model = self.coordinator.clear_sky
+        if not data or model is None:
+            return None
+
+        if self._sensor_type == "expected_power":
+            return round(model.expected_power(data.last_updated), 1)
+        elif self._sensor_type == "performance_ratio":
+            ratio = model.performance_ratio(data.current_power, data.last_updated)
+            return None if ratio is None else round(ratio, 1)
+        return None
+
+
+class PVMicroinverterAnomalyScoreSensor(PVMicroinverterSensor):
+    """Sensor comparing the station's specific yield with the whole fleet."""
+
+    def _value_from(self, data: PVMicroinverterData | None) -> float | None:
+        """Return the robust z-score of the station's specific yield."""
+        if not data:
+            return None
+
+        score = self.coordinator.fleet_monitor.score(self._station_id)
+        return None if score is None else round(score, 2)
+
+
+# Optional sensor groups: the option enabling them, its default, the sensor
+# types and the entity class
+OPTIONAL_SENSORS: Final = (
+    (
+        CONF_ENABLE_STATISTICS,
+        DEFAULT_ENABLE_STATISTICS,
+        STATISTICS_SENSOR_TYPES,
+        PVMicroinverterStatisticsSensor,
+    ),
+    (
+        CONF_ENABLE_PERFORMANCE,
+        DEFAULT_ENABLE_PERFORMANCE,
+        PERFORMANCE_SENSOR_TYPES,
+        PVMicroinverterPerformanceSensor,
+    ),
+    (
+        CONF_ENABLE_ANOMALY,
+        DEFAULT_ENABLE_ANOMALY,
+        ANOMALY_SENSOR_TYPES,
+        PVMicroinverterAnomalyScoreSensor,
+    ),
+)
@@ -0,0 +1,150 @@
+"""Services for the PV Microinverter integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_STATION_ID, DATA_PROFILER, DOMAIN
+from .profiler import UpdateProfiler
+from .samplestore import async_get_sample_store
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PROFILE = "profile"
+SERVICE_QUERY_SAMPLES = "query_samples"
+
+ATTR_UPDATES = "updates"
+ATTR_TOP = "top"
+ATTR_TIMEOUT = "timeout"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_LIMIT = "limit"
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_UPDATES, default=10): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=1000)
+    ),
+    vol.Optional(ATTR_TOP, default=25): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=200)
+    ),
+    vol.Optional(ATTR_TIMEOUT, default=600): vol.All(
+        cv.positive_float, vol.Range(min=10, max=3600)
+    ),
+})
+
+QUERY_SAMPLES_SCHEMA = vol.Schema({
+    vol.Required(CONF_STATION_ID): cv.string,
+    vol.Required(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_LIMIT, default=10000): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=100000)
+    ),
+})
+
+
+async def _async_profile(call: ServiceCall) -> ServiceResponse:
+    """Profile the next coordinator updates and summarize the hot spots."""
+    hass = call.hass
+    if DATA_PROFILER in hass.data:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="profiler_running",
+        )
+
+    profiler = UpdateProfiler(call.data[ATTR_UPDATES])
+    hass.data[DATA_PROFILER] = profiler
+    try:
+        async with asyncio.timeout(call.data[ATTR_TIMEOUT]):
+            await profiler.async_wait()
+    except TimeoutError:
+        _LOGGER.info(
+            "Only %d of %d coordinator updates happened within %ss",
+            profiler.completed,
+            call.data[ATTR_UPDATES],
+            call.data[ATTR_TIMEOUT],
+        )
+    finally:
+        profiler.stop()
+        del hass.data[DATA_PROFILER]
+
+    # Push-only or idle stations may not update at all, which leaves nothing to
+    # write or rank
+    if not profiler.completed:
+        return {"updates": 0, "top": []}
+
+    path = hass.config.path(f"{DOMAIN}.profile.{int(time.time())}.{profiler.extension}")
+    await hass.async_add_executor_job(profiler.dump, path)
+    _LOGGER.info(
+        "Wrote profile of %d coordinator updates to %s", profiler.completed, path
+    )
+
+    return {
+        "path": path,
+        "updates": profiler.completed,
+        "top": profiler.top(call.data[ATTR_TOP]),
+    }
+
+
+@callback
+def _async_query_samples(call: ServiceCall) -> ServiceResponse:
+    """Return the stored samples of a station within a time range."""
+    station_id = call.data[CONF_STATION_ID]
+    if (samples := async_get_sample_store(call.hass).get(station_id)) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="unknown_station",
+            translation_placeholders={"station_id": station_id},
+        )
+
+    start = dt_util.as_utc(call.data[ATTR_START]).timestamp()
+    end = dt_util.as_utc(call.data.get(ATTR_END) or dt_util.utcnow()).timestamp()
+    records = samples.query(start, end)
+    # Thin out long ranges evenly rather than truncating them
+    if len(records) > (limit := call.data[ATTR_LIMIT]):
+        records = records[:: math.ceil(len(records) / limit)]
+
+    return {
+        "station_id": station_id,
+        "samples": [
+            {
+                "timestamp": dt_util.utc_from_timestamp(timestamp).isoformat(),
+                "current_power": round(current_power, 3),
+                "today_energy": round(today_energy, 3),
+            }
+            for timestamp, current_power, today_energy in records.tolist()
+        ],
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_SAMPLES,
+        _async_query_samples,
+        schema=QUERY_SAMPLES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
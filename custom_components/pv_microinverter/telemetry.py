@@ -0,0 +1,165 @@
+"""Failure accounting for PV Microinverter polls."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+
+from .const import DATA_FAILURE_TELEMETRY, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minimum time between two summaries of failed polls in the log
+SUMMARY_INTERVAL = 300
+
+# A station is reported as a repair issue once it has been failing this long...
+ISSUE_AFTER = 3600
+# ...and for at least this many polls in a row
+ISSUE_MIN_FAILURES = 3
+
+
+def _error_class(error: BaseException) -> str:
+    """Return the name of the innermost cause of an error."""
+    while error.__cause__ is not None:
+        error = error.__cause__
+    return type(error).__name__
+
+
+@dataclass(slots=True)
+class _StationFailures:
+    """Failure state of a single station."""
+
+    since: float
+    consecutive: int = 0
+    issue_raised: bool = False
+
+
+class FailureTelemetry:
+    """Aggregated accounting of failed polls across all stations.
+
+    Instead of logging every failed poll, failures are counted per error class
+    and written to the log as one summary line at most every `SUMMARY_INTERVAL`
+    seconds. Stations failing for a sustained period get a repair issue, which is
+    removed again once they recover.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the telemetry.
+
+        Args:
+            hass: The Home Assistant instance
+        """
+        self._hass = hass
+        self.error_counts: Counter[str] = Counter()
+        self._pending_counts: Counter[str] = Counter()
+        self._pending_stations: set[str] = set()
+        self._stations: dict[str, _StationFailures] = {}
+        self._last_summary: float | None = None
+
+    def consecutive_failures(self, station_id: str) -> int:
+        """Return the number of failed polls of a station since its last success."""
+        if (failures := self._stations.get(station_id)) is None:
+            return 0
+        return failures.consecutive
+
+    @callback
+    def async_record_failure(self, station_id: str, error: BaseException) -> None:
+        """Account for a failed poll."""
+        error_class = _error_class(error)
+        self.error_counts[error_class] += 1
+        self._pending_counts[error_class] += 1
+        self._pending_stations.add(station_id)
+
+        now = time.time()
+        failures = self._stations.setdefault(station_id, _StationFailures(since=now))
+        failures.consecutive += 1
+
+        if (
+            not failures.issue_raised
+            and failures.consecutive >= ISSUE_MIN_FAILURES
+            and now - failures.since >= ISSUE_AFTER
+        ):
+            failures.issue_raised = True
+            ir.async_create_issue(
+                self._hass,
+                DOMAIN,
+                f"station_unreachable_{station_id}",
+                is_fixable=False,
+                severity=ir.IssueSeverity.WARNING,
+                translation_key="station_unreachable",
+                translation_placeholders={
+                    "station_id": station_id,
+                    "failures": str(failures.consecutive),
+                    "error": error_class,
+                },
+            )
+
+        self._async_log_summary()
+
+    @callback
+    def async_record_success(self, station_id: str) -> None:
+        """Account for a successful poll, clearing a station's failure state."""
+        if (failures := self._stations.pop(station_id, None)) is None:
+            return
+
+        _LOGGER.debug(
+            "Station %s recovered after %d failed polls",
+            station_id,
+            failures.consecutive,
+        )
+        if failures.issue_raised:
+            _LOGGER.info(
+                "Station %s is reachable again after %d failed polls",
+                station_id,
+                failures.consecutive,
+            )
+            ir.async_delete_issue(
+                self._hass, DOMAIN, f"station_unreachable_{station_id}"
+            )
+
+    @callback
+    def async_forget(self, station_id: str) -> None:
+        """Drop all state of a station that is no longer polled."""
+        failures = self._stations.pop(station_id, None)
+        if failures is not None and failures.issue_raised:
+            ir.async_delete_issue(
+                self._hass, DOMAIN, f"station_unreachable_{station_id}"
+            )
+
+    @callback
+    def _async_log_summary(self) -> None:
+        """Log the failures since the last summary, if it is time for one."""
+        now = time.monotonic()
+        if (
+            self._last_summary is not None
+            and now - self._last_summary < SUMMARY_INTERVAL
+        ):
+            return
+
+        _LOGGER.warning(
+            "%d failed polls of %d stations since the last report (%s); "
+            "%d stations are currently failing",
+            self._pending_counts.total(),
+            len(self._pending_stations),
+            ", ".join(
+                f"{error_class}: {count}"
+                for error_class, count in self._pending_counts.most_common()
+            ),
+            len(self._stations),
+        )
+        self._pending_counts.clear()
+        self._pending_stations.clear()
+        self._last_summary = now
+
+
+@callback
+def async_get_failure_telemetry(hass: HomeAssistant) -> FailureTelemetry:
+    """Return the integration-wide failure telemetry, creating it on first use."""
+    if (telemetry := hass.data.get(DATA_FAILURE_TELEMETRY)) is None:
+        telemetry = hass.data[DATA_FAILURE_TELEMETRY] = FailureTelemetry(hass)
+    return telemetry
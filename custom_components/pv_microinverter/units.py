@@ -25,6 +25,12 @@ SI_PREFIXES = {
     "y": 1e-24,
 }
 
+# Longest prefixes first, so that "da" is not mistaken for "d"
+_PREFIXES_BY_LENGTH = sorted(SI_PREFIXES, key=len, reverse=True)
+
+# Prefixed units parsed so far; the portal only ever reports a handful
+_PARSED_UNITS: dict[str, "SIUnit"] = {}
+
 
 def _get_unit_symbol(unit_val: str) -> str:
     """Extract the unit symbol from a unit value string."""
@@ -55,19 +61,22 @@ class SIUnit:
         # If the unit is registered directly, return it.
         if unit_str in BASE_UNITS:
             return BASE_UNITS[unit_str]
+        if unit_str in _PARSED_UNITS:
+            return _PARSED_UNITS[unit_str]
         # Otherwise, check for a valid prefix.
-        for prefix in sorted(SI_PREFIXES, key=len, reverse=True):
+        for prefix in _PREFIXES_BY_LENGTH:
             if unit_str.startswith(prefix):
                 base_symbol = unit_str[len(prefix) :]
                 if base_symbol in BASE_UNITS:
                     base_unit = BASE_UNITS[base_symbol]
                     multiplier = SI_PREFIXES[prefix]
-                    return SIUnit(
+                    unit = _PARSED_UNITS[unit_str] = SIUnit(
                         f"{prefix}{base_unit.name}",
                         base_unit.quantity,
                         f"{prefix}{base_unit.symbol}",
                         base_unit.factor * multiplier,
                     )
+                    return unit
         raise ValueError(f"Unknown unit: {unit_str}")
 
 
@@ -0,0 +1,140 @@
+"""Webhook for readings pushed to PV Microinverter stations."""
+
+from __future__ import annotations
+
+import logging
+import time
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Final
+
+import voluptuous as vol
+from aiohttp import web
+from homeassistant.components import webhook
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, PVMicroinverterData
+
+if TYPE_CHECKING:
+    from .coordinator import PVMicroinverterDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bound of readings in one request
+MAX_READINGS: Final = 1000
+
+# Readings may be timestamped at most this far in the future, to allow for
+# clock skew between the forwarder and Home Assistant
+MAX_CLOCK_SKEW: Final = 300
+
+_NON_NEGATIVE = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+READING_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required("timestamp"): vol.Coerce(float),
+        vol.Required("current_power"): _NON_NEGATIVE,
+        vol.Required("today_energy"): _NON_NEGATIVE,
+        vol.Required("lifetime_energy"): _NON_NEGATIVE,
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+PAYLOAD_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required("station_id"): vol.Coerce(str),
+        vol.Required("readings"): vol.All(
+            [READING_SCHEMA], vol.Length(min=1, max=MAX_READINGS)
+        ),
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+
+def _error(status: HTTPStatus, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+async def async_handle_webhook(
+    coordinator: PVMicroinverterDataUpdateCoordinator, request: web.Request
+) -> web.Response:
+    """Validate a batch of pushed readings and hand them to the coordinator.
+
+    Args:
+        coordinator: The coordinator of the station the webhook belongs to
+        request: The webhook request
+
+    Returns:
+        web.Response: The number of accepted readings, or the validation error
+    """
+    try:
+        payload = PAYLOAD_SCHEMA(await request.json())
+    except ValueError:
+        return _error(HTTPStatus.BAD_REQUEST, "Invalid JSON")
+    except vol.Invalid as error:
+        return _error(HTTPStatus.BAD_REQUEST, str(error))
+
+    station_id = coordinator.api_client.station_id
+    if payload["station_id"] != station_id:
+        return _error(
+            HTTPStatus.FORBIDDEN, f"Webhook does not belong to {payload['station_id']}"
+        )
+
+    latest = time.time() + MAX_CLOCK_SKEW
+    readings = [
+        PVMicroinverterData(
+            current_power=reading["current_power"],
+            today_energy=reading["today_energy"],
+            lifetime_energy=reading["lifetime_energy"],
+            last_updated=reading["timestamp"],
+        )
+        for reading in payload["readings"]
+    ]
+    if any(reading.last_updated > latest for reading in readings):
+        return _error(HTTPStatus.BAD_REQUEST, "Reading timestamped in the future")
+
+    accepted = coordinator.async_push_readings(readings)
+    _LOGGER.debug(
+        "Accepted %d of %d pushed readings of station %s",
+        accepted,
+        len(readings),
+        station_id,
+    )
+    return web.json_response({"accepted": accepted})
+
+
+@callback
+def async_register_webhook(
+    hass: HomeAssistant,
+    coordinator: PVMicroinverterDataUpdateCoordinator,
+    webhook_id: str,
+) -> CALLBACK_TYPE:
+    """Register the webhook of a station.
+
+    Returns:
+        CALLBACK_TYPE: A callback that unregisters the webhook again
+    """
+    station_id = coordinator.api_client.station_id
+
+    async def _async_handle(
+        hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        return await async_handle_webhook(coordinator, request)
+
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        f"PV Microinverter {station_id}",
+        webhook_id,
+        _async_handle,
+        allowed_methods=["POST"],
+    )
+    _LOGGER.info(
+        "Accepting readings of station %s at %s",
+        station_id,
+        webhook.async_generate_path(webhook_id),
+    )
+
+    @callback
+    def _async_unregister() -> None:
+        webhook.async_unregister(hass, webhook_id)
+
+    return _async_unregister
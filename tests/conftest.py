@@ -1,15 +1,31 @@
 """Pytest fixtures for PV Microinverter tests."""
 
-from datetime import datetime
+import time
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+import pytest_asyncio
+from homeassistant import config_entries, loader
+from homeassistant.config_entries import SOURCE_USER, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import floor_registry as fr
+from homeassistant.helpers import frame
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers import label_registry as lr
 
 from pv_microinverter.api import PVMicroinverterApiClient
 from pv_microinverter.const import (
     CONF_STATION_ID,
     CONF_UPDATE_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
     PVMicroinverterData,
 )
 from pv_microinverter.coordinator import (
@@ -26,7 +42,7 @@ def mock_api_client():
             current_power=500.0,
             today_energy=2.5,
             lifetime_energy=150.0,
-            last_updated=datetime.now().isoformat(),
+            last_updated=time.time(),
         )
     )
     client.async_check_connection = AsyncMock(return_value=True)
@@ -54,3 +70,65 @@ def mock_coordinator(mock_api_client):
     coordinator.last_update_success = True
     coordinator.async_config_entry_first_refresh = AsyncMock()
     return coordinator
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def hass(tmp_path: Path) -> AsyncGenerator[HomeAssistant]:
+    """Return a running Home Assistant instance with empty registries."""
+    hass = HomeAssistant(str(tmp_path))
+    loader.async_setup(hass)
+    frame.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    for registry in (ar, fr, lr, dr, er, ir):
+        await registry.async_load(hass)
+    await hass.async_start()
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+def create_coordinator(
+    hass: HomeAssistant,
+) -> Callable[..., PVMicroinverterDataUpdateCoordinator]:
+    """Return a factory of coordinators with mocked API clients.
+
+    The coordinators are not scheduled and their entries are not set up.
+    """
+
+    def _create(
+        station_id: str = "test_station_id", **options: Any
+    ) -> PVMicroinverterDataUpdateCoordinator:
+        api_client = MagicMock(spec=PVMicroinverterApiClient)
+        api_client.station_id = station_id
+        api_client.metadata = None
+        api_client.async_get_data = AsyncMock(
+            return_value=PVMicroinverterData(
+                current_power=500.0,
+                today_energy=2.5,
+                lifetime_energy=150.0,
+                last_updated=time.time(),
+            )
+        )
+        entry = ConfigEntry(
+            data={CONF_STATION_ID: station_id},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options=options,
+            source=SOURCE_USER,
+            subentries_data=None,
+            title=f"PV Microinverter {station_id}",
+            unique_id=station_id,
+            version=1,
+        )
+        coordinator = PVMicroinverterDataUpdateCoordinator(
+            hass=hass,
+            config_entry=entry,
+            api_client=api_client,
+            update_interval=options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL),
+        )
+        coordinator.async_apply_options()
+        return coordinator
+
+    return _create
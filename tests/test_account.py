@@ -0,0 +1,175 @@
+"""Tests for the PV Microinverter account client."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pv_microinverter.api import (
+    PVMicroinverterAccountClient,
+    PVMicroinverterAuthError,
+)
+
+STATION_INFO = json.loads(
+    (Path(__file__).parent / "fixtures" / "station_info.json").read_text()
+)
+
+
+class _Portal:
+    """Stand-in for the portal with an account of `count` stations."""
+
+    def __init__(
+        self, count: int, ignore_page: bool = False, total: bool = True
+    ) -> None:
+        self.stations = [
+            {"StationId": f"station_{idx}", "StationName": f"Roof {idx}"}
+            for idx in range(count)
+        ]
+        # Always answer with the first page, as some portal versions do
+        self.ignore_page = ignore_page
+        # Whether the TotalCount field is sent
+        self.total = total
+        self.pages: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def station_list(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body["Password"] != "secret":
+            return web.json_response({"Status": "1", "Result": "Login failed"})
+        page, size = body["PageIndex"], body["PageSize"]
+        self.pages.append(page)
+        if self.ignore_page:
+            page = 1
+        data = {"StationList": self.stations[(page - 1) * size : page * size]}
+        if self.total:
+            data["TotalCount"] = len(self.stations)
+        return web.json_response({"Status": "0", "Result": None, "Data": data})
+
+    async def station_info(self, request: web.Request) -> web.Response:
+        station_id = (await request.json())["stationId"]
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if station_id.endswith("7"):
+            raise web.HTTPNotFound
+        return web.json_response(STATION_INFO)
+
+
+def _client(
+    session: aiohttp.ClientSession, server: TestServer, password: str = "secret"
+) -> PVMicroinverterAccountClient:
+    return PVMicroinverterAccountClient(
+        session=session,
+        username="owner",
+        password=password,
+        base_url=str(server.make_url("/ApiStations")),
+    )
+
+
+def _app(portal: _Portal) -> web.Application:
+    app = web.Application()
+    app.router.add_post("/ApiStations/GetStationList", portal.station_list)
+    app.router.add_post("/ApiStations/GetStationInfo", portal.station_info)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_lists_stations_in_one_request():
+    """Test that an account of typical size is listed with a single request."""
+    portal = _Portal(200)
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server)
+        stations = await client.async_get_stations()
+
+    assert len(stations) == 200
+    assert stations[3].station_id == "station_3"
+    assert stations[3].name == "Roof 3"
+    assert portal.pages == [1]
+
+
+@pytest.mark.asyncio
+async def test_lists_large_account_in_pages(monkeypatch):
+    """Test that further pages are requested for a large account."""
+    monkeypatch.setattr("pv_microinverter.api.STATION_PAGE_SIZE", 50)
+    portal = _Portal(120)
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server)
+        stations = await client.async_get_stations()
+
+    assert [station.station_id for station in stations] == [
+        f"station_{idx}" for idx in range(120)
+    ]
+    assert portal.pages == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_lists_pages_without_total_count(monkeypatch):
+    """Test that all pages are listed if the portal does not report the total."""
+    monkeypatch.setattr("pv_microinverter.api.STATION_PAGE_SIZE", 50)
+    portal = _Portal(120, total=False)
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server)
+        stations = await client.async_get_stations()
+
+    assert len(stations) == 120
+    assert portal.pages == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_stops_when_page_index_is_ignored(monkeypatch):
+    """Test that listing stops at a page without new stations."""
+    monkeypatch.setattr("pv_microinverter.api.STATION_PAGE_SIZE", 50)
+    portal = _Portal(120, ignore_page=True)
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server)
+        stations = await client.async_get_stations()
+
+    assert len(stations) == 50
+    assert portal.pages == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_stops_after_max_pages(monkeypatch):
+    """Test that listing stops after the page limit."""
+    monkeypatch.setattr("pv_microinverter.api.STATION_PAGE_SIZE", 50)
+    monkeypatch.setattr("pv_microinverter.api.MAX_STATION_PAGES", 3)
+    portal = _Portal(1000)
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server)
+        stations = await client.async_get_stations()
+
+    assert len(stations) == 150
+    assert portal.pages == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_rejected_credentials():
+    """Test that rejected credentials raise an authentication error."""
+    portal = _Portal(3)
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server, password="wrong")
+        with pytest.raises(PVMicroinverterAuthError):
+            await client.async_get_stations()
+
+
+@pytest.mark.asyncio
+async def test_checks_stations_concurrently():
+    """Test that stations are checked concurrently, but bounded."""
+    portal = _Portal(40)
+    station_ids = [station["StationId"] for station in portal.stations]
+    async with TestServer(_app(portal)) as server, aiohttp.ClientSession() as session:
+        client = _client(session, server)
+        reachable = await client.async_check_stations(station_ids, max_concurrent=5)
+
+    assert reachable == {
+        station_id for station_id in station_ids if not station_id.endswith("7")
+    }
+    assert 1 < portal.max_in_flight <= 5
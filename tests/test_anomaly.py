@@ -0,0 +1,77 @@
+"""Tests for the PV Microinverter fleet yield monitor."""
+
+import random
+import time
+
+import numpy as np
+import pytest
+
+from pv_microinverter.anomaly import FleetYieldMonitor
+
+
+def _fleet(count: int, seed: int = 42) -> FleetYieldMonitor:
+    """Return a monitor with a healthy fleet at around 60% of capacity."""
+    rng = random.Random(seed)
+    monitor = FleetYieldMonitor(capacity=16)
+    for idx in range(count):
+        capacity = rng.choice([800.0, 1600.0, 2400.0])
+        monitor.update(f"station_{idx}", capacity * rng.gauss(0.6, 0.03), capacity)
+    return monitor
+
+
+def test_flags_underperforming_station():
+    """Test that a station far below the fleet's specific yield is flagged."""
+    monitor = _fleet(50)
+    monitor.update("shaded", 500.0, 2400.0)
+
+    assert monitor.is_underperforming("shaded") is True
+    assert monitor.score("shaded") < -3.5
+    assert monitor.median == pytest.approx(0.6, abs=0.02)
+    assert not any(monitor.is_underperforming(f"station_{idx}") for idx in range(50))
+
+
+def test_matches_brute_force():
+    """Test the scores against a straightforward recomputation."""
+    monitor = _fleet(200)
+    monitor.update("failed", None, 800.0)
+    monitor.remove("station_7")
+
+    yields = np.array([
+        monitor._yields[monitor._slots[f"station_{idx}"]]
+        for idx in range(200)
+        if idx != 7
+    ])
+    median = np.median(yields)
+    scale = max(1.4826 * np.median(np.abs(yields - median)), 0.05 * median)
+
+    assert len(monitor) == 200
+    assert monitor.score("failed") is None
+    assert monitor.score("station_7") is None
+    assert monitor.score("station_3") == pytest.approx(
+        (monitor._yields[monitor._slots["station_3"]] - median) / scale
+    )
+
+
+def test_no_verdict_without_enough_data():
+    """Test that small fleets and nighttime produce no verdict."""
+    monitor = _fleet(4)
+    assert monitor.is_underperforming("station_0") is None
+
+    night = FleetYieldMonitor()
+    for idx in range(20):
+        night.update(f"station_{idx}", 0.0, 1600.0)
+    assert night.is_underperforming("station_0") is None
+
+
+def test_compute_cost_at_1000_stations():
+    """Test that one fleet update stays below a millisecond at 1,000 stations."""
+    monitor = _fleet(1000)
+
+    durations = []
+    for idx in range(50):
+        monitor.update(f"station_{idx}", 500.0 + idx, 1600.0)
+        start = time.perf_counter()
+        monitor.compute()
+        durations.append(time.perf_counter() - start)
+
+    assert sorted(durations)[len(durations) // 2] < 1e-3
@@ -152,7 +152,7 @@ async def test_async_check_connection_success(api_client, mock_session):
 
     # Verify the API call
     mock_session.post.assert_called_once_with(
-        f"{api_client._base_url}/GetStationInfo",
+        f"{api_client.endpoints.current}/GetStationInfo",
         headers={
             "Authorization": "Bearer test_api_key",
             "Content-Type": "application/json",
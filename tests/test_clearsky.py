@@ -0,0 +1,58 @@
+"""Tests for the PV Microinverter clear-sky model."""
+
+from datetime import UTC, date, datetime
+
+import pytest
+
+from pv_microinverter.clearsky import (
+    STEP_SECONDS,
+    ClearSkyModel,
+    compute_clear_sky_power,
+)
+
+# Munich
+LATITUDE = 48.137
+LONGITUDE = 11.575
+CAPACITY = 2400.0
+
+
+def _timestamp(hour: int, minute: int = 0) -> float:
+    return datetime(2025, 6, 21, hour, minute, tzinfo=UTC).timestamp()
+
+
+def test_daily_profile():
+    """Test the shape of a summer day's profile."""
+    profile = compute_clear_sky_power(date(2025, 6, 21), LATITUDE, LONGITUDE, CAPACITY)
+
+    assert len(profile) == 86400 // STEP_SECONDS + 1
+    assert profile.min() == 0.0
+    assert 0.6 * CAPACITY < profile.max() < CAPACITY
+
+    # Solar noon in Munich is shortly after 11:00 UTC
+    peak_hour = profile.argmax() * STEP_SECONDS / 3600
+    assert 10.5 < peak_hour < 11.75
+
+
+def test_expected_power():
+    """Test the lookup of the expected power."""
+    model = ClearSkyModel(LATITUDE, LONGITUDE, CAPACITY)
+
+    assert model.expected_power(_timestamp(1)) == 0.0
+    assert model.expected_power(_timestamp(11)) > model.expected_power(_timestamp(7))
+
+    # Between two steps the profile is interpolated linearly
+    before = model.expected_power(_timestamp(9, 0))
+    after = model.expected_power(_timestamp(9, 5))
+    assert model.expected_power(_timestamp(9, 0) + 150) == pytest.approx(
+        (before + after) / 2
+    )
+
+
+def test_performance_ratio():
+    """Test the performance ratio against the model."""
+    model = ClearSkyModel(LATITUDE, LONGITUDE, CAPACITY)
+    timestamp = _timestamp(11)
+    expected = model.expected_power(timestamp)
+
+    assert model.performance_ratio(expected / 2, timestamp) == pytest.approx(50.0)
+    assert model.performance_ratio(0.0, _timestamp(1)) is None
@@ -0,0 +1,92 @@
+"""Tests for the PV Microinverter command line interface."""
+
+import asyncio
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pv_microinverter.__main__ import _parse_args, async_main
+
+STATION_INFO = json.loads(
+    (Path(__file__).parent / "fixtures" / "station_info.json").read_text()
+)
+
+
+async def _station_info(request: web.Request) -> web.Response:
+    station_id = (await request.json())["stationId"]
+    if station_id == "broken":
+        raise web.HTTPInternalServerError
+    if station_id == "slow":
+        await asyncio.sleep(1)
+    return web.json_response(STATION_INFO)
+
+
+async def _run(*argv: str) -> tuple[int, str]:
+    app = web.Application()
+    app.router.add_post("/ApiStations/GetStationInfo", _station_info)
+    async with TestServer(app) as server:
+        args = _parse_args([
+            *argv,
+            "--base-url",
+            str(server.make_url("/ApiStations")),
+        ])
+        stream = io.StringIO()
+        status = await async_main(args, stream)
+    return status, stream.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_ndjson_output():
+    """Test that every station is reported, including failures."""
+    status, output = await _run("station_a", "broken", "station_b", "--workers", "2")
+
+    rows = {row["station_id"]: row for row in map(json.loads, output.splitlines())}
+    assert status == 1
+    assert set(rows) == {"station_a", "broken", "station_b"}
+    assert rows["station_a"]["ok"] is True
+    assert rows["station_a"]["current_power"] == STATION_INFO["Data"]["Power"]
+    assert rows["station_a"]["capacity"] > 0
+    assert rows["broken"]["ok"] is False
+    assert "ClientResponseError" in rows["broken"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_csv_output_and_timeout():
+    """Test CSV output and that slow stations time out."""
+    status, output = await _run(
+        "station_a", "slow", "--format", "csv", "--timeout", "0.2"
+    )
+
+    rows = list(csv.DictReader(io.StringIO(output)))
+    assert status == 1
+    assert [row["station_id"] for row in rows] == ["station_a", "slow"]
+    assert rows[1]["ok"] == "False"
+    assert "TimeoutError" in rows[1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_bench():
+    """Test that bench mode only reports a summary."""
+    status, output = await _run("station_a", "station_b", "--bench", "--rounds", "3")
+
+    (summary,) = map(json.loads, output.splitlines())
+    assert status == 0
+    assert summary["requests"] == 6
+    assert summary["failures"] == 0
+    assert summary["throughput"] > 0
+    assert summary["latency_p50"] <= summary["latency_p99"]
+
+
+def test_station_file(tmp_path):
+    """Test reading station IDs from a file."""
+    path = tmp_path / "stations.txt"
+    path.write_text("# fleet\nstation_a\n\nstation_b  # roof\n")
+
+    args = _parse_args(["station_c", "--file", str(path)])
+
+    assert args.station_ids == ["station_c", "station_a", "station_b"]
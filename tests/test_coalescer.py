@@ -0,0 +1,195 @@
+"""Tests for the PV Microinverter state write coalescer."""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from pv_microinverter.coalescer import StateWriteCoalescer, async_get_write_coalescer
+from pv_microinverter.const import (
+    CONF_WRITE_WINDOW,
+    DOMAIN,
+    SENSOR_TYPES,
+    PVMicroinverterData,
+)
+from pv_microinverter.sensor import PVMicroinverterSensor
+
+# Stations of the fleet in the state write benchmark
+BENCHMARK_STATIONS = 200
+
+
+def _hass() -> SimpleNamespace:
+    return SimpleNamespace(loop=asyncio.get_running_loop(), data={})
+
+
+@pytest.mark.asyncio
+async def test_writes_are_flushed_together():
+    """Test that writes across stations are flushed on the next loop tick."""
+    written = []
+    coalescer = StateWriteCoalescer(_hass())
+    entities = [MagicMock() for _ in range(6)]
+    for idx, entity in enumerate(entities):
+        entity.async_write_ha_state.side_effect = lambda idx=idx: written.append(idx)
+
+    for entity in entities:
+        coalescer.async_schedule_write(entity)
+    assert written == []
+
+    await asyncio.sleep(0)
+    assert written == [0, 1, 2, 3, 4, 5]
+    assert coalescer.flushes == 1
+    assert coalescer.writes == 6
+
+
+@pytest.mark.asyncio
+async def test_superseded_writes_are_dropped():
+    """Test that an entity marked dirty twice within a window is written once."""
+    coalescer = StateWriteCoalescer(_hass(), delay=0.01)
+    entities = [MagicMock() for _ in range(200 * 3)]
+
+    # Two updates of the whole fleet within one window
+    for _ in range(2):
+        for entity in entities:
+            coalescer.async_schedule_write(entity)
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(0.02)
+    assert coalescer.flushes == 1
+    assert coalescer.writes == len(entities)
+    assert coalescer.superseded == len(entities)
+    for entity in entities:
+        entity.async_write_ha_state.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_discard_and_flush():
+    """Test that discarded entities are not written and flushing is immediate."""
+    coalescer = StateWriteCoalescer(_hass(), delay=60)
+    kept, removed = MagicMock(), MagicMock()
+    coalescer.async_schedule_write(kept)
+    coalescer.async_schedule_write(removed)
+
+    coalescer.async_discard(removed)
+    coalescer.async_flush()
+
+    kept.async_write_ha_state.assert_called_once()
+    removed.async_write_ha_state.assert_not_called()
+
+    # The next write arms a new flush
+    coalescer.async_schedule_write(kept)
+    coalescer.async_flush()
+    assert kept.async_write_ha_state.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_short_window_pulls_flush_forward():
+    """Test that a write with a shorter window is not held back by a longer one."""
+    coalescer = StateWriteCoalescer(_hass())
+    slow, fast = MagicMock(), MagicMock()
+
+    coalescer.async_schedule_write(slow, 60)
+    coalescer.async_schedule_write(fast, 0.01)
+    await asyncio.sleep(0.02)
+
+    # Both are written with the earlier flush
+    slow.async_write_ha_state.assert_called_once()
+    fast.async_write_ha_state.assert_called_once()
+    assert coalescer.flushes == 1
+
+
+async def _write_fleet(
+    hass: HomeAssistant,
+    create_coordinator,
+    stations: int,
+    updates: int,
+    write_window: float,
+) -> tuple[float, int]:
+    """Push updates to all stations of a fleet and write the sensor states.
+
+    Returns:
+        The time in seconds to process the updates and write the states, and
+        the number of state changes written
+    """
+    coordinators = [
+        create_coordinator(f"station_{idx}", **{CONF_WRITE_WINDOW: write_window})
+        for idx in range(stations)
+    ]
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=60),
+        entity_namespace=None,
+    )
+    await platform.async_add_entities([
+        PVMicroinverterSensor(coordinator, coordinator.api_client.station_id, key, info)
+        for coordinator in coordinators
+        for key, info in SENSOR_TYPES.items()
+    ])
+    await hass.async_block_till_done()
+
+    changes = []
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, changes.append)
+    now = time.time()
+    start = time.perf_counter()
+    for update in range(1, updates + 1):
+        for coordinator in coordinators:
+            # Every value changes by more than the deadband
+            coordinator.async_push_readings([
+                PVMicroinverterData(
+                    current_power=500.0 + 100 * update,
+                    today_energy=2.5 + update,
+                    lifetime_energy=150.0 + update,
+                    last_updated=now + update,
+                )
+            ])
+    async_get_write_coalescer(hass).async_flush()
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - start
+    unsub()
+    await platform.async_reset()
+    return elapsed, len(changes)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("updates", "write_window"),
+    [(1, 0), (5, 5)],
+    ids=["one_update", "pushed_updates"],
+)
+async def test_benchmark_fleet_writes(hass, create_coordinator, updates, write_window):
+    """Compare direct state writes with coalesced ones for a fleet of stations.
+
+    A single update per station costs about the same either way, so its timings
+    are not compared.
+    """
+    stations = BENCHMARK_STATIONS
+    sensors = stations * len(SENSOR_TYPES)
+
+    with patch.object(
+        StateWriteCoalescer,
+        "async_schedule_write",
+        lambda self, entity, delay=None: entity.async_write_ha_state(),
+    ):
+        direct, direct_changes = await _write_fleet(
+            hass, create_coordinator, stations, updates, write_window
+        )
+    coalesced, coalesced_changes = await _write_fleet(
+        hass, create_coordinator, stations, updates, write_window
+    )
+
+    assert direct_changes == sensors * updates
+    # Writes superseded within the window are dropped
+    assert coalesced_changes == sensors
+    if updates > 1:
+        # About five times faster here, which leaves room for slow machines
+        assert coalesced < direct
@@ -0,0 +1,235 @@
+"""Tests for the PV Microinverter config flow."""
+
+from types import MappingProxyType
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import (
+    SOURCE_IMPORT,
+    SOURCE_REAUTH,
+    SOURCE_USER,
+    ConfigEntry,
+)
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import AbortFlow, FlowResultType
+
+from pv_microinverter.api import (
+    AccountStation,
+    PVMicroinverterAccountClient,
+    PVMicroinverterApiClient,
+)
+from pv_microinverter.config_flow import PVMicroinverterConfigFlow
+from pv_microinverter.const import (
+    CONF_BASE_URLS,
+    CONF_POWER_DEADBAND,
+    CONF_STATION_ID,
+    CONF_STATIONS,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_BASE_URLS,
+    DOMAIN,
+)
+
+
+@pytest.fixture(autouse=True)
+def session():
+    """Keep the flow off the shared client session, which needs the network."""
+    with patch(
+        "pv_microinverter.config_flow.async_get_clientsession",
+        return_value=MagicMock(),
+    ) as get_session:
+        yield get_session.return_value
+
+
+def _flow(hass: HomeAssistant, source: str = SOURCE_USER) -> PVMicroinverterConfigFlow:
+    """Return a config flow that is driven step by step."""
+    flow = PVMicroinverterConfigFlow()
+    flow.hass = hass
+    flow.handler = DOMAIN
+    flow.flow_id = "test_flow"
+    flow.context = {"source": source}
+    return flow
+
+
+def _add_entry(hass: HomeAssistant, station_id: str, **data) -> ConfigEntry:
+    """Add the entry of an already configured station, without setting it up."""
+    entry = ConfigEntry(
+        data={CONF_STATION_ID: station_id, **data},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source=SOURCE_USER,
+        subentries_data=None,
+        title=f"PV Microinverter {station_id}",
+        unique_id=station_id,
+        version=1,
+    )
+    hass.config_entries._entries[entry.entry_id] = entry
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_reauth_only_asks_for_station(hass):
+    """Test that reauth neither shows nor overwrites the tuning options."""
+    entry = _add_entry(
+        hass, "station_1", **{CONF_UPDATE_INTERVAL: 120, CONF_POWER_DEADBAND: 20.0}
+    )
+    flow = _flow(hass, SOURCE_REAUTH)
+
+    result = await flow.async_step_reauth()
+    assert result["type"] is FlowResultType.FORM
+    assert [str(key) for key in result["data_schema"].schema] == [CONF_STATION_ID]
+
+    with (
+        patch.object(
+            PVMicroinverterApiClient, "async_check_connection", return_value=True
+        ),
+        patch.object(hass.config_entries, "async_reload", AsyncMock()) as reload,
+    ):
+        result = await flow.async_step_reauth({CONF_STATION_ID: "station_1"})
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert entry.data[CONF_UPDATE_INTERVAL] == 120
+    assert entry.data[CONF_POWER_DEADBAND] == 20.0
+    reload.assert_awaited_once_with(entry.entry_id)
+
+
+ACCOUNT = {
+    CONF_USERNAME: "owner",
+    CONF_PASSWORD: "secret",
+    CONF_BASE_URLS: DEFAULT_BASE_URLS,
+}
+
+
+def _account_stations(*station_ids: str) -> list[AccountStation]:
+    return [
+        AccountStation(station_id, f"Roof {station_id}") for station_id in station_ids
+    ]
+
+
+@pytest.mark.asyncio
+async def test_user_step_offers_menu(hass):
+    """Test that the user chooses between a single station and an account."""
+    result = await _flow(hass).async_step_user()
+
+    assert result["type"] is FlowResultType.MENU
+    assert result["menu_options"] == ["station", "account"]
+
+
+@pytest.mark.asyncio
+async def test_account_without_new_stations(hass):
+    """Test that an account whose stations are all configured aborts."""
+    _add_entry(hass, "station_1")
+    flow = _flow(hass)
+
+    with patch.object(
+        PVMicroinverterAccountClient,
+        "async_get_stations",
+        return_value=_account_stations("station_1"),
+    ):
+        result = await flow.async_step_account(ACCOUNT)
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "no_new_stations"
+
+
+@pytest.mark.asyncio
+async def test_account_offers_only_new_stations(hass):
+    """Test that configured stations are left out of the selection."""
+    _add_entry(hass, "station_1")
+    flow = _flow(hass)
+
+    with patch.object(
+        PVMicroinverterAccountClient,
+        "async_get_stations",
+        return_value=_account_stations("station_1", "station_2", "station_3"),
+    ):
+        result = await flow.async_step_account(ACCOUNT)
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "select"
+    assert result["description_placeholders"]["count"] == "2"
+    assert list(flow._stations) == ["station_2", "station_3"]
+
+
+@pytest.mark.asyncio
+async def test_select_with_unreachable_stations(hass):
+    """Test that unreachable stations re-show the form with the others selected."""
+    flow = _flow(hass)
+    with patch.object(
+        PVMicroinverterAccountClient,
+        "async_get_stations",
+        return_value=_account_stations("station_1", "station_2", "station_3"),
+    ):
+        await flow.async_step_account(ACCOUNT)
+
+    with patch.object(
+        PVMicroinverterAccountClient,
+        "async_check_stations",
+        return_value={"station_1", "station_3"},
+    ):
+        result = await flow.async_step_select({
+            CONF_STATIONS: ["station_1", "station_2", "station_3"]
+        })
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "select"
+    assert result["errors"] == {"base": "cannot_connect_stations"}
+    assert result["description_placeholders"]["unreachable"] == "station_2"
+    selected = next(
+        key for key in result["data_schema"].schema if str(key) == CONF_STATIONS
+    )
+    assert selected.default() == ["station_1", "station_3"]
+
+
+@pytest.mark.asyncio
+async def test_select_imports_remaining_stations(hass):
+    """Test that the first station gets this flow's entry and the others are
+    imported, reporting stations configured in the meantime."""
+    flow = _flow(hass)
+    with patch.object(
+        PVMicroinverterAccountClient,
+        "async_get_stations",
+        return_value=_account_stations("station_1", "station_2", "station_3"),
+    ):
+        await flow.async_step_account({
+            **ACCOUNT,
+            CONF_BASE_URLS: "https://a.example, https://b.example",
+        })
+    # Added by hand while the account was being onboarded
+    _add_entry(hass, "station_2")
+
+    imported = []
+
+    async def _async_init(domain: str, *, context: dict, data: dict) -> dict:
+        """Run an import flow to its result, as the flow manager does."""
+        assert (domain, context) == (DOMAIN, {"source": SOURCE_IMPORT})
+        try:
+            result = await _flow(hass, SOURCE_IMPORT).async_step_import(data)
+        except AbortFlow as abort:
+            return {"type": FlowResultType.ABORT, "reason": abort.reason}
+        imported.append(result["data"])
+        return result
+
+    with (
+        patch.object(
+            PVMicroinverterAccountClient,
+            "async_check_stations",
+            return_value={"station_1", "station_2", "station_3"},
+        ),
+        patch.object(hass.config_entries.flow, "async_init", _async_init),
+    ):
+        result = await flow.async_step_select({
+            CONF_STATIONS: ["station_1", "station_2", "station_3"]
+        })
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_STATION_ID] == "station_1"
+    assert result["data"][CONF_BASE_URLS] == "https://a.example, https://b.example"
+    assert result["description"] == "stations_skipped"
+    assert result["description_placeholders"] == {"skipped": "station_2"}
+
+    assert [data[CONF_STATION_ID] for data in imported] == ["station_3"]
+    assert imported[0][CONF_BASE_URLS] == "https://a.example, https://b.example"
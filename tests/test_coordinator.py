@@ -0,0 +1,223 @@
+"""Tests for the PV Microinverter data update coordinator."""
+
+import logging
+import sys
+import time
+from datetime import timedelta
+from types import MappingProxyType
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import SOURCE_USER, ConfigEntry, ConfigEntryState
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from pv_microinverter import async_setup_entry
+from pv_microinverter.api import PVMicroinverterApiClient
+from pv_microinverter.const import (
+    CONF_ENABLE_WEBHOOK,
+    CONF_IDLE_INTERVAL,
+    CONF_STATION_ID,
+    CONF_UPDATE_INTERVAL,
+    DOMAIN,
+    SENSOR_TYPES,
+    PVMicroinverterData,
+)
+from pv_microinverter.coordinator import PUSH_SAMPLE_INTERVAL
+from pv_microinverter.rolling import PowerStatistics
+from pv_microinverter.scheduler import async_get_scheduler
+from pv_microinverter.sensor import PVMicroinverterSensor
+
+
+def _reading(timestamp: float, power: float) -> PVMicroinverterData:
+    return PVMicroinverterData(
+        current_power=power,
+        today_energy=2.5,
+        lifetime_energy=150.0,
+        last_updated=timestamp,
+    )
+
+
+@pytest.mark.asyncio
+async def test_dense_pushes_keep_window_span(create_coordinator):
+    """Test that readings pushed every second still fill the whole windows."""
+    coordinator = create_coordinator(**{CONF_ENABLE_WEBHOOK: True})
+    start = time.time() - 4000
+
+    # Four full batches of readings one second apart
+    for batch in range(4):
+        readings = [
+            _reading(start + second, float(second % 600))
+            for second in range(batch * 1000, (batch + 1) * 1000)
+        ]
+        assert coordinator.async_push_readings(readings) == 1000
+
+    statistics = coordinator.power_statistics
+    newest = start + 3999
+    for window, length in (
+        (statistics.window_15m, PowerStatistics.WINDOW_15M),
+        (statistics.window_1h, PowerStatistics.WINDOW_1H),
+    ):
+        oldest, _ = next(iter(window))
+        assert newest - oldest == pytest.approx(length, abs=PUSH_SAMPLE_INTERVAL)
+    # Every fifth reading of the 0..599 W sawtooth is kept in the windows
+    assert statistics.window_1h.mean == pytest.approx(297.5)
+    assert statistics.peak_today == 599
+    assert coordinator.data.last_updated == newest
+
+
+def _fresh_coordinator(create_coordinator, age: float, **options):
+    """Return a scheduled coordinator holding a reading of the given age."""
+    coordinator = create_coordinator(**{
+        CONF_UPDATE_INTERVAL: 300,
+        CONF_IDLE_INTERVAL: 3600,
+        **options,
+    })
+    coordinator.data = _reading(time.time() - age, 500.0)
+    async_get_scheduler(coordinator.hass).async_add(coordinator)
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_demand_switches_poll_interval(hass, create_coordinator):
+    """Test that the first listener switches an idle station to the full rate."""
+    coordinator = _fresh_coordinator(create_coordinator, age=10)
+    assert coordinator.poll_interval == timedelta(seconds=3600)
+
+    scheduler = async_get_scheduler(hass)
+    with patch.object(
+        scheduler, "async_reschedule", wraps=scheduler.async_reschedule
+    ) as reschedule:
+        remove_first = coordinator.async_add_listener(lambda: None)
+        remove_second = coordinator.async_add_listener(lambda: None)
+        await hass.async_block_till_done()
+
+        assert coordinator.poll_interval == timedelta(seconds=300)
+        reschedule.assert_called_once_with(coordinator)
+        # The reading is recent enough, so the next regular poll is awaited
+        coordinator.api_client.async_get_data.assert_not_awaited()
+
+        remove_first()
+        assert coordinator.poll_interval == timedelta(seconds=300)
+        remove_second()
+        assert coordinator.poll_interval == timedelta(seconds=3600)
+        assert reschedule.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_demand_catches_up_on_stale_data(hass, create_coordinator):
+    """Test that a station becoming in demand is polled at once if stale."""
+    coordinator = _fresh_coordinator(create_coordinator, age=600)
+
+    coordinator.async_add_listener(lambda: None)
+    await hass.async_block_till_done()
+
+    coordinator.api_client.async_get_data.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_idle_interval_zero_disables_idling(hass, create_coordinator):
+    """Test that without an idle interval the full rate is kept throughout."""
+    coordinator = _fresh_coordinator(
+        create_coordinator, age=600, **{CONF_IDLE_INTERVAL: 0}
+    )
+    assert coordinator.poll_interval == timedelta(seconds=300)
+
+    scheduler = async_get_scheduler(hass)
+    with patch.object(scheduler, "async_reschedule") as reschedule:
+        remove_listener = coordinator.async_add_listener(lambda: None)
+        remove_listener()
+        await hass.async_block_till_done()
+
+    assert coordinator.poll_interval == timedelta(seconds=300)
+    reschedule.assert_not_called()
+    # The station was polled all along, so there is nothing to catch up on
+    coordinator.api_client.async_get_data.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_idle_station_leaves_fleet_comparison(hass, create_coordinator):
+    """Test that the last listener going away clears the station's yield."""
+    coordinator = _fresh_coordinator(create_coordinator, age=10)
+    station_id = coordinator.api_client.station_id
+    remove_listener = coordinator.async_add_listener(lambda: None)
+
+    with patch.object(coordinator.fleet_monitor, "update") as update:
+        coordinator.async_push_readings([_reading(time.time(), 600.0)])
+        update.assert_called_once_with(station_id, 600.0, None)
+        update.reset_mock()
+
+        remove_listener()
+        update.assert_called_once_with(station_id, None, None)
+        update.reset_mock()
+
+        # Readings of the idle station are not reported
+        coordinator.async_push_readings([_reading(time.time() + 1, 700.0)])
+        update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unload_does_not_resurrect_station(hass):
+    """Test that removing the entities on unload does not schedule the station
+    or add it to the fleet comparison again."""
+    entry = ConfigEntry(
+        data={CONF_STATION_ID: "station_1"},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={},
+        source=SOURCE_USER,
+        subentries_data=None,
+        title="PV Microinverter station_1",
+        unique_id="station_1",
+        version=1,
+    )
+    # Known to hass, but set up by hand below
+    hass.config_entries._entries[entry.entry_id] = entry
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="sensor",
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=60),
+        entity_namespace=None,
+    )
+
+    async def _unload_platforms(*_args) -> bool:
+        await platform.async_reset()
+        return True
+
+    with (
+        patch("pv_microinverter.async_get_clientsession"),
+        patch.object(
+            PVMicroinverterApiClient,
+            "async_get_data",
+            return_value=_reading(time.time(), 500.0),
+        ),
+        patch.object(hass.config_entries, "async_forward_entry_setups"),
+        patch.object(hass.config_entries, "async_unload_platforms", _unload_platforms),
+    ):
+        entry._async_set_state(hass, ConfigEntryState.SETUP_IN_PROGRESS, None)
+        assert await async_setup_entry(hass, entry)
+        entry._async_set_state(hass, ConfigEntryState.LOADED, None)
+
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        await platform.async_add_entities([
+            PVMicroinverterSensor(coordinator, "station_1", key, info)
+            for key, info in SENSOR_TYPES.items()
+        ])
+        scheduler = async_get_scheduler(hass)
+        assert "station_1" in scheduler.offsets
+        assert len(coordinator.fleet_monitor) == 1
+
+        integration = MagicMock(domain=DOMAIN)
+        integration.async_get_component = AsyncMock(
+            return_value=sys.modules["pv_microinverter"]
+        )
+        async with entry.setup_lock:
+            assert await entry.async_unload(hass, integration=integration)
+        await hass.async_block_till_done()
+
+    assert not coordinator.has_demand
+    assert "station_1" not in scheduler.offsets
+    assert len(coordinator.fleet_monitor) == 0
@@ -0,0 +1,239 @@
+"""Tests for the failover between PV Microinverter portal endpoints."""
+
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pv_microinverter.api import PVMicroinverterApiClient
+from pv_microinverter.const import CONF_BASE_URLS, DATA_ENDPOINT_POOLS
+from pv_microinverter.endpoints import PROBE_INTERVAL, EndpointPool
+
+STATION_INFO = json.loads(
+    (Path(__file__).parent / "fixtures" / "station_info.json").read_text()
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Portal:
+    """Stand-in for one portal front end with adjustable behavior."""
+
+    def __init__(self) -> None:
+        self.delay = 0.0
+        self.broken = False
+        self.requests = 0
+        self.server: TestServer | None = None
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("/ApiStations"))
+
+    async def _station_info(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.broken:
+            raise web.HTTPBadGateway
+        return web.json_response(STATION_INFO)
+
+
+@asynccontextmanager
+async def _portals(count: int) -> AsyncGenerator[list[_Portal]]:
+    portals = [_Portal() for _ in range(count)]
+    servers = []
+    try:
+        for portal in portals:
+            app = web.Application()
+            app.router.add_post("/ApiStations/GetStationInfo", portal._station_info)
+            portal.server = TestServer(app)
+            await portal.server.start_server()
+            servers.append(portal.server)
+        yield portals
+    finally:
+        for server in servers:
+            await server.close()
+
+
+def test_prefers_given_order_until_known():
+    """Test that unknown endpoints rank in order, after known ones."""
+    pool = EndpointPool(["https://a/", "https://b", "https://a"])
+
+    assert pool.urls == ["https://a", "https://b"]
+    assert pool.select() == "https://a"
+    pool.record_success("https://b", 0.1)
+    assert pool.select() == "https://b"
+
+
+def test_switches_only_to_clearly_faster_endpoint():
+    """Test the hysteresis between endpoints with similar latency."""
+    pool = EndpointPool(["https://a", "https://b"])
+    pool.record_success("https://a", 0.5)
+    pool.record_success("https://b", 0.45)
+    assert pool.select() == "https://a"
+
+    for _ in range(10):
+        pool.record_success("https://b", 0.1)
+    assert pool.select() == "https://b"
+
+
+def test_demotes_failing_endpoint():
+    """Test that an endpoint failing too often ranks behind slow healthy ones."""
+    pool = EndpointPool(["https://a", "https://b"], failure_latency=10)
+    pool.record_success("https://a", 0.1)
+    pool.record_success("https://b", 2.0)
+    assert pool.select() == "https://a"
+
+    for _ in range(4):
+        pool.record_failure("https://a")
+    assert next(iter(pool)).demoted
+    assert pool.select() == "https://b"
+    # Still used if every other endpoint was tried already
+    assert pool.select(exclude={"https://b"}) == "https://a"
+
+
+def test_due_probes():
+    """Test that idle endpoints are probed once per interval."""
+    clock = _Clock()
+    pool = EndpointPool(["https://a", "https://b", "https://c"], clock=clock)
+
+    assert pool.due_probes() == ["https://b", "https://c"]
+    assert pool.due_probes() == []
+    clock.now = PROBE_INTERVAL - 1
+    pool.record_success("https://c", 0.1)
+    clock.now = PROBE_INTERVAL
+    assert pool.due_probes() == ["https://b"]
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_healthy_endpoint():
+    """Test that a request fails over and the broken endpoint is avoided."""
+    async with _portals(2) as (primary, secondary), aiohttp.ClientSession() as session:
+        primary.broken = True
+        client = PVMicroinverterApiClient(
+            session=session,
+            station_id="station",
+            base_url=[primary.url, secondary.url],
+        )
+
+        data = await client.async_get_data()
+        assert data.current_power == STATION_INFO["Data"]["Power"]
+        assert next(iter(client.endpoints)).demoted
+
+        primary.requests = 0
+        for _ in range(5):
+            await client.async_get_data()
+        assert primary.requests == 0
+        assert secondary.requests == 6
+
+
+@pytest.mark.asyncio
+async def test_moves_to_faster_endpoint_after_probe():
+    """Test that a background probe discovers a faster endpoint."""
+    async with _portals(2) as (primary, secondary), aiohttp.ClientSession() as session:
+        primary.delay = 0.2
+        client = PVMicroinverterApiClient(
+            session=session,
+            station_id="station",
+            base_url=[primary.url, secondary.url],
+        )
+
+        await client.async_get_data()
+        assert secondary.requests == 0
+        # Let the background probe of the idle endpoint finish
+        await asyncio.sleep(0.1)
+        assert secondary.requests == 1
+
+        await client.async_get_data()
+        assert secondary.requests == 2
+        assert primary.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_counts_against_endpoint():
+    """Test that a timed out request is recorded as a failure of its endpoint."""
+    async with _portals(2) as (primary, secondary), aiohttp.ClientSession() as session:
+        primary.delay = 1
+        client = PVMicroinverterApiClient(
+            session=session,
+            station_id="station",
+            base_url=[primary.url, secondary.url],
+            request_timeout=0.2,
+        )
+
+        with pytest.raises(Exception, match="Timeout"):
+            await client.async_get_data()
+        health = {health.url: health for health in client.endpoints}
+        assert health[primary.url.rstrip("/")].error_rate == 1
+
+        # The idle endpoint was probed in the background and takes over
+        await asyncio.sleep(0.1)
+        await client.async_get_data()
+        assert primary.requests == 1
+        assert secondary.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_probes():
+    """Test that closing the pool cancels the probes still in flight."""
+    pool = EndpointPool(["https://a", "https://b"])
+    started = asyncio.Event()
+
+    async def _probe(url: str) -> None:
+        started.set()
+        await asyncio.sleep(60)
+
+    pool.schedule_probes(_probe)
+    await started.wait()
+    (probe,) = pool._probes
+
+    pool.close()
+    await asyncio.sleep(0)
+    assert probe.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_shared_pools_are_released(hass, create_coordinator):
+    """Test that a shared pool is dropped once no station uses it anymore."""
+    first = create_coordinator("station_1", **{CONF_BASE_URLS: "https://a, https://b"})
+    second = create_coordinator("station_2", **{CONF_BASE_URLS: "https://a/,https://b"})
+    pool = first.api_client.endpoints
+    assert second.api_client.endpoints is pool
+    assert len(hass.data[DATA_ENDPOINT_POOLS]) == 1
+
+    # Probes run as background tasks of hass, which closing the pool cancels
+    pool.schedule_probes(lambda url: asyncio.sleep(60))
+    (probe,) = pool._probes
+    assert probe in hass._background_tasks
+
+    # Applying unchanged options keeps the pool
+    first.async_apply_options()
+    assert first.api_client.endpoints is pool
+
+    first.async_unload_endpoints()
+    assert hass.data[DATA_ENDPOINT_POOLS]
+    assert not probe.done()
+
+    # Moving the last user to other endpoints drops the pool
+    entry = second.config_entry
+    hass.config_entries._entries[entry.entry_id] = entry
+    hass.config_entries.async_update_entry(entry, options={CONF_BASE_URLS: "https://c"})
+    second.async_apply_options()
+    await asyncio.sleep(0)
+    assert probe.cancelled()
+    assert list(hass.data[DATA_ENDPOINT_POOLS]) == [("https://c",)]
+
+    second.async_unload_endpoints()
+    assert not hass.data[DATA_ENDPOINT_POOLS]
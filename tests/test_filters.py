@@ -0,0 +1,52 @@
+"""Tests for the PV Microinverter state write filters."""
+
+from pv_microinverter.filters import DeadbandFilter
+
+
+def test_first_value_is_written():
+    """Test that the first value always passes."""
+    assert DeadbandFilter(absolute=10).update(100.0, now=0)
+
+
+def test_absolute_deadband():
+    """Test that changes within the absolute deadband are dropped."""
+    deadband = DeadbandFilter(absolute=5)
+    assert deadband.update(100.0, now=0)
+    assert not deadband.update(104.0, now=1)
+    assert not deadband.update(96.0, now=2)
+    assert deadband.update(106.0, now=3)
+    # The band is centered on the last *written* value
+    assert not deadband.update(102.0, now=4)
+
+
+def test_percent_deadband():
+    """Test that the relative deadband scales with the last written value."""
+    deadband = DeadbandFilter(percent=2)
+    assert deadband.update(1000.0, now=0)
+    assert not deadband.update(1019.0, now=1)
+    assert deadband.update(1021.0, now=2)
+
+
+def test_no_deadband_drops_only_identical_values():
+    """Test that without a deadband only unchanged values are dropped."""
+    deadband = DeadbandFilter()
+    assert deadband.update(1.5, now=0)
+    assert not deadband.update(1.5, now=1)
+    assert deadband.update(1.6, now=2)
+
+
+def test_heartbeat():
+    """Test that a value is written once the heartbeat has elapsed."""
+    deadband = DeadbandFilter(absolute=5, heartbeat=60)
+    assert deadband.update(100.0, now=0)
+    assert not deadband.update(101.0, now=59)
+    assert deadband.update(101.0, now=60)
+    assert not deadband.update(101.0, now=61)
+
+
+def test_unavailable_value_is_written():
+    """Test that a missing value is never filtered."""
+    deadband = DeadbandFilter(absolute=5)
+    assert deadband.update(100.0, now=0)
+    assert deadband.update(None, now=1)
+    assert deadband.update(100.0, now=2)
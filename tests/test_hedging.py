@@ -0,0 +1,97 @@
+"""Tests for hedged requests of the PV Microinverter API client."""
+
+import asyncio
+
+import pytest
+
+from pv_microinverter.hedging import HedgeBudget, LatencyTracker, async_hedged
+
+
+def test_latency_percentile():
+    """Test the nearest-rank percentile of the recorded latencies."""
+    tracker = LatencyTracker(size=100)
+    assert tracker.percentile(95) is None
+
+    for latency in range(1, 101):
+        tracker.add(latency / 100)
+    assert tracker.percentile(95) == 0.95
+    assert tracker.percentile(50) == 0.5
+
+
+def test_hedge_budget():
+    """Test that the budget allows hedging a fraction of all requests."""
+    budget = HedgeBudget(ratio=0.1, burst=2)
+    hedges = 0
+    for _ in range(100):
+        budget.on_request()
+        hedges += budget.try_acquire()
+
+    assert hedges == 10
+
+
+class _Requests:
+    """Factory for attempts with scripted latencies."""
+
+    def __init__(self, *latencies: float) -> None:
+        self._latencies = list(latencies)
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> int:
+        attempt = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self._latencies[attempt])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return attempt
+
+
+def _funded_budget() -> HedgeBudget:
+    return HedgeBudget(ratio=1, burst=1)
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    """Test that a request answering before the hedge delay is sent once."""
+    requests = _Requests(0.01)
+    assert await async_hedged(requests, 0.2, _funded_budget()) == 0
+    assert requests.started == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged():
+    """Test that the hedge wins over a stuck request, which is cancelled."""
+    requests = _Requests(10, 0.01)
+    assert await async_hedged(requests, 0.05, _funded_budget()) == 1
+    assert requests.started == 2
+    await asyncio.sleep(0)
+    assert requests.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget():
+    """Test that no hedge is sent once the budget is used up."""
+    requests = _Requests(0.1, 0.01)
+    budget = HedgeBudget(ratio=0, burst=0)
+    assert await async_hedged(requests, 0.01, budget) == 0
+    assert requests.started == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_falls_back_to_hedge():
+    """Test that a hedged call only fails if all attempts fail."""
+
+    attempts = 0
+
+    async def request() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await asyncio.sleep(0.05)
+            raise ConnectionError
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    assert await async_hedged(request, 0.01, _funded_budget()) == "hedge"
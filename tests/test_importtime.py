@@ -0,0 +1,64 @@
+"""Import time budget of the PV Microinverter integration."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+ROOT = Path(__file__).parent.parent
+PACKAGE = "custom_components.pv_microinverter"
+
+# Modules Home Assistant has loaded long before it imports the integration
+PRELOADED = (
+    "homeassistant.config_entries",
+    "homeassistant.const",
+    "homeassistant.core",
+    "homeassistant.exceptions",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.dispatcher",
+)
+
+# Cumulative import time of the package on top of the preloaded modules, in µs.
+# Generous, so that slow CI machines pass, but far below the cost of NumPy.
+IMPORT_BUDGET_US = 50_000
+
+# Modules that must only be imported once an entry is set up
+DEFERRED = ("numpy", f"{PACKAGE}.coordinator", f"{PACKAGE}.api")
+
+
+def _importtime() -> dict[str, tuple[int, int]]:
+    """Import the package in a fresh interpreter and return self and cumulative
+    import time in µs by module."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {', '.join(PRELOADED)}; import {PACKAGE}",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_import_is_cheap():
+    """Test that importing the package stays within budget."""
+    times = _importtime()
+
+    assert PACKAGE in times
+    assert times[PACKAGE][1] < IMPORT_BUDGET_US
+    assert not [module for module in DEFERRED if module in times]
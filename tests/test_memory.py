@@ -0,0 +1,70 @@
+"""Memory footprint tests for the PV Microinverter data model."""
+
+import dataclasses
+import json
+import tracemalloc
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from pv_microinverter.api import PVMicroinverterApiClient, StationMetadata
+
+STATION_COUNT = 10_000
+
+# Upper bound for the retained size of the data kept per station
+MAX_BYTES_PER_STATION = 700
+
+STATION_INFO = json.loads(
+    (Path(__file__).parent / "fixtures" / "station_info.json").read_text()
+)
+
+
+def _station_info(idx: int) -> str:
+    return json.dumps({
+        **STATION_INFO,
+        "Data": {**STATION_INFO["Data"], "StationName": f"Station {idx}"},
+    })
+
+
+def test_memory_per_station():
+    """Test the retained memory per station for a large fleet."""
+    # Decode each station separately, so no string objects are shared up front,
+    # just as with real responses.
+    raw = [_station_info(idx) for idx in range(STATION_COUNT)]
+    client = PVMicroinverterApiClient(session=MagicMock(), station_id="station")
+
+    def _poll(body: str) -> tuple:
+        """Parse a response and return what the coordinator keeps of it."""
+        client.metadata = None
+        data = client._process_data(json.loads(body), timestamp=1000.0)
+        return data, client.metadata
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        fleet = [_poll(body) for body in raw]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    per_station = retained / len(fleet)
+
+    assert per_station < MAX_BYTES_PER_STATION
+
+
+def test_repeated_strings_are_interned():
+    """Test that values repeating across stations share one string object."""
+    first = StationMetadata.from_dict(json.loads(_station_info(1))["Data"])
+    second = StationMetadata.from_dict(json.loads(_station_info(2))["Data"])
+
+    assert first.time_zone is second.time_zone
+    assert first.inverter_models[0] is second.inverter_models[0]
+    assert first.installer is second.installer
+    assert not hasattr(first, "__dict__")
+
+    # Also when restored from the metadata cache
+    fields = json.loads(json.dumps(dataclasses.asdict(first)))
+    fields["inverter_models"] = tuple(fields["inverter_models"])
+    restored = StationMetadata(**fields)
+    assert restored.time_zone is first.time_zone
+    assert restored.inverter_models[0] is first.inverter_models[0]
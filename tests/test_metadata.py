@@ -0,0 +1,72 @@
+"""Tests for the PV Microinverter station metadata."""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from pv_microinverter.api import (
+    METADATA_TTL,
+    PVMicroinverterApiClient,
+    StationMetadata,
+)
+
+STATION_INFO = json.loads(
+    (Path(__file__).parent / "fixtures" / "station_info.json").read_text()
+)
+
+
+def _response(**data) -> dict:
+    return {**STATION_INFO, "Data": {**STATION_INFO["Data"], **data}}
+
+
+def test_metadata_from_response():
+    """Test that the metadata is parsed from the station info."""
+    metadata = StationMetadata.from_dict(STATION_INFO["Data"])
+
+    assert metadata.name == "Station"
+    assert metadata.model == "EVT800"
+    assert metadata.latitude == 48.137
+    assert metadata.longitude == 11.575
+    assert metadata.capacity == 2400.0
+    assert metadata.installer == "Installer GmbH"
+
+
+def test_metadata_with_missing_fields():
+    """Test that missing or malformed fields do not fail the parsing."""
+    metadata = StationMetadata.from_dict({
+        "InvModel1": "EVT560",
+        "InvModel2": "EVT800",
+        "Lat": "",
+        "UnitCapacity": "unknown",
+    })
+
+    assert metadata.name is None
+    assert metadata.model == "EVT560 / EVT800"
+    assert metadata.latitude is None
+    assert metadata.capacity is None
+
+
+def test_metadata_is_only_reread_after_ttl():
+    """Test that polls within the TTL only parse the telemetry."""
+    client = PVMicroinverterApiClient(session=MagicMock(), station_id="station")
+
+    data = client._process_data(_response(), timestamp=1000.0)
+    first = client.metadata
+    assert data.current_power == 412.0
+    assert first.name == "Station"
+
+    # Within the TTL, a changed name is not picked up
+    client._process_data(_response(StationName="Renamed"), timestamp=2000.0)
+    assert client.metadata is first
+
+    # After the TTL, unchanged metadata keeps its identity...
+    client._process_data(_response(), timestamp=1000.0 + METADATA_TTL)
+    assert client.metadata is first
+    assert client.metadata_fetched == 1000.0 + METADATA_TTL
+
+    # ...and changed metadata replaces it
+    client._process_data(
+        _response(StationName="Renamed"), timestamp=1000.0 + 2 * METADATA_TTL
+    )
+    assert client.metadata is not first
+    assert client.metadata.name == "Renamed"
@@ -0,0 +1,94 @@
+"""Tests for the PV Microinverter update profiler."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import ServiceCall
+
+from pv_microinverter.const import DATA_PROFILER, DOMAIN
+from pv_microinverter.profiler import UpdateProfiler
+from pv_microinverter.services import (
+    ATTR_TIMEOUT,
+    ATTR_TOP,
+    ATTR_UPDATES,
+    SERVICE_PROFILE,
+    _async_profile,
+)
+
+
+async def _update(profiler: UpdateProfiler) -> None:
+    with profiler.profile_update():
+        await asyncio.sleep(0.01)
+        sum(range(10_000))
+
+
+@pytest.mark.asyncio
+async def test_profiles_requested_updates(tmp_path):
+    """Test that the profiler finishes after the requested updates."""
+    profiler = UpdateProfiler(updates=3)
+
+    await asyncio.gather(_update(profiler), _update(profiler))
+    waiter = asyncio.ensure_future(profiler.async_wait())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await _update(profiler)
+    await asyncio.wait_for(waiter, 1)
+    assert profiler.completed == 3
+
+    # Further updates are not profiled
+    await _update(profiler)
+    assert profiler.completed == 3
+
+    path = tmp_path / f"profile.{profiler.extension}"
+    profiler.dump(str(path))
+    assert path.stat().st_size > 0
+
+    top = profiler.top(5)
+    assert 0 < len(top) <= 5
+    assert all("cumulative_time" in entry for entry in top)
+
+
+@pytest.mark.asyncio
+async def test_stop_before_completion():
+    """Test that a partially completed run can be stopped and summarized."""
+    profiler = UpdateProfiler(updates=10)
+    await _update(profiler)
+
+    profiler.stop()
+
+    assert profiler.completed == 1
+    assert profiler.top(3)
+
+
+@pytest.mark.asyncio
+async def test_other_profiler_active():
+    """Test that updates run unprofiled while another profiler is active."""
+    profiler = UpdateProfiler(updates=2)
+    with patch.object(
+        profiler._backend,
+        "start",
+        side_effect=ValueError("Another profiling tool is already active"),
+    ):
+        await _update(profiler)
+
+    assert profiler.completed == 0
+    assert profiler.remaining == 2
+
+
+@pytest.mark.asyncio
+async def test_service_times_out_without_updates(hass):
+    """Test that a profile run without any update returns an empty summary."""
+    call = ServiceCall(
+        hass,
+        DOMAIN,
+        SERVICE_PROFILE,
+        {ATTR_UPDATES: 3, ATTR_TOP: 5, ATTR_TIMEOUT: 0.01},
+        return_response=True,
+    )
+
+    assert await _async_profile(call) == {"updates": 0, "top": []}
+    assert DATA_PROFILER not in hass.data
+    assert not list(Path(hass.config.config_dir).glob(f"{DOMAIN}.profile.*"))
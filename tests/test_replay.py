@@ -0,0 +1,66 @@
+"""Tests for recording and replaying PV Microinverter API responses."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from pv_microinverter.api import PVMicroinverterApiClient
+from pv_microinverter.replay import (
+    ReplayExhaustedError,
+    ReplaySession,
+    ResponseRecorder,
+    iter_recorded_responses,
+)
+
+STATION_INFO = json.loads(
+    (Path(__file__).parent / "fixtures" / "station_info.json").read_text()
+)
+
+
+def _body(power: float) -> bytes:
+    return json.dumps({
+        **STATION_INFO,
+        "Data": {**STATION_INFO["Data"], "Power": power},
+    }).encode()
+
+
+def test_record_and_rotate(tmp_path):
+    """Test that records survive rotation and are read back in order."""
+    path = tmp_path / "station.ndjson.gz"
+    recorder = ResponseRecorder(path, max_bytes=1, backup_count=2)
+
+    for idx in range(4):
+        recorder.record("station", _body(idx), timestamp=1000.0 + idx)
+
+    # Every record exceeds max_bytes, so only the newest three files are kept
+    records = list(iter_recorded_responses(path))
+    assert [record.timestamp for record in records] == [1001.0, 1002.0, 1003.0]
+    assert records[-1].body == _body(3)
+
+    # Unrelated files next to the recording are ignored
+    (tmp_path / "station.ndjson.gz.bak").write_bytes(b"backup")
+    (tmp_path / "station.ndjson.gz.tmp").write_bytes(b"partial")
+    assert list(iter_recorded_responses(path)) == records
+
+
+@pytest.mark.asyncio
+async def test_replay_through_client(tmp_path):
+    """Test that a replayed recording yields the original readings."""
+    path = tmp_path / "station.ndjson.gz"
+    recorder = ResponseRecorder(path)
+    for idx, power in enumerate((100.0, 250.0)):
+        recorder.record("station", _body(power), timestamp=2000.0 + 60 * idx)
+
+    session = ReplaySession.from_file(path)
+    client = PVMicroinverterApiClient(
+        session=session, station_id="station", clock=session.clock
+    )
+
+    first = await client.async_get_data()
+    second = await client.async_get_data()
+    assert (first.current_power, first.last_updated) == (100.0, 2000.0)
+    assert (second.current_power, second.last_updated) == (250.0, 2060.0)
+
+    with pytest.raises(ReplayExhaustedError):
+        await session.post("", json={"stationId": "station"})
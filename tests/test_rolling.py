@@ -0,0 +1,102 @@
+"""Tests for the PV Microinverter rolling statistics."""
+
+import random
+
+import pytest
+
+from pv_microinverter.rolling import PowerStatistics, RollingWindow
+
+
+def test_window_matches_brute_force():
+    """Test mean, max and min against a recomputation over the window."""
+    rng = random.Random(42)
+    window = RollingWindow(window=300, capacity=16)
+    samples = []
+
+    timestamp = 0.0
+    for _ in range(500):
+        timestamp += rng.uniform(10, 60)
+        value = rng.uniform(0, 800)
+        window.add(timestamp, value)
+        samples.append((timestamp, value))
+
+        expected = [v for t, v in samples if t > timestamp - 300][-16:]
+        assert len(window) == len(expected)
+        assert window.mean == pytest.approx(sum(expected) / len(expected))
+        assert window.max == max(expected)
+        assert window.min == min(expected)
+
+
+def test_empty_window():
+    """Test that an empty window has no statistics."""
+    window = RollingWindow(window=60, capacity=4)
+    assert window.mean is None
+    assert window.max is None
+    assert window.min is None
+
+    window.add(0, 100.0)
+    window.add(120, 50.0)
+    assert len(window) == 1
+    assert window.mean == 50.0
+
+
+def test_power_statistics():
+    """Test peak power and ramp rate tracking."""
+    statistics = PowerStatistics(sample_interval=60)
+
+    statistics.add(0, 100.0, day=1)
+    assert statistics.ramp_rate is None
+    statistics.add(60, 400.0, day=1)
+    statistics.add(120, 250.0, day=1)
+
+    assert statistics.peak_today == 400.0
+    assert statistics.ramp_rate == pytest.approx(-150.0)
+    assert statistics.window_15m.mean == pytest.approx(250.0)
+
+    # A new day resets the peak
+    statistics.add(180, 50.0, day=2)
+    assert statistics.peak_today == 50.0
+
+
+def test_power_statistics_ignores_stale_samples():
+    """Test that repeated or older samples are not counted twice."""
+    statistics = PowerStatistics(sample_interval=60)
+    statistics.add(60, 100.0, day=1)
+    statistics.add(60, 100.0, day=1)
+    statistics.add(30, 500.0, day=1)
+
+    assert len(statistics.window_1h) == 1
+    assert statistics.peak_today == 100.0
+
+
+def test_power_statistics_resize_keeps_samples():
+    """Test that resizing for a new interval keeps the samples in the windows."""
+    statistics = PowerStatistics(sample_interval=60)
+    for minute in range(10):
+        statistics.add(minute * 60.0, 100.0 + minute, day=1)
+
+    statistics.resize(sample_interval=10)
+
+    assert len(statistics.window_15m) == 10
+    assert statistics.window_15m.mean == pytest.approx(104.5)
+    for second in range(600, 900, 10):
+        statistics.add(float(second), 200.0, day=1)
+    assert len(statistics.window_15m) == 10 + 30
+
+    # Shrinking drops the oldest samples that no longer fit
+    statistics.resize(sample_interval=300)
+    assert len(statistics.window_15m) == 7
+    assert list(statistics.window_15m)[-1] == (890.0, 200.0)
+
+
+def test_power_statistics_thins_out_dense_samples():
+    """Test that samples arriving faster than expected do not shorten the windows."""
+    statistics = PowerStatistics(sample_interval=10)
+    for second in range(2 * 3600):
+        statistics.add(float(second), 100.0 + second % 7, day=1)
+
+    oldest, _ = next(iter(statistics.window_1h))
+    assert 7199 - oldest == pytest.approx(3600, abs=10)
+    oldest, _ = next(iter(statistics.window_15m))
+    assert 7199 - oldest == pytest.approx(900, abs=10)
+    assert statistics.peak_today == 106.0
@@ -0,0 +1,206 @@
+"""Tests for the PV Microinverter sample store."""
+
+import random
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from homeassistant.util import dt as dt_util
+
+from pv_microinverter.const import DOMAIN
+from pv_microinverter.samplestore import (
+    CHUNK_RECORDS,
+    GROW_MARGIN,
+    INDEX_STRIDE,
+    RETENTION,
+    StationSamples,
+    async_get_sample_store,
+)
+
+
+def _fill(samples: StationSamples, count: int, start: float = 1000.0) -> None:
+    for idx in range(count):
+        assert samples.append(start + idx * 60, float(idx), idx / 10)
+
+
+def test_persists_across_reopen(tmp_path):
+    """Test that samples survive closing and reopening the file."""
+    path = tmp_path / "station.bin"
+    samples = StationSamples(path)
+    _fill(samples, 100)
+    samples.close()
+
+    samples = StationSamples(path)
+    assert len(samples) == 100
+    assert samples.records["timestamp"][-1] == 1000.0 + 99 * 60
+    assert samples.records["current_power"][42] == 42.0
+    assert samples.records["today_energy"][42] == pytest.approx(4.2)
+
+
+def test_drops_samples_out_of_order(tmp_path):
+    """Test that only samples newer than the last one are appended."""
+    samples = StationSamples(tmp_path / "station.bin")
+    assert samples.append(2000.0, 1.0, 0.1)
+    assert not samples.append(2000.0, 2.0, 0.2)
+    assert not samples.append(1000.0, 3.0, 0.3)
+    assert len(samples) == 1
+
+
+def test_grows_in_chunks(tmp_path):
+    """Test that the file grows beyond its initial capacity."""
+    path = tmp_path / "station.bin"
+    samples = StationSamples(path)
+    size = path.stat().st_size
+    _fill(samples, CHUNK_RECORDS + 1)
+
+    assert len(samples) == CHUNK_RECORDS + 1
+    assert path.stat().st_size > size
+    assert samples.records["current_power"][-1] == CHUNK_RECORDS
+
+
+def test_query_matches_brute_force(tmp_path):
+    """Test range queries against a linear scan."""
+    rng = random.Random(42)
+    samples = StationSamples(tmp_path / "station.bin")
+    timestamp = 0.0
+    for _ in range(5 * INDEX_STRIDE + 17):
+        timestamp += rng.uniform(1, 120)
+        samples.append(timestamp, rng.uniform(0, 800), 0.0)
+
+    timestamps = samples.records["timestamp"]
+    bounds = [-1.0, 0.0, timestamp, timestamp + 1, *timestamps[::97]]
+    for _ in range(200):
+        bounds.append(rng.uniform(-100, timestamp + 100))
+    for start in bounds:
+        end = start + rng.uniform(0, 20000)
+        expected = timestamps[(timestamps >= start) & (timestamps < end)]
+        assert np.array_equal(samples.query(start, end)["timestamp"], expected)
+
+
+def test_query_returns_view(tmp_path):
+    """Test that range queries do not copy the samples."""
+    samples = StationSamples(tmp_path / "station.bin")
+    _fill(samples, 1000)
+
+    result = samples.query(1000.0 + 100 * 60, 1000.0 + 200 * 60)
+    assert len(result) == 100
+    assert np.shares_memory(result, samples.records)
+
+
+def test_compact(tmp_path):
+    """Test that compacting drops old samples and keeps the rest queryable."""
+    path = tmp_path / "station.bin"
+    samples = StationSamples(path)
+    _fill(samples, 3 * CHUNK_RECORDS)
+    before = samples.query(0, 1e12)
+
+    assert samples.compact(1000.0 + 10000 * 60) == 10000
+    assert len(samples) == 3 * CHUNK_RECORDS - 10000
+    assert samples.records["current_power"][0] == 10000.0
+    assert len(samples.query(1000.0, 1000.0 + 10010 * 60)) == 10
+    # Views into the previous mapping stay readable
+    assert before["current_power"][-1] == 3 * CHUNK_RECORDS - 1
+
+    samples.close()
+    assert len(StationSamples(path)) == 3 * CHUNK_RECORDS - 10000
+
+
+def test_replaces_unreadable_file(tmp_path):
+    """Test that a file in an unknown format is replaced by an empty one."""
+    path = tmp_path / "station.bin"
+    path.write_bytes(b"garbage" * 100)
+
+    samples = StationSamples(path)
+    assert len(samples) == 0
+    assert samples.append(1000.0, 1.0, 0.1)
+
+
+def test_remap_keeps_samples_appended_meanwhile(tmp_path):
+    """Test that samples appended while a new mapping is prepared are kept."""
+    path = tmp_path / "station.bin"
+    samples = StationSamples(path)
+    _fill(samples, CHUNK_RECORDS - 10)
+
+    remapping = samples.prepare_grow()
+    _fill(samples, 5, start=1000.0 + CHUNK_RECORDS * 60)
+    assert samples.remap(remapping)
+    assert len(samples) == CHUNK_RECORDS - 5
+    assert samples.spare == CHUNK_RECORDS + 5
+    # Outdated once the file grew by other means
+    remapping = samples.prepare_grow()
+    samples._grow()
+    assert not samples.remap(remapping)
+    assert samples.spare == 2 * CHUNK_RECORDS + 5
+
+    remapping = samples.prepare_compact(1000.0 + 1000 * 60)
+    _fill(samples, 300, start=1000.0 + 2 * CHUNK_RECORDS * 60)
+    assert samples.remap(remapping)
+    assert remapping.start == 1000
+    assert len(samples) == CHUNK_RECORDS - 5 - 1000 + 300
+    assert samples.records["current_power"][0] == 1000.0
+    assert samples.records["current_power"][-1] == 299.0
+    assert not path.with_suffix(".tmp").exists()
+
+    timestamps = samples.records["timestamp"]
+    for start in timestamps[::53]:
+        end = start + 5000
+        expected = timestamps[(timestamps >= start) & (timestamps < end)]
+        assert np.array_equal(samples.query(start, end)["timestamp"], expected)
+
+    samples.close()
+    assert len(StationSamples(path)) == CHUNK_RECORDS - 5 - 1000 + 300
+
+
+@pytest.mark.asyncio
+async def test_store_grows_files_in_background(hass):
+    """Test that the store grows a file before it is full."""
+    store = async_get_sample_store(hass)
+    samples = await store.async_open("station_1", time.time())
+
+    for idx in range(CHUNK_RECORDS - GROW_MARGIN + 1):
+        assert store.async_append(samples, 1000.0 + idx, float(idx), 0.0)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert samples.spare >= CHUNK_RECORDS
+    assert len(samples) == CHUNK_RECORDS - GROW_MARGIN + 1
+
+
+@pytest.mark.asyncio
+async def test_store_compacts_open_files(hass):
+    """Test the daily compaction of expired samples."""
+    store = async_get_sample_store(hass)
+    samples = await store.async_open("station_1", time.time())
+    expired = time.time() - RETENTION - 90
+    for idx in range(10):
+        store.async_append(samples, expired + idx * 20, float(idx), 0.0)
+
+    store._async_compact(dt_util.utcnow())
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert samples.records["current_power"].tolist() == [5.0, 6.0, 7.0, 8.0, 9.0]
+
+
+@pytest.mark.asyncio
+async def test_store_file_names_and_removal(hass):
+    """Test that station IDs are slugified and removal deletes the file."""
+    directory = Path(hass.config.path(DOMAIN, "samples"))
+    store = async_get_sample_store(hass)
+
+    # Files named after the raw station ID are taken over
+    legacy = await hass.async_add_executor_job(StationSamples, directory / "ABC-1.bin")
+    legacy.append(1000.0, 1.0, 0.1)
+    legacy.close()
+    samples = await store.async_open("ABC-1", 1000.0)
+    assert samples.path == directory / "abc_1.bin"
+    assert len(samples) == 1
+    assert not (directory / "ABC-1.bin").exists()
+
+    samples = await store.async_open("../escape", 1000.0)
+    assert samples.path.parent == directory
+
+    store.async_close("ABC-1")
+    await store.async_remove("ABC-1")
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert not (directory / "abc_1.bin").exists()
+    assert store.get("ABC-1") is None
@@ -0,0 +1,116 @@
+"""Tests for the PV Microinverter poll scheduler."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pv_microinverter.scheduler import PVMicroinverterPollScheduler
+
+
+def _coordinator(station_id: str, interval: int = 60) -> MagicMock:
+    coordinator = MagicMock()
+    coordinator.api_client.station_id = station_id
+    coordinator.poll_interval = timedelta(seconds=interval)
+    return coordinator
+
+
+@pytest.fixture
+def scheduler():
+    """Return a scheduler whose timer is never actually armed."""
+    with patch("pv_microinverter.scheduler.async_call_later"):
+        yield PVMicroinverterPollScheduler(MagicMock())
+
+
+def test_offsets_spread_evenly(scheduler):
+    """Test that stations are spread evenly across the interval."""
+    for idx in range(4):
+        scheduler.async_add(_coordinator(f"station_{idx}"))
+
+    assert sorted(scheduler.offsets.values()) == [0.0, 15.0, 30.0, 45.0]
+
+
+def test_offsets_are_deterministic(scheduler):
+    """Test that the assignment does not depend on registration order."""
+    coordinators = [_coordinator(f"station_{idx}") for idx in range(5)]
+    for coordinator in coordinators:
+        scheduler.async_add(coordinator)
+    first = scheduler.offsets
+
+    with patch("pv_microinverter.scheduler.async_call_later"):
+        other = PVMicroinverterPollScheduler(MagicMock())
+        for coordinator in reversed(coordinators):
+            other.async_add(coordinator)
+
+    assert other.offsets == first
+
+
+def test_rebalance_on_remove(scheduler):
+    """Test that removing a station re-spreads the remaining ones."""
+    coordinators = [_coordinator(f"station_{idx}") for idx in range(3)]
+    removers = [scheduler.async_add(coordinator) for coordinator in coordinators]
+
+    removers[0]()
+
+    assert len(scheduler.offsets) == 2
+    assert sorted(scheduler.offsets.values()) == [0.0, 30.0]
+
+
+def test_intervals_are_grouped(scheduler):
+    """Test that stations with different intervals are spread independently."""
+    scheduler.async_add(_coordinator("fast_a", 30))
+    scheduler.async_add(_coordinator("fast_b", 30))
+    scheduler.async_add(_coordinator("slow", 300))
+
+    offsets = scheduler.offsets
+    assert sorted([offsets["fast_a"], offsets["fast_b"]]) == [0.0, 15.0]
+    assert offsets["slow"] == 0.0
+
+
+def test_unpolled_stations_are_skipped(scheduler):
+    """Test that stations without a poll interval are registered but not polled."""
+    pushed = _coordinator("pushed")
+    pushed.poll_interval = None
+    scheduler.async_add(pushed)
+    scheduler.async_add(_coordinator("polled_a"))
+    scheduler.async_add(_coordinator("polled_b"))
+
+    assert sorted(scheduler.offsets) == ["polled_a", "polled_b"]
+    assert sorted(scheduler.offsets.values()) == [0.0, 30.0]
+
+    # Falling back to polling spreads the station among the others
+    pushed.poll_interval = timedelta(seconds=60)
+    scheduler.async_reschedule(pushed)
+    assert sorted(scheduler.offsets.values()) == [0.0, 20.0, 40.0]
+
+
+def test_rebalance_keeps_pending_polls(scheduler):
+    """Test that re-spreading a group does not push back pending polls."""
+    scheduler.async_add(_coordinator("slow", 300))
+    for idx in range(3):
+        scheduler.async_add(_coordinator(f"station_{idx}"))
+    due = {
+        station_id: station.due for station_id, station in scheduler._stations.items()
+    }
+
+    scheduler.async_add(_coordinator("station_3"))
+
+    assert sorted(scheduler.offsets.values()) == [0.0, 0.0, 15.0, 30.0, 45.0]
+    for station_id, station_due in due.items():
+        assert scheduler._stations[station_id].due == station_due
+
+
+def test_removed_station_is_not_polled(scheduler):
+    """Test that heap entries of removed stations are skipped."""
+    kept = _coordinator("kept")
+    removed = _coordinator("removed")
+    scheduler.async_add(kept)
+    scheduler.async_add(removed)()
+
+    later = max(station.due for station in scheduler._stations.values()) + 1
+    with patch("pv_microinverter.scheduler.time.time", return_value=later):
+        scheduler._async_on_timer(None)
+
+    assert scheduler._hass.async_create_background_task.call_count == 1
+    kept.async_refresh.assert_called_once()
+    removed.async_refresh.assert_not_called()
@@ -1,17 +1,33 @@
 """Tests for the PV Microinverter sensor platform."""
 
-from datetime import datetime
+import logging
+import time
+from datetime import timedelta
 from unittest.mock import MagicMock
 
 import pytest
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.const import UnitOfEnergy, UnitOfPower
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.entity_platform import EntityPlatform
 
-from pv_microinverter.const import PVMicroinverterData
+from pv_microinverter.const import (
+    CONF_ENABLE_STATISTICS,
+    DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
+    STATISTICS_SENSOR_TYPES,
+    PVMicroinverterData,
+)
 from pv_microinverter.coordinator import (
     PVMicroinverterDataUpdateCoordinator,
 )
-from pv_microinverter.sensor import PVMicroinverterSensor
+from pv_microinverter.sensor import (
+    OPTIONAL_SENSORS,
+    PVMicroinverterSensor,
+    async_setup_entry,
+)
 
 
 @pytest.mark.asyncio
@@ -22,7 +38,7 @@ async def test_sensor_initialization():
         current_power=500.0,
         today_energy=2.5,
         lifetime_energy=150.0,
-        last_updated=datetime.now().isoformat(),
+        last_updated=time.time(),
     )
 
     mock_coordinator = MagicMock(spec=PVMicroinverterDataUpdateCoordinator)
@@ -70,3 +86,58 @@ async def test_sensor_initialization():
     assert today_energy_sensor.device_class == SensorDeviceClass.ENERGY
     assert today_energy_sensor.state_class == SensorStateClass.TOTAL_INCREASING
     assert today_energy_sensor.native_value == 2.5
+
+
+def test_optional_sensor_groups():
+    """Test that every optional sensor group names its option, default and class."""
+    for option, default, sensor_types, sensor_class in OPTIONAL_SENSORS:
+        assert isinstance(option, str)
+        assert isinstance(default, bool)
+        assert sensor_types
+        assert issubclass(sensor_class, PVMicroinverterSensor)
+
+
+@pytest.mark.asyncio
+async def test_disabled_sensor_group_leaves_registry(hass, create_coordinator):
+    """Test that disabling an optional group also drops its registry entries."""
+    coordinator = create_coordinator(**{CONF_ENABLE_STATISTICS: True})
+    entry = coordinator.config_entry
+    hass.config_entries._entries[entry.entry_id] = entry
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    platform = EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain=SENSOR_DOMAIN,
+        platform_name=DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=60),
+        entity_namespace=None,
+    )
+    await async_setup_entry(hass, entry, platform._async_schedule_add_entities)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    station_id = coordinator.api_client.station_id
+    unique_ids = [f"{key}_{station_id}" for key in STATISTICS_SENSOR_TYPES]
+    entity_ids = [
+        registry.async_get_entity_id(SENSOR_DOMAIN, DOMAIN, unique_id)
+        for unique_id in unique_ids
+    ]
+    assert all(entity_ids)
+    assert all(hass.states.get(entity_id) for entity_id in entity_ids)
+
+    hass.config_entries.async_update_entry(
+        entry, options={CONF_ENABLE_STATISTICS: False}
+    )
+    coordinator.async_apply_options()
+    async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
+    await hass.async_block_till_done()
+
+    for entity_id in entity_ids:
+        assert hass.states.get(entity_id) is None
+        assert registry.async_get(entity_id) is None
+    # The always present sensors are kept
+    assert registry.async_get_entity_id(
+        SENSOR_DOMAIN, DOMAIN, f"current_power_{station_id}"
+    )
+    await platform.async_reset()
@@ -0,0 +1,69 @@
+"""Tests for the PV Microinverter failure telemetry."""
+
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+import pytest
+
+from pv_microinverter.api import PVMicroinverterApiClientError
+from pv_microinverter.telemetry import ISSUE_AFTER, FailureTelemetry
+
+
+def _error() -> PVMicroinverterApiClientError:
+    try:
+        try:
+            raise aiohttp.ClientConnectionError("Connection refused")
+        except aiohttp.ClientError as error:
+            raise PVMicroinverterApiClientError("Error fetching data") from error
+    except PVMicroinverterApiClientError as error:
+        return error
+
+
+@pytest.fixture
+def issue_registry():
+    """Patch the issue registry helpers used by the telemetry."""
+    with patch("pv_microinverter.telemetry.ir") as issue_registry:
+        yield issue_registry
+
+
+def test_failures_are_counted_by_root_cause(issue_registry):
+    """Test that failures are counted by the class of their innermost cause."""
+    telemetry = FailureTelemetry(MagicMock())
+    for _ in range(3):
+        telemetry.async_record_failure("station", _error())
+
+    assert telemetry.error_counts == {"ClientConnectionError": 3}
+    assert telemetry.consecutive_failures("station") == 3
+
+    telemetry.async_record_success("station")
+    assert telemetry.consecutive_failures("station") == 0
+
+
+def test_summary_is_rate_limited(issue_registry, caplog):
+    """Test that failed polls are logged in aggregate."""
+    telemetry = FailureTelemetry(MagicMock())
+    for idx in range(50):
+        telemetry.async_record_failure(f"station_{idx % 10}", _error())
+
+    warnings = [record for record in caplog.records if record.levelname == "WARNING"]
+    assert len(warnings) == 1
+
+
+def test_repair_issue_for_sustained_failures(issue_registry):
+    """Test that a repair issue is raised once and removed on recovery."""
+    telemetry = FailureTelemetry(MagicMock())
+
+    with patch("pv_microinverter.telemetry.time.time") as mock_time:
+        for minute in range(90):
+            mock_time.return_value = 60.0 * minute
+            telemetry.async_record_failure("station", _error())
+
+    assert 60 * 89 >= ISSUE_AFTER
+    issue_registry.async_create_issue.assert_called_once()
+    assert (
+        issue_registry.async_create_issue.call_args.args[2]
+        == "station_unreachable_station"
+    )
+
+    telemetry.async_record_success("station")
+    issue_registry.async_delete_issue.assert_called_once()
@@ -0,0 +1,100 @@
+"""Tests for the PV Microinverter webhook."""
+
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from pv_microinverter.webhook import async_handle_webhook
+
+
+@pytest.fixture
+def coordinator():
+    """Return a coordinator that accepts all pushed readings."""
+    coordinator = MagicMock()
+    coordinator.api_client.station_id = "test_station_id"
+    coordinator.async_push_readings.side_effect = len
+    return coordinator
+
+
+@asynccontextmanager
+async def _client(coordinator: MagicMock) -> AsyncGenerator[TestClient]:
+    """Run the webhook handler on a local server and return a client for it."""
+
+    async def _handle(request: web.Request) -> web.Response:
+        return await async_handle_webhook(coordinator, request)
+
+    app = web.Application()
+    app.router.add_post("/api/webhook/test", _handle)
+    async with TestClient(TestServer(app)) as client:
+        yield client
+
+
+def _reading(timestamp: float, power: float = 500.0) -> dict:
+    return {
+        "timestamp": timestamp,
+        "current_power": power,
+        "today_energy": 2.5,
+        "lifetime_energy": 150.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_accepts_batch(coordinator):
+    """Test that a valid batch is handed to the coordinator."""
+    now = time.time()
+    async with _client(coordinator) as client:
+        response = await client.post(
+            "/api/webhook/test",
+            json={
+                "station_id": "test_station_id",
+                "readings": [_reading(now - 10, 480.0), _reading(now, 500.0)],
+            },
+        )
+        assert response.status == 200
+        assert await response.json() == {"accepted": 2}
+
+    (readings,) = coordinator.async_push_readings.call_args.args
+    assert [reading.current_power for reading in readings] == [480.0, 500.0]
+    assert readings[1].last_updated == now
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("payload", "status"),
+    [
+        ({"station_id": "other_station", "readings": [_reading(0)]}, 403),
+        ({"station_id": "test_station_id", "readings": []}, 400),
+        ({"station_id": "test_station_id", "readings": [{"timestamp": 0}]}, 400),
+        ({"station_id": "test_station_id", "readings": [_reading(0, -1.0)]}, 400),
+        (
+            {
+                "station_id": "test_station_id",
+                "readings": [_reading(time.time() + 3600)],
+            },
+            400,
+        ),
+    ],
+)
+async def test_rejects_invalid_payloads(coordinator, payload, status):
+    """Test that invalid batches are rejected without touching the coordinator."""
+    async with _client(coordinator) as client:
+        response = await client.post("/api/webhook/test", json=payload)
+        assert response.status == status
+        assert "error" in await response.json()
+
+    coordinator.async_push_readings.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rejects_invalid_json(coordinator):
+    """Test that a body that is not JSON is rejected."""
+    async with _client(coordinator) as client:
+        response = await client.post("/api/webhook/test", data=b"not json")
+        assert response.status == 400
+
+    coordinator.async_push_readings.assert_not_called()